@@ -0,0 +1,57 @@
+import importlib
+
+# Public names and the module defining each. Modules are imported on first access, so importing kmlplus, or a module
+# which only parses coordinates, does not load numpy, pyproj or simplekml.
+_EXPORTS = {
+    'KmlPlus': 'kmlplus.kml',
+    'TiledKmlPlus': 'kmlplus.tiles',
+    'Point': 'kmlplus.geo',
+    'PointFactory': 'kmlplus.geo',
+    'Circle': 'kmlplus.shapes',
+    'Cylinder': 'kmlplus.shapes',
+    'LineString': 'kmlplus.shapes',
+    'Polygon': 'kmlplus.shapes',
+    'Polyhedron': 'kmlplus.shapes',
+    'BuildManifest': 'kmlplus.manifest',
+    'GeometryCache': 'kmlplus.cache',
+    'get_geometry_cache': 'kmlplus.cache',
+    'set_geometry_cache': 'kmlplus.cache',
+    'using_geometry_cache': 'kmlplus.cache',
+    'get_geodesic_backend': 'kmlplus.geodesic',
+    'set_geodesic_backend': 'kmlplus.geodesic',
+    'select_backend': 'kmlplus.geodesic',
+    'polygon_metrics': 'kmlplus.metrics',
+    'batch_polygon_metrics': 'kmlplus.metrics',
+    'contains': 'kmlplus.containment',
+    'locate': 'kmlplus.containment',
+    'volume_mesh': 'kmlplus.mesh',
+    'write_dae': 'kmlplus.mesh',
+    'write_glb': 'kmlplus.mesh',
+    'GeoJsonWriter': 'kmlplus.export',
+    'FlatGeobufWriter': 'kmlplus.export',
+    'iter_placemarks': 'kmlplus.reader',
+    'iter_shapes': 'kmlplus.reader',
+    'patch_kml': 'kmlplus.reader',
+    'tokenize': 'kmlplus.tokenizer',
+    'CoordinateSyntaxError': 'kmlplus.tokenizer',
+    'Progress': 'kmlplus.progress',
+    'ProgressReport': 'kmlplus.progress',
+    'TrackWriter': 'kmlplus.tracks',
+    'decimate': 'kmlplus.tracks',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(_EXPORTS))
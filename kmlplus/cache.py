@@ -0,0 +1,202 @@
+import os
+import sqlite3
+import threading
+import time
+from array import array
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Union
+
+# Version of the geometry kmlplus generates. Bump whenever a change alters the coordinates generated for the same
+# inputs, so that cache and manifest entries written by earlier versions are not reused.
+GEOMETRY_VERSION = 1
+
+_geometry_cache = None
+# Overrides the process wide cache within using_geometry_cache. Each thread starts without an override.
+_scoped_cache = ContextVar('geometry_cache')
+
+
+def get_geometry_cache():
+    """
+    Returns:
+        cache (GeometryCache | None): The cache used by shapes when generating rings and arcs, if one is set.
+    """
+    return _scoped_cache.get(_geometry_cache)
+
+
+def set_geometry_cache(cache) -> None:
+    """
+    Sets the cache consulted by Circle and the curved segments before solving any geodesics. Pass None to disable
+    caching.
+
+    Args:
+        cache (GeometryCache | None)
+    """
+    global _geometry_cache
+    _geometry_cache = cache
+
+
+@contextmanager
+def using_geometry_cache(cache):
+    """
+    Uses a cache in place of the process wide cache in the current thread until the block exits. Other threads, and
+    code run after the block, are unaffected.
+
+    Args:
+        cache (GeometryCache | None)
+
+    Usage:
+        with using_geometry_cache(GeometryCache('geometry.sqlite')):
+            circle = Circle(['55.0 -4.0'], 5, radius_uom='NM')
+    """
+    token = _scoped_cache.set(cache)
+    try:
+        yield cache
+    finally:
+        _scoped_cache.reset(token)
+
+
+def canonical_key(namespace: str, *parts: Union[float, int, str]) -> str:
+    """
+    Builds a cache key from the inputs to a geometry calculation and GEOMETRY_VERSION. Floats are written with repr so
+    the key round-trips exactly and two calculations only share a key when their inputs are identical.
+
+    Args:
+        namespace (str): The type of geometry eg 'ring' or 'arc'
+
+    Returns:
+        key (str)
+    """
+    return '|'.join([namespace, f'v{GEOMETRY_VERSION}'] +
+                    [repr(float(p)) if isinstance(p, (int, float)) else str(p) for p in parts])
+
+
+class GeometryCache:
+    """
+    A persistent on-disk cache of computed geometry backed by SQLite. The cache may be shared between runs and between
+    worker processes; SQLite's write-ahead log allows concurrent readers while a single process writes.
+
+    Values are stored as packed x, y coordinate pairs and returned as a list of tuples.
+
+    Args:
+        path (str): Location of the SQLite database. Parent directories are created if required.
+
+    Keyword Args:
+        max_entries (int): Maximum number of entries to hold. Defaults to 100000.
+        max_bytes (int): Maximum total size of the stored coordinates in bytes. Defaults to 256MB.
+        evict_interval (int): How many writes to make between eviction passes. Defaults to 100.
+        timeout (float): Seconds to wait for a lock held by another process. Defaults to 30.
+    """
+    __slots__ = ('path', 'max_entries', 'max_bytes', 'evict_interval', 'timeout', '_connection', '_pid', '_lock',
+                 '_writes')
+
+    def __init__(self, path: str, **kwargs: Union[int, float]):
+        self.path = path
+        self.max_entries = kwargs.get('max_entries', 100000)
+        self.max_bytes = kwargs.get('max_bytes', 256 * 1024 * 1024)
+        self.evict_interval = kwargs.get('evict_interval', 100)
+        self.timeout = kwargs.get('timeout', 30.0)
+        self._connection = None
+        self._pid = None
+        self._lock = threading.Lock()
+        self._writes = 0
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self.connect()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self.connection.execute('SELECT COUNT(*) FROM geometry').fetchone()[0]
+
+    def __getstate__(self) -> dict:
+        # Connections cannot be pickled. Each worker process opens its own on first use.
+        return {'path': self.path, 'max_entries': self.max_entries, 'max_bytes': self.max_bytes,
+                'evict_interval': self.evict_interval, 'timeout': self.timeout}
+
+    def __setstate__(self, state: dict) -> None:
+        for key, value in state.items():
+            setattr(self, key, value)
+        self._connection = None
+        self._pid = None
+        self._lock = threading.Lock()
+        self._writes = 0
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        # A connection inherited through fork must not be used by the child process
+        if self._connection is None or self._pid != os.getpid():
+            self.connect()
+        return self._connection
+
+    def connect(self) -> None:
+        self._connection = sqlite3.connect(self.path, timeout=self.timeout, check_same_thread=False,
+                                           isolation_level=None)
+        self._pid = os.getpid()
+        self._connection.execute('PRAGMA journal_mode=WAL')
+        self._connection.execute('PRAGMA synchronous=NORMAL')
+        self._connection.execute('CREATE TABLE IF NOT EXISTS geometry (key TEXT PRIMARY KEY, value BLOB NOT NULL, '
+                                 'size INTEGER NOT NULL, last_used REAL NOT NULL)')
+        self._connection.execute('CREATE INDEX IF NOT EXISTS geometry_last_used ON geometry (last_used)')
+
+    def close(self) -> None:
+        with self._lock:
+            if self._connection is not None and self._pid == os.getpid():
+                self._connection.close()
+            self._connection = None
+
+    def get(self, key: str) -> Union[list[tuple], None]:
+        """
+        Args:
+            key (str): A key created by canonical_key
+
+        Returns:
+            coordinates (list[tuple] | None): Cached x, y pairs or None if the key is not cached.
+        """
+        with self._lock:
+            row = self.connection.execute('SELECT value FROM geometry WHERE key = ?', (key,)).fetchone()
+            if row is None:
+                return None
+            self.connection.execute('UPDATE geometry SET last_used = ? WHERE key = ?', (time.time(), key))
+
+        values = array('d')
+        values.frombytes(row[0])
+        return list(zip(values[0::2], values[1::2]))
+
+    def put(self, key: str, coordinates: list[tuple]) -> None:
+        """
+        Args:
+            key (str): A key created by canonical_key
+            coordinates (list[tuple]): x, y pairs to cache
+        """
+        values = array('d', [value for pair in coordinates for value in pair[:2]]).tobytes()
+
+        with self._lock:
+            self.connection.execute('INSERT OR REPLACE INTO geometry (key, value, size, last_used) VALUES (?, ?, ?, ?)',
+                                    (key, values, len(values), time.time()))
+            self._writes += 1
+            evict = self._writes % self.evict_interval == 0
+
+        if evict:
+            self.evict()
+
+    def evict(self) -> None:
+        """
+        Removes the least recently used entries until the cache is within max_entries and max_bytes.
+        """
+        with self._lock:
+            self.connection.execute('BEGIN IMMEDIATE')
+            try:
+                self.connection.execute('DELETE FROM geometry WHERE key IN (SELECT key FROM geometry '
+                                        'ORDER BY last_used DESC LIMIT -1 OFFSET ?)', (self.max_entries,))
+                self.connection.execute('DELETE FROM geometry WHERE key IN (SELECT key FROM (SELECT key, SUM(size) '
+                                        'OVER (ORDER BY last_used DESC, key) AS total FROM geometry) WHERE total > ?)',
+                                        (self.max_bytes,))
+                self.connection.execute('COMMIT')
+            except sqlite3.Error:
+                self.connection.execute('ROLLBACK')
+                raise
+
+    def clear(self) -> None:
+        with self._lock:
+            self.connection.execute('DELETE FROM geometry')
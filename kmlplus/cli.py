@@ -0,0 +1,253 @@
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from typing import Union
+
+from kmlplus.kml import KmlPlus
+from kmlplus.pipeline import Pipeline
+
+# Positional inputs of each KmlPlus shape method, in order
+SHAPE_ARGUMENTS = {
+    'point': ('coordinates',),
+    'linestring': ('coordinates',),
+    'polyhedron': ('coordinates', 'upper_coordinates'),
+    'circle': ('coordinates', 'radius'),
+    'cylinder': ('coordinates', 'radius'),
+}
+
+# Fields converted to numbers when read from a CSV spec. Every other field is kept as text.
+NUMERIC_FIELDS = {'radius', 'upper_radius', 'z', 'lower_layer', 'upper_layer', 'sample', 'densify', 'extrude', 'fill',
+                  'outline', 'width'}
+
+
+class StageTimer:
+    """
+    Records the wall clock time spent in each named stage of a build.
+
+    Attributes:
+        stages (list[tuple[str, float]]): The name and duration in seconds of each completed stage, in order.
+        details (dict): Breakdowns of a stage's time, such as the time worked by each pipeline stage, keyed by stage.
+            Details may overlap and are not included in the total.
+    """
+    __slots__ = ('stages', 'details', '_name', '_start')
+
+    def __init__(self):
+        self.stages = []
+        self.details = {}
+        self._name = None
+        self._start = None
+
+    def start(self, name: str) -> None:
+        self.stop()
+        self._name = name
+        self._start = time.perf_counter()
+
+    def stop(self) -> None:
+        if self._name is not None:
+            self.stages.append((self._name, time.perf_counter() - self._start))
+            self._name = None
+
+    def detail(self, name: str, duration: float) -> None:
+        self.details.setdefault(self._name, []).append((name, duration))
+
+    def report(self) -> str:
+        total = sum(duration for _, duration in self.stages)
+        names = [name for name, _ in self.stages] + ['  ' + n for d in self.details.values() for n, _ in d]
+        width = max([len(name) for name in names] + [len('total')])
+        lines = []
+        for name, duration in self.stages:
+            lines.append(f'{name:<{width}}  {duration:10.3f}s')
+            for detail, seconds in self.details.get(name, []):
+                lines.append(f'{"  " + detail:<{width}}  {seconds:10.3f}s')
+        lines.append(f'{"total":<{width}}  {total:10.3f}s')
+        return '\n'.join(lines)
+
+
+def load_spec(path: str) -> list[dict]:
+    """
+    Reads a shape specification file. JSON and YAML files contain a list of shape records. CSV files have a header row
+    and one shape per row, with multiple coordinates in a single field separated by semicolons. Reading YAML requires
+    PyYAML.
+
+    Each record has a 'type' of point, linestring, polyhedron, circle or cylinder, a list of 'coordinates', a 'radius'
+    for circles and cylinders and optionally 'upper_coordinates' for polyhedra. Any other fields are passed to the
+    KmlPlus method as keyword arguments.
+
+    Args:
+        path (str): Location of a .csv, .json, .yaml or .yml file
+
+    Returns:
+        records (list[dict])
+    """
+    extension = os.path.splitext(path)[1].lower()
+
+    if extension == '.csv':
+        with open(path, newline='') as f:
+            return [csv_record(row) for row in csv.DictReader(f)]
+
+    with open(path) as f:
+        if extension == '.json':
+            records = json.load(f)
+        elif extension in ('.yaml', '.yml'):
+            try:
+                import yaml
+            except ImportError:
+                raise ImportError('Reading YAML shape specifications requires PyYAML') from None
+            records = yaml.safe_load(f)
+        else:
+            raise ValueError(f'Unsupported shape specification format {extension}. Use .csv, .json or .yaml')
+
+    if not isinstance(records, list):
+        raise ValueError('A shape specification must contain a list of shapes')
+    return records
+
+
+def csv_record(row: dict) -> dict:
+    """
+    Converts a CSV row into a shape record. Empty fields are omitted.
+    """
+    record = {}
+    for field, value in row.items():
+        if field is None or value is None or not value.strip():
+            continue
+        field, value = field.strip(), value.strip()
+        if field in ('coordinates', 'upper_coordinates'):
+            value = [c.strip() for c in value.split(';') if c.strip()]
+        elif field in NUMERIC_FIELDS:
+            value = float(value) if any(c in value for c in '.eE') else int(value)
+        record[field] = value
+    return record
+
+
+def shape_call(record: dict, index: int = 0) -> tuple[str, tuple, dict]:
+    """
+    Converts a shape record into a call to a KmlPlus shape method.
+
+    Args:
+        record (dict): A shape record, see load_spec
+        index (int): Position of the record in its file, used in error messages
+
+    Returns:
+        method, args, kwargs (tuple[str, tuple, dict])
+
+    Raises:
+        ValueError: If the record's type is unknown or a required field is missing.
+    """
+    record = dict(record)
+    method = str(record.pop('type', '')).lower()
+    if method not in SHAPE_ARGUMENTS:
+        raise ValueError(f'Shape {index} has unknown type {method!r}. Expected one of {", ".join(SHAPE_ARGUMENTS)}')
+
+    if method == 'polyhedron' and 'upper_coordinates' not in record:
+        record['upper_coordinates'] = record.get('coordinates')
+
+    args = []
+    for field in SHAPE_ARGUMENTS[method]:
+        if record.get(field) is None:
+            raise ValueError(f'Shape {index} ({method}) is missing {field}')
+        value = record.pop(field)
+        args.append([value] if field.endswith('coordinates') and isinstance(value, str) else value)
+
+    return method, tuple(args), record
+
+
+def build(spec: str, output: str, **kwargs: Union[int, str, bool, None]) -> StageTimer:
+    """
+    Builds a .kml or .kmz document from a shape specification file.
+
+    Args:
+        spec (str): Location of the shape specification, see load_spec
+        output (str): Location to save the document. A name ending .kmz is saved as a KMZ archive.
+
+    Keyword Args:
+        jobs (int): Number of worker processes computing geometry. Defaults to 1, building serially in this process.
+            Otherwise shapes are built by a Pipeline and the time worked by each of its stages is recorded.
+        threads (bool): Whether the pipeline's geometry workers are threads rather than processes. Defaults to False.
+        precision (int): Decimal places to round output coordinates to
+        cache_dir (str): Directory for a persistent geometry cache
+        manifest (str): Path to a build manifest
+        progress (Callable): Called with a ProgressReport at most once a second while shapes are added, and after
+            saving. The report's total is the number of shapes in the specification.
+
+    Returns:
+        timer (StageTimer): The time spent in each stage of the build.
+    """
+    timer = StageTimer()
+    jobs = kwargs.get('jobs', 1)
+
+    timer.start('load')
+    calls = [shape_call(record, i) for i, record in enumerate(load_spec(spec))]
+    kml = KmlPlus(file_name=output, autosave=False, precision=kwargs.get('precision', None),
+                  cache_dir=kwargs.get('cache_dir', None), manifest=kwargs.get('manifest', None),
+                  progress=kwargs.get('progress', None), expected_shapes=len(calls))
+
+    timer.start('build')
+    if jobs == 1:
+        for method, args, shape_kwargs in calls:
+            getattr(kml, method)(*args, **shape_kwargs)
+    else:
+        pipeline = Pipeline(kml, jobs=jobs, threads=kwargs.get('threads', False))
+        pipeline.run(calls)
+        for stage, seconds in pipeline.timings.items():
+            timer.detail(stage, seconds)
+
+    timer.start('save')
+    kml.save()
+    timer.stop()
+
+    return timer
+
+
+def print_progress(report) -> None:
+    """
+    Prints a ProgressReport to stderr as a single line.
+    """
+    eta = '-' if report.eta is None else f'{report.eta:.0f}s'
+    print(f'kmlplus: {report.shapes}/{report.total} shapes {report.vertices} vertices {report.bytes_written} bytes '
+          f'{report.shapes_per_second:.1f} shapes/s eta {eta}', file=sys.stderr, flush=True)
+
+
+def main(argv: Union[list[str], None] = None) -> int:
+    parser = argparse.ArgumentParser(prog='kmlplus', description='Build a KML document from a shape specification.')
+    parser.add_argument('spec', help='Shape specification file (.csv, .json, .yaml or .yml)')
+    parser.add_argument('-o', '--output', help='Output file. Defaults to the spec name with a .kml extension')
+    parser.add_argument('-j', '--jobs', type=int, default=1,
+                        help='Worker processes computing geometry in a pipelined build. 0 uses one per CPU. '
+                             'Defaults to 1, a serial build')
+    parser.add_argument('--threads', action='store_true',
+                        help='Compute geometry in worker threads rather than processes in a pipelined build')
+    parser.add_argument('--kmz', action='store_true', help='Save a zipped .kmz archive')
+    parser.add_argument('--precision', type=int, help='Decimal places to round output coordinates to')
+    parser.add_argument('--cache-dir', help='Directory for a persistent geometry cache shared between runs')
+    parser.add_argument('--manifest', help='Build manifest, so unchanged shapes are reused by later builds')
+    parser.add_argument('--profile', action='store_true', help='Print the time spent in each stage to stderr')
+    parser.add_argument('--progress', action='store_true',
+                        help='Print the shapes added, throughput and time remaining to stderr every second')
+    args = parser.parse_args(argv)
+
+    if args.jobs < 0:
+        parser.error('--jobs must be 0 or more')
+
+    output = args.output or os.path.splitext(args.spec)[0] + '.kml'
+    if args.kmz:
+        output = os.path.splitext(output)[0] + '.kmz'
+
+    try:
+        timer = build(args.spec, output, jobs=args.jobs or None, threads=args.threads, precision=args.precision,
+                      cache_dir=args.cache_dir, manifest=args.manifest,
+                      progress=print_progress if args.progress else None)
+    except (OSError, ValueError, ImportError) as e:
+        print(f'kmlplus: error: {e}', file=sys.stderr)
+        return 1
+
+    if args.profile:
+        print(timer.report(), file=sys.stderr)
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,151 @@
+from typing import Union
+
+import numpy as np
+
+from kmlplus.geodesic import wrap_longitude
+from kmlplus.interface import I3DObject
+from kmlplus.metrics import vertex_arrays
+
+
+class Footprint:
+    """
+    The horizontal boundary and altitude band of a volume, held as arrays ready for containment queries.
+
+    Args:
+        shape: A Cylinder or Polyhedron, or a 2D shape such as a Polygon or Circle which is treated as having an
+            unlimited altitude band.
+
+    Attributes:
+        xs (np.ndarray): Longitudes of the boundary, unwrapped so that it does not jump across the antimeridian
+        ys (np.ndarray): Latitudes of the boundary
+        floor (float): Lowest altitude of the volume in metres
+        ceiling (float): Highest altitude of the volume in metres
+        bounds (tuple): West, south, east and north limits of the unwrapped boundary
+    """
+    __slots__ = ('xs', 'ys', 'floor', 'ceiling', 'bounds')
+
+    def __init__(self, shape):
+        if isinstance(shape, I3DObject):
+            xs, ys = vertex_arrays(shape.lower_layer)
+            self.floor = min(p.z for p in shape.lower_layer.point_list)
+            self.ceiling = max(p.z for p in shape.upper_layer.point_list)
+        else:
+            xs, ys = vertex_arrays(shape)
+            self.floor, self.ceiling = -np.inf, np.inf
+
+        self.xs = xs[0] + wrap_longitude(xs - xs[0])
+        self.ys = ys
+        self.bounds = (self.xs.min(), self.ys.min(), self.xs.max(), self.ys.max())
+
+    def contains(self, lats, lons, alts=None) -> np.ndarray:
+        """
+        Tests whether points lie within the volume. Points on the floor or ceiling count as inside.
+
+        Args:
+            lats: Latitudes in decimal degrees
+            lons: Longitudes in decimal degrees
+            alts: Altitudes in metres. If omitted only the horizontal boundary is tested.
+
+        Returns:
+            mask (np.ndarray): A boolean for each point.
+        """
+        lats = np.asarray(lats, dtype=float)
+        lons = self.xs[0] + wrap_longitude(np.asarray(lons, dtype=float) - self.xs[0])
+
+        west, south, east, north = self.bounds
+        candidates = (lons >= west) & (lons <= east) & (lats >= south) & (lats <= north)
+        if alts is not None:
+            alts = np.asarray(alts, dtype=float)
+            candidates &= (alts >= self.floor) & (alts <= self.ceiling)
+
+        mask = np.zeros(lats.shape, dtype=bool)
+        index = np.flatnonzero(candidates)
+        if index.size:
+            mask.flat[index] = winding_number(self.xs, self.ys, lons.flat[index], lats.flat[index]) != 0
+        return mask
+
+
+def winding_number(xs: np.ndarray, ys: np.ndarray, px: np.ndarray, py: np.ndarray) -> np.ndarray:
+    """
+    Counts how many times a ring winds around each point, vectorized over the points. The ring may be open or closed.
+
+    Args:
+        xs (np.ndarray): Ring x values
+        ys (np.ndarray): Ring y values
+        px (np.ndarray): Point x values
+        py (np.ndarray): Point y values
+
+    Returns:
+        winding (np.ndarray): Winding number for each point. Zero for points outside the ring.
+    """
+    winding = np.zeros(px.shape, dtype=np.int64)
+    x2s, y2s = np.roll(xs, -1), np.roll(ys, -1)
+
+    for x1, y1, x2, y2 in zip(xs.tolist(), ys.tolist(), x2s.tolist(), y2s.tolist()):
+        if y1 == y2 and x1 == x2:
+            continue
+        is_left = (x2 - x1) * (py - y1) - (px - x1) * (y2 - y1)
+        if y1 <= y2:
+            winding += (y1 <= py) & (py < y2) & (is_left > 0)
+        else:
+            winding -= (y2 <= py) & (py < y1) & (is_left < 0)
+
+    return winding
+
+
+def contains(volume, lats, lons, alts=None) -> np.ndarray:
+    """
+    Tests whether points lie within a volume.
+
+    Args:
+        volume: A Cylinder, Polyhedron or Footprint
+        lats: Latitudes in decimal degrees
+        lons: Longitudes in decimal degrees
+        alts: Altitudes in metres. If omitted only the horizontal boundary is tested.
+
+    Returns:
+        mask (np.ndarray): A boolean for each point.
+    """
+    footprint = volume if isinstance(volume, Footprint) else Footprint(volume)
+    return footprint.contains(lats, lons, alts)
+
+
+def locate(volumes: list, lats, lons, alts=None, ids: Union[list, None] = None) -> np.ndarray:
+    """
+    Finds the volume containing each point. Where volumes overlap the first in the list is reported.
+
+    Args:
+        volumes (list): Cylinders, Polyhedra or Footprints
+        lats: Latitudes in decimal degrees
+        lons: Longitudes in decimal degrees
+        alts: Altitudes in metres. If omitted only the horizontal boundaries are tested.
+        ids (list): Identifier for each volume. Defaults to the volume's index in the list.
+
+    Returns:
+        matches (np.ndarray): The id of the volume containing each point, or -1 where no volume does. When ids are
+            given as strings, unmatched points are None.
+    """
+    if ids is None:
+        ids = list(range(len(volumes)))
+    elif len(ids) != len(volumes):
+        raise IndexError(f'Each volume requires an id. Volumes: {len(volumes)} ids: {len(ids)}')
+
+    lats = np.asarray(lats, dtype=float)
+    numeric = all(isinstance(i, (int, np.integer)) for i in ids)
+    matches = np.full(lats.shape, -1 if numeric else None, dtype=np.int64 if numeric else object)
+    unmatched = np.ones(lats.shape, dtype=bool)
+
+    lons = np.asarray(lons, dtype=float)
+    alts = None if alts is None else np.asarray(alts, dtype=float)
+
+    for volume_id, volume in zip(ids, volumes):
+        index = np.flatnonzero(unmatched)
+        if not index.size:
+            break
+        footprint = volume if isinstance(volume, Footprint) else Footprint(volume)
+        inside = footprint.contains(lats.flat[index], lons.flat[index],
+                                    None if alts is None else alts.flat[index])
+        matches.flat[index[inside]] = volume_id
+        unmatched.flat[index[inside]] = False
+
+    return matches
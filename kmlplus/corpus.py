@@ -0,0 +1,317 @@
+import argparse
+import csv
+import json
+import math
+import os
+import random
+import sys
+from typing import Iterator, Union
+
+# Fields of a CSV shape specification, see kmlplus.cli.load_spec
+CSV_FIELDS = ('type', 'coordinates', 'radius', 'radius_uom', 'sample', 'lower_layer', 'upper_layer', 'lower_layer_uom',
+              'upper_layer_uom', 'fol')
+
+# Share of each shape type in a corpus by default
+SHAPE_WEIGHTS = {'polyhedron': 0.5, 'cylinder': 0.35, 'circle': 0.1, 'linestring': 0.03, 'point': 0.02}
+
+# Metres per degree of latitude, used to place synthetic coordinates without solving geodesics
+METRES_PER_DEGREE = 111320.0
+
+
+def format_dd(lat: float, lon: float) -> str:
+    """
+    Returns:
+        coordinate (str): The location as a decimal degree coordinate string, e.g. '55.123456 -3.500000'
+    """
+    return f'{lat:.6f} {lon:.6f}'
+
+
+def format_dms(lat: float, lon: float) -> str:
+    """
+    Returns:
+        coordinate (str): The location as a DMS coordinate string to hundredths of a second, e.g.
+            '553124.00N 0045830.00W'
+    """
+    return f'{dms_component(lat, 2, "NS")} {dms_component(lon, 3, "EW")}'
+
+
+def dms_component(value: float, degree_digits: int, hemispheres: str) -> str:
+    hundredths = round(abs(value) * 360000)
+    degrees, remainder = divmod(hundredths, 360000)
+    minutes, seconds = divmod(remainder, 6000)
+    hemisphere = hemispheres[0] if value >= 0 else hemispheres[1]
+    return f'{degrees:0{degree_digits}d}{minutes:02d}{seconds // 100:02d}.{seconds % 100:02d}{hemisphere}'
+
+
+def format_arc(start: str, end: str, centre: str, direction: str, sample: Union[int, None] = None) -> str:
+    """
+    Returns:
+        arc (str): A curved segment string as accepted by PointFactory and split_segment_string.
+    """
+    arc = f'start={start}, end={end}, centre={centre}, direction={direction}'
+    return arc if sample is None else f'{arc}, sample={sample}'
+
+
+def offset(lat: float, lon: float, north: float, east: float) -> tuple[float, float]:
+    """
+    Moves a location by a distance in metres north and east on a local flat approximation of the Earth, which is close
+    enough for placing synthetic shapes.
+    """
+    return lat + north / METRES_PER_DEGREE, lon + east / (METRES_PER_DEGREE * math.cos(math.radians(lat)))
+
+
+class SyntheticCorpus:
+    """
+    Generates a reproducible mixture of shapes for benchmarking and soak testing, in the coordinate string formats
+    accepted by PointFactory. Polyhedra are laid out in strips of cells whose neighbours share an edge, using
+    identical coordinate strings for the shared vertices, and have arcs in both directions on their outer edges.
+    Cylinders and circles have varied radii, units and sample counts. Shapes are generated lazily, so a corpus of
+    millions of vertices is never held in memory.
+
+    Sizes are measured in vertices: the points in each layer of a polyhedron or cylinder after arcs are plotted, the
+    points of a circle or linestring and one per point.
+
+    Args:
+        seed (int): Seed for every random choice. The same seed and options always give the same shapes.
+
+    Keyword Args:
+        dms (float): Fraction of coordinates written in DMS rather than decimal degrees. Defaults to 0.5.
+        arcs (float): Fraction of the outer edges of polyhedra drawn as arcs. Defaults to 0.3.
+        weights (dict): Relative share of each shape type. Defaults to SHAPE_WEIGHTS.
+        bounds (tuple): South, north, west and east limits of the shapes in decimal degrees. Defaults to the British
+            Isles.
+    """
+    __slots__ = ('seed', 'dms', 'arcs', 'weights', 'bounds')
+
+    def __init__(self, seed: int = 0, **kwargs: Union[float, dict, tuple]):
+        self.seed = seed
+        self.dms = kwargs.get('dms', 0.5)
+        self.arcs = kwargs.get('arcs', 0.3)
+        self.weights = kwargs.get('weights', SHAPE_WEIGHTS)
+        self.bounds = kwargs.get('bounds', (50.0, 59.0, -8.0, 2.0))
+
+        if not any(self.weights.values()):
+            raise ValueError('At least one shape type must have a weight above 0.')
+
+    def records(self, vertices: int) -> Iterator[dict]:
+        """
+        Yields shape records, as read from a specification file by kmlplus.cli.load_spec, until at least the given
+        number of vertices have been generated.
+
+        Args:
+            vertices (int): Number of vertices to generate
+
+        Returns:
+            records (Iterator[dict])
+        """
+        rng = random.Random(self.seed)
+        kinds, weights = list(self.weights), list(self.weights.values())
+        generators = {'polyhedron': self.polyhedron_strip, 'cylinder': self.cylinder, 'circle': self.circle,
+                      'linestring': self.linestring, 'point': self.point}
+        total = 0
+        while total < vertices:
+            kind = rng.choices(kinds, weights)[0]
+            for record, count in generators[kind](rng):
+                yield record
+                total += count
+                if total >= vertices:
+                    return
+
+    def calls(self, vertices: int) -> Iterator[tuple]:
+        """
+        Yields the KmlPlus method name, args and kwargs of each shape. See records.
+
+        Returns:
+            calls (Iterator[tuple])
+        """
+        from kmlplus.cli import shape_call
+
+        for i, record in enumerate(self.records(vertices)):
+            yield shape_call(record, i)
+
+    def rings(self, vertices: int) -> Iterator[list[str]]:
+        """
+        Yields the coordinate lists of polyhedron layers, mixing DD, DMS and arcs, until at least the given number of
+        vertices have been generated. Useful for benchmarking parsing alone.
+
+        Returns:
+            rings (Iterator[list[str]])
+        """
+        rng = random.Random(self.seed)
+        total = 0
+        while total < vertices:
+            for record, count in self.polyhedron_strip(rng):
+                yield record['coordinates']
+                total += count // 2
+                if total >= vertices:
+                    return
+
+    def write(self, path: str, vertices: int) -> int:
+        """
+        Writes a shape specification file which kmlplus.cli.load_spec reads, in the format given by the file's
+        extension. Records are written as they are generated. Writing YAML requires PyYAML.
+
+        Args:
+            path (str): Location of a .csv, .json, .yaml or .yml file
+            vertices (int): Number of vertices to generate
+
+        Returns:
+            count (int): The number of shapes written.
+        """
+        extension = os.path.splitext(path)[1].lower()
+        if extension not in ('.csv', '.json', '.yaml', '.yml'):
+            raise ValueError(f'Unsupported shape specification format {extension}. Use .csv, .json or .yaml')
+        if extension in ('.yaml', '.yml'):
+            try:
+                import yaml
+            except ImportError:
+                raise ImportError('Writing YAML shape specifications requires PyYAML') from None
+
+        count = 0
+        with open(path, 'w', newline='' if extension == '.csv' else None) as f:
+            if extension == '.csv':
+                writer = csv.DictWriter(f, CSV_FIELDS)
+                writer.writeheader()
+                for count, record in enumerate(self.records(vertices), 1):
+                    writer.writerow(dict(record, coordinates=';'.join(record['coordinates'])))
+            elif extension == '.json':
+                f.write('[')
+                for count, record in enumerate(self.records(vertices), 1):
+                    f.write(',\n' if count > 1 else '\n')
+                    f.write(json.dumps(record))
+                f.write('\n]\n')
+            else:
+                for count, record in enumerate(self.records(vertices), 1):
+                    f.write(yaml.safe_dump([record], sort_keys=False, default_flow_style=None, width=1 << 16))
+                if not count:
+                    f.write('[]\n')
+        return count
+
+    def location(self, rng: random.Random) -> tuple[float, float]:
+        south, north, west, east = self.bounds
+        return rng.uniform(south, north), rng.uniform(west, east)
+
+    def coordinate(self, rng: random.Random, lat: float, lon: float) -> str:
+        return format_dms(lat, lon) if rng.random() < self.dms else format_dd(lat, lon)
+
+    def layers(self, rng: random.Random) -> dict:
+        lower = rng.choice((0, 500, 1500, 3500, 5500))
+        return {'lower_layer': lower, 'upper_layer': lower + rng.choice((1000, 2500, 6500)),
+                'lower_layer_uom': 'FT', 'upper_layer_uom': 'FT'}
+
+    def polyhedron_strip(self, rng: random.Random) -> Iterator[tuple[dict, int]]:
+        """
+        Generates a west to east strip of cells, each sharing its east edge with the next cell's west edge. Edges are
+        divided by intermediate vertices, and the north and south edges of each cell may be arcs bulging outwards.
+        Each ring is randomly clockwise or anticlockwise, so arcs are drawn in both directions.
+
+        Returns:
+            records (Iterator[tuple[dict, int]]): Each polyhedron's record and vertex count.
+        """
+        south, west = self.location(rng)
+        cells = rng.randint(1, 8)
+        width, height = rng.uniform(1000, 8000), rng.uniform(1000, 8000)
+        divisions = rng.randint(1, 6)
+        layers = self.layers(rng)
+
+        strings = {}
+
+        def position(column: float, row: float) -> str:
+            return self.coordinate(rng, *offset(south, west, row * height, column * width))
+
+        def vertex(column: int, row: int) -> str:
+            # Vertices are keyed by their integer step along the grid, never by a fraction which could round
+            # differently either side of an edge, so shared edges reuse exactly the same strings
+            key = (column, row)
+            if key not in strings:
+                strings[key] = position(column / divisions, row / divisions)
+            return strings[key]
+
+        inner = range(1, divisions)
+        for cell in range(cells):
+            left, right = cell * divisions, (cell + 1) * divisions
+            top = [vertex(left + i, divisions) for i in range(divisions + 1)]
+            bottom = [vertex(right - i, 0) for i in range(divisions + 1)]
+
+            # Clockwise from the south west corner. Arcs are (start, end, centre, sample) and include both ends.
+            ring = [vertex(left, i) for i in range(divisions)]
+            ring += self.cell_edge(rng, top, position(cell + 0.5, 1 - width / height))
+            ring += [vertex(right, divisions - i) for i in inner]
+            ring += self.cell_edge(rng, bottom[:-1], position(cell + 0.5, width / height), end=bottom[-1])
+
+            clockwise = rng.random() < 0.5
+            if not clockwise:
+                ring = [(item[1], item[0]) + item[2:] if isinstance(item, tuple) else item for item in ring[::-1]]
+
+            coordinates, count = [], 0
+            for item in ring:
+                if isinstance(item, tuple):
+                    start, end, centre, sample = item
+                    coordinates.append(format_arc(start, end, centre, 'clockwise' if clockwise else 'anticlockwise',
+                                                  sample))
+                    count += sample + 2
+                else:
+                    coordinates.append(item)
+                    count += 1
+
+            yield dict({'type': 'polyhedron', 'coordinates': coordinates}, **layers, fol=f'Strip {cell}'), 2 * count
+
+    def cell_edge(self, rng: random.Random, vertices: list[str], centre: str, end: Union[str, None] = None) -> list:
+        """
+        Returns an outer edge of a cell as its vertices, or as one arc about a centre from the first vertex to end,
+        which defaults to the last vertex.
+        """
+        if rng.random() >= self.arcs:
+            return vertices
+        return [(vertices[0], end or vertices[-1], centre, rng.choice((8, 16, 32, 64)))]
+
+    def cylinder(self, rng: random.Random) -> Iterator[tuple[dict, int]]:
+        lat, lon = self.location(rng)
+        radius_uom, radius = rng.choice((('NM', rng.uniform(0.5, 25)), ('KM', rng.uniform(1, 40)),
+                                         ('M', rng.uniform(200, 5000))))
+        sample = rng.choice((16, 32, 64, 100, 180, 360))
+        record = {'type': 'cylinder', 'coordinates': [self.coordinate(rng, lat, lon)], 'radius': round(radius, 3),
+                  'radius_uom': radius_uom, 'sample': sample}
+        yield dict(record, **self.layers(rng)), 2 * (sample + 1)
+
+    def circle(self, rng: random.Random) -> Iterator[tuple[dict, int]]:
+        lat, lon = self.location(rng)
+        radius_uom, radius = rng.choice((('NM', rng.uniform(0.5, 25)), ('M', rng.uniform(200, 5000))))
+        yield {'type': 'circle', 'coordinates': [self.coordinate(rng, lat, lon)], 'radius': round(radius, 3),
+               'radius_uom': radius_uom}, 101
+
+    def linestring(self, rng: random.Random) -> Iterator[tuple[dict, int]]:
+        lat, lon = self.location(rng)
+        coordinates = []
+        for _ in range(rng.randint(2, 50)):
+            coordinates.append(self.coordinate(rng, lat, lon))
+            lat, lon = offset(lat, lon, rng.uniform(-2000, 2000), rng.uniform(-2000, 2000))
+        yield {'type': 'linestring', 'coordinates': coordinates}, len(coordinates)
+
+    def point(self, rng: random.Random) -> Iterator[tuple[dict, int]]:
+        yield {'type': 'point', 'coordinates': [self.coordinate(rng, *self.location(rng))]}, 1
+
+
+def main(argv: Union[list[str], None] = None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m kmlplus.corpus',
+                                     description='Write a synthetic shape specification for load testing.')
+    parser.add_argument('output', help='Specification file to write (.csv, .json, .yaml or .yml)')
+    parser.add_argument('-n', '--vertices', type=int, default=10000, help='Vertices to generate. Defaults to 10000')
+    parser.add_argument('--seed', type=int, default=0, help='Seed for the random shapes. Defaults to 0')
+    parser.add_argument('--dms', type=float, default=0.5, help='Fraction of coordinates in DMS. Defaults to 0.5')
+    parser.add_argument('--arcs', type=float, default=0.3,
+                        help='Fraction of outer polyhedron edges drawn as arcs. Defaults to 0.3')
+    args = parser.parse_args(argv)
+
+    try:
+        count = SyntheticCorpus(args.seed, dms=args.dms, arcs=args.arcs).write(args.output, args.vertices)
+    except (OSError, ValueError, ImportError) as e:
+        print(f'kmlplus: error: {e}', file=sys.stderr)
+        return 1
+
+    print(f'{count} shapes written to {args.output}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
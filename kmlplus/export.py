@@ -0,0 +1,516 @@
+import json
+import os
+import struct
+import tempfile
+from array import array
+from typing import Union
+
+import numpy as np
+
+from kmlplus.geodesic import wrap_longitude
+from kmlplus.interface import I3DObject, ILocation
+from kmlplus.shapes import LineString
+
+# FlatGeobuf geometry types
+POINT = 1
+LINESTRING = 2
+POLYGON = 3
+MULTIPOLYGON = 6
+
+_GEOJSON_TYPES = {POINT: 'Point', LINESTRING: 'LineString', POLYGON: 'Polygon', MULTIPOLYGON: 'MultiPolygon'}
+
+# FlatGeobuf column types
+_BOOL = 2
+_LONG = 7
+_DOUBLE = 10
+_STRING = 11
+_JSON = 12
+
+_FGB_MAGIC = b'fgb\x03fgb\x00'
+_HILBERT_MAX = (1 << 16) - 1
+
+
+def shape_geometry(shape) -> tuple[int, list[tuple[np.ndarray, np.ndarray, np.ndarray]]]:
+    """
+    Reads the coordinates of a shape into arrays. Rings are closed and wound anticlockwise as GeoJSON recommends.
+    Cylinders and Polyhedra become a MultiPolygon of their lower and upper layers, from which the walls follow by
+    joining matching vertices.
+
+    Args:
+        shape: A Point, Circle, Polygon, LineString, Cylinder or Polyhedron
+
+    Returns:
+        geometry_type, parts (tuple[int, list]): The FlatGeobuf geometry type and an x, y, z tuple of arrays for each
+            ring or line.
+    """
+    if isinstance(shape, ILocation):
+        return POINT, [_coordinate_arrays([shape])]
+    if isinstance(shape, I3DObject):
+        return MULTIPOLYGON, [_ring(shape.lower_layer.point_list), _ring(shape.upper_layer.point_list)]
+
+    if isinstance(shape, LineString):
+        return LINESTRING, [_coordinate_arrays(shape.point_list)]
+    return POLYGON, [_ring(shape.point_list)]
+
+
+def _coordinate_arrays(points: list) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    xs = np.fromiter((p.x for p in points), dtype=float, count=len(points))
+    ys = np.fromiter((p.y for p in points), dtype=float, count=len(points))
+    zs = np.fromiter((p.z for p in points), dtype=float, count=len(points))
+    return xs, ys, zs
+
+
+def _ring(points: list) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    xs, ys, zs = _coordinate_arrays(points)
+    if xs[0] != xs[-1] or ys[0] != ys[-1]:
+        xs, ys, zs = np.append(xs, xs[0]), np.append(ys, ys[0]), np.append(zs, zs[0])
+
+    unwrapped = xs[0] + wrap_longitude(xs - xs[0])
+    if np.dot(unwrapped[:-1], ys[1:]) - np.dot(unwrapped[1:], ys[:-1]) < 0:
+        xs, ys, zs = xs[::-1], ys[::-1], zs[::-1]
+    return xs, ys, zs
+
+
+def volume_properties(shape) -> dict:
+    """
+    Returns:
+        properties (dict): The floor and ceiling in metres of a Cylinder or Polyhedron, otherwise an empty dict.
+    """
+    if not isinstance(shape, I3DObject):
+        return {}
+    return {'floor': min(p.z for p in shape.lower_layer.point_list),
+            'ceiling': max(p.z for p in shape.upper_layer.point_list)}
+
+
+class GeoJsonWriter:
+    """
+    Streams shapes to newline-delimited GeoJSON, one Feature per line. Each feature is written as soon as it is added
+    so memory use does not grow with the size of the export.
+
+    Args:
+        path (str): Location of the .geojsonl / .ndjson file
+
+    Keyword Args:
+        precision (int): Decimal places to round coordinates to. Defaults to full precision.
+
+    Usage:
+        with GeoJsonWriter('airspace.ndjson') as writer:
+            writer.write(Cylinder(...), name='Control Zone')
+    """
+    __slots__ = ('path', 'precision', '_file', 'count')
+
+    def __init__(self, path: str, **kwargs: int):
+        self.path = path
+        self.precision = kwargs.get('precision', None)
+        self._file = open(path, 'w', encoding='utf-8')
+        self.count = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def write(self, shape, **properties: Union[str, int, float, bool]) -> None:
+        """
+        Appends a shape to the file.
+
+        Args:
+            shape: A Point, Circle, Polygon, LineString, Cylinder or Polyhedron
+
+        Keyword Args:
+            Any JSON serialisable properties to attach to the feature, such as name.
+        """
+        geometry_type, parts = shape_geometry(shape)
+        coordinates = [self.positions(*part) for part in parts]
+
+        if geometry_type == POINT:
+            coordinates = coordinates[0][0]
+        elif geometry_type == LINESTRING:
+            coordinates = coordinates[0]
+        elif geometry_type == MULTIPOLYGON:
+            coordinates = [[ring] for ring in coordinates]
+
+        feature = {
+            'type': 'Feature',
+            'geometry': {'type': _GEOJSON_TYPES[geometry_type], 'coordinates': coordinates},
+            'properties': dict(volume_properties(shape), **properties)
+        }
+        self._file.write(json.dumps(feature, separators=(',', ':')))
+        self._file.write('\n')
+        self.count += 1
+
+    def positions(self, xs: np.ndarray, ys: np.ndarray, zs: np.ndarray) -> list[list[float]]:
+        coordinates = np.column_stack((xs, ys, zs))
+        if self.precision is not None:
+            coordinates = coordinates.round(self.precision)
+        return coordinates.tolist()
+
+    def close(self) -> None:
+        if not self._file.closed:
+            self._file.close()
+
+
+class FlatGeobufWriter:
+    """
+    Writes shapes to a FlatGeobuf file with a packed Hilbert R-tree spatial index. Features are encoded as they are
+    added and spooled to a temporary file beside the output, keeping only each feature's bounding box, offset and size
+    in memory. On close the features are ordered along a Hilbert curve, the index is built and the file is assembled.
+
+    Args:
+        path (str): Location of the .fgb file
+
+    Keyword Args:
+        name (str): Dataset name stored in the header. Defaults to the file name.
+        index_node_size (int): Number of children per index node. 0 writes no index and keeps the order features were
+            added in. Defaults to 16, which some readers, including GDAL, assume regardless of the header.
+
+    Usage:
+        with FlatGeobufWriter('airspace.fgb') as writer:
+            writer.write(Cylinder(...), name='Control Zone')
+    """
+    __slots__ = ('path', 'name', 'index_node_size', 'columns', 'geometry_types', '_spool', '_bounds', '_sizes',
+                 'count')
+
+    def __init__(self, path: str, **kwargs: Union[str, int]):
+        self.path = path
+        self.name = kwargs.get('name', os.path.splitext(os.path.basename(path))[0])
+        self.index_node_size = kwargs.get('index_node_size', 16)
+        if self.index_node_size == 1 or not 0 <= self.index_node_size <= 65535:
+            raise ValueError('index_node_size must be 0 or between 2 and 65535')
+
+        self.columns: dict = {}
+        self.geometry_types: set = set()
+        self._spool = tempfile.TemporaryFile(dir=os.path.dirname(os.path.abspath(path)))
+        self._bounds = array('d')
+        self._sizes = array('Q')
+        self.count = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc_info) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self._spool.close()
+
+    def write(self, shape, **properties: Union[str, int, float, bool]) -> None:
+        """
+        Encodes a shape and appends it to the spool.
+
+        Args:
+            shape: A Point, Circle, Polygon, LineString, Cylinder or Polyhedron
+
+        Keyword Args:
+            Properties to attach to the feature. Strings, integers, floats and booleans are stored in typed columns
+            and anything else as JSON. Columns are created in the order they first appear.
+        """
+        geometry_type, parts = shape_geometry(shape)
+        self.geometry_types.add(geometry_type)
+
+        if geometry_type == MULTIPOLYGON:
+            geometry = [None, None, None, None, None, None, ('B', MULTIPOLYGON),
+                        ('tables', [_geometry_fields(POLYGON, [part]) for part in parts])]
+        else:
+            geometry = _geometry_fields(geometry_type, parts)
+
+        encoded = _finish([('table', geometry), ('vector', 'B', self.encode_properties(
+            dict(volume_properties(shape), **properties)))])
+        self._spool.write(encoded)
+
+        xs = np.concatenate([part[0] for part in parts])
+        ys = np.concatenate([part[1] for part in parts])
+        self._bounds.extend((xs.min(), ys.min(), xs.max(), ys.max()))
+        self._sizes.append(len(encoded))
+        self.count += 1
+
+    def encode_properties(self, properties: dict) -> bytes:
+        encoded = bytearray()
+        for name, value in properties.items():
+            if value is None:
+                continue
+            if name not in self.columns:
+                self.columns[name] = (len(self.columns), _column_type(value))
+            index, column_type = self.columns[name]
+
+            encoded += struct.pack('<H', index)
+            if column_type == _BOOL and isinstance(value, bool):
+                encoded += struct.pack('<?', value)
+            elif column_type == _LONG and isinstance(value, int) and not isinstance(value, bool):
+                encoded += struct.pack('<q', value)
+            elif column_type == _DOUBLE and isinstance(value, (int, float)) and not isinstance(value, bool):
+                encoded += struct.pack('<d', value)
+            elif column_type == _STRING and isinstance(value, str):
+                text = value.encode('utf-8')
+                encoded += struct.pack('<I', len(text)) + text
+            elif column_type == _JSON:
+                text = json.dumps(value).encode('utf-8')
+                encoded += struct.pack('<I', len(text)) + text
+            else:
+                raise TypeError(f'Property {name} was first given as column type {column_type} and cannot store '
+                                f'{type(value).__name__}')
+        return bytes(encoded)
+
+    def close(self) -> None:
+        """
+        Builds the index and writes the finished file.
+        """
+        if self._spool.closed:
+            return
+
+        bounds = np.frombuffer(self._bounds, dtype=float).reshape(-1, 4)
+        sizes = np.frombuffer(self._sizes, dtype=np.uint64).astype(np.int64)
+        spool_offsets = np.concatenate(([0], np.cumsum(sizes)[:-1])).astype(np.int64)
+
+        if self.count and self.index_node_size:
+            order = hilbert_order(bounds)
+        else:
+            order = np.arange(self.count)
+
+        extent = [bounds[:, 0].min(), bounds[:, 1].min(), bounds[:, 2].max(), bounds[:, 3].max()] if self.count \
+            else None
+        geometry_type = next(iter(self.geometry_types)) if len(self.geometry_types) == 1 else 0
+
+        header = _finish([
+            ('string', self.name),
+            ('vector', 'd', extent) if extent else None,
+            ('B', geometry_type),
+            ('?', True),
+            None, None, None,
+            ('tables', [[('string', name), ('B', column_type)]
+                        for name, (_, column_type) in sorted(self.columns.items(), key=lambda c: c[1][0])]),
+            ('Q', self.count),
+            ('H', self.index_node_size),
+            ('table', [('string', 'EPSG'), ('i', 4326)])
+        ])
+
+        with open(self.path, 'wb') as f:
+            f.write(_FGB_MAGIC)
+            f.write(header)
+            if self.count and self.index_node_size:
+                offsets = np.concatenate(([0], np.cumsum(sizes[order])[:-1])).astype(np.uint64)
+                f.write(packed_rtree(bounds[order], offsets, self.index_node_size))
+
+            for i in order:
+                self._spool.seek(int(spool_offsets[i]))
+                f.write(self._spool.read(int(sizes[i])))
+
+        self._spool.close()
+
+
+def _geometry_fields(geometry_type: int, parts: list) -> list:
+    xs = np.concatenate([part[0] for part in parts])
+    ys = np.concatenate([part[1] for part in parts])
+    zs = np.concatenate([part[2] for part in parts])
+    ends = np.cumsum([len(part[0]) for part in parts]) if len(parts) > 1 else None
+    return [
+        ('vector', 'I', ends) if ends is not None else None,
+        ('vector', 'd', np.column_stack((xs, ys)).ravel()),
+        ('vector', 'd', zs),
+        None, None, None,
+        ('B', geometry_type)
+    ]
+
+
+def _column_type(value) -> int:
+    if isinstance(value, bool):
+        return _BOOL
+    if isinstance(value, int):
+        return _LONG
+    if isinstance(value, float):
+        return _DOUBLE
+    if isinstance(value, str):
+        return _STRING
+    return _JSON
+
+
+def hilbert_values(bounds: np.ndarray) -> np.ndarray:
+    """
+    Position of the centre of each bounding box along a 16 bit Hilbert curve covering the extent of all of them, as
+    used by FlatGeobuf to order features.
+
+    Args:
+        bounds (np.ndarray): An (n, 4) array of min x, min y, max x and max y
+
+    Returns:
+        values (np.ndarray): Hilbert value of each box.
+    """
+    min_x, min_y = bounds[:, 0].min(), bounds[:, 1].min()
+    width, height = bounds[:, 2].max() - min_x, bounds[:, 3].max() - min_y
+
+    x = np.zeros(len(bounds), dtype=np.uint32)
+    y = np.zeros(len(bounds), dtype=np.uint32)
+    if width:
+        x = np.floor(_HILBERT_MAX * ((bounds[:, 0] + bounds[:, 2]) / 2 - min_x) / width).astype(np.uint32)
+    if height:
+        y = np.floor(_HILBERT_MAX * ((bounds[:, 1] + bounds[:, 3]) / 2 - min_y) / height).astype(np.uint32)
+    return _hilbert(x, y)
+
+
+def hilbert_order(bounds: np.ndarray) -> np.ndarray:
+    """
+    Args:
+        bounds (np.ndarray): An (n, 4) array of min x, min y, max x and max y
+
+    Returns:
+        order (np.ndarray): Indices of the boxes in descending Hilbert order, boxes with equal values keeping their
+            order.
+    """
+    # Widened before negating, as negating the unsigned values would wrap 0 round to the largest
+    return np.argsort(-hilbert_values(bounds).astype(np.int64), kind='stable')
+
+
+def _hilbert(x: np.ndarray, y: np.ndarray) -> np.ndarray:
+    # Branch free Hilbert index of 16 bit x, y values
+    a = x ^ y
+    b = 0xFFFF ^ a
+    c = 0xFFFF ^ (x | y)
+    d = x & (y ^ 0xFFFF)
+
+    A = a | (b >> 1)
+    B = (a >> 1) ^ a
+    C = ((c >> 1) ^ (b & (d >> 1))) ^ c
+    D = ((a & (c >> 1)) ^ (d >> 1)) ^ d
+
+    for shift in (2, 4):
+        a, b, c, d = A, B, C, D
+        A = (a & (a >> shift)) ^ (b & (b >> shift))
+        B = (a & (b >> shift)) ^ (b & ((a ^ b) >> shift))
+        C = c ^ ((a & (c >> shift)) ^ (b & (d >> shift)))
+        D = d ^ ((b & (c >> shift)) ^ ((a ^ b) & (d >> shift)))
+
+    a, b, c, d = A, B, C, D
+    C = c ^ ((a & (c >> 8)) ^ (b & (d >> 8)))
+    D = d ^ ((b & (c >> 8)) ^ ((a ^ b) & (d >> 8)))
+
+    a = C ^ (C >> 1)
+    b = D ^ (D >> 1)
+
+    i0 = x ^ y
+    i1 = b | (0xFFFF ^ (i0 | a))
+
+    for shift, mask in ((8, 0x00FF00FF), (4, 0x0F0F0F0F), (2, 0x33333333), (1, 0x55555555)):
+        i0 = (i0 | (i0 << shift)) & mask
+        i1 = (i1 | (i1 << shift)) & mask
+
+    return (i1 << 1) | i0
+
+
+def packed_rtree(bounds: np.ndarray, offsets: np.ndarray, node_size: int) -> bytes:
+    """
+    Builds a FlatGeobuf packed R-tree over features which are already in Hilbert order. Levels are stored from the root
+    down to the leaves. Leaves point at the byte offset of their feature and parents at the index of their first child.
+
+    Args:
+        bounds (np.ndarray): An (n, 4) array of feature bounding boxes
+        offsets (np.ndarray): Byte offset of each feature from the start of the feature data
+        node_size (int): Number of children per node
+
+    Returns:
+        index (bytes)
+    """
+    levels = [(bounds, offsets.astype(np.uint64))]
+    count = len(bounds)
+    while True:
+        count = -(-count // node_size)
+        level_bounds, _ = levels[-1]
+        starts = np.arange(0, len(level_bounds), node_size)
+        levels.append((np.column_stack((
+            np.minimum.reduceat(level_bounds[:, 0], starts), np.minimum.reduceat(level_bounds[:, 1], starts),
+            np.maximum.reduceat(level_bounds[:, 2], starts), np.maximum.reduceat(level_bounds[:, 3], starts)
+        )), None))
+        if count == 1:
+            break
+
+    # Position of the first node of each level once stored root first
+    total = sum(len(level) for level, _ in levels)
+    level_starts = []
+    position = total
+    for level, _ in levels:
+        position -= len(level)
+        level_starts.append(position)
+
+    index = np.zeros(total, dtype=[('min_x', '<f8'), ('min_y', '<f8'), ('max_x', '<f8'), ('max_y', '<f8'),
+                                   ('offset', '<u8')])
+    for depth, (level, level_offsets) in enumerate(levels):
+        start = level_starts[depth]
+        nodes = index[start:start + len(level)]
+        nodes['min_x'], nodes['min_y'], nodes['max_x'], nodes['max_y'] = level.T
+        if level_offsets is not None:
+            nodes['offset'] = level_offsets
+        else:
+            nodes['offset'] = level_starts[depth - 1] + np.arange(len(level), dtype=np.uint64) * node_size
+
+    return index.tobytes()
+
+
+def _finish(fields: list) -> bytes:
+    """
+    Encodes a table as a size prefixed FlatBuffer. Fields are given in schema order as None when absent, a struct
+    format and value for scalars, or ('string', str), ('vector', format, values), ('table', fields) and
+    ('tables', [fields, ...]) for referenced objects. Objects are laid out after the table which refers to them, with
+    alignment counted from the start of the size prefix.
+    """
+    buffer = bytearray(8)
+    root = _write_table(buffer, fields)
+    struct.pack_into('<II', buffer, 0, len(buffer) - 4, root - 4)
+    return bytes(buffer)
+
+
+def _pad(buffer: bytearray, alignment: int, extra: int = 0) -> None:
+    buffer += b'\x00' * (-(len(buffer) + extra) % alignment)
+
+
+def _write_table(buffer: bytearray, fields: list) -> int:
+    present = [(i, field) for i, field in enumerate(fields) if field is not None]
+    sizes = {i: 4 if field[0] in ('string', 'vector', 'table', 'tables') else struct.calcsize('<' + field[0])
+             for i, field in present}
+
+    layout = {}
+    inline_size = 4
+    for i, _ in sorted(present, key=lambda f: -sizes[f[0]]):
+        inline_size += -inline_size % sizes[i]
+        layout[i] = inline_size
+        inline_size += sizes[i]
+
+    _pad(buffer, 2)
+    vtable = len(buffer)
+    buffer += struct.pack(f'<HH{len(fields)}H', 4 + 2 * len(fields), inline_size,
+                          *(layout.get(i, 0) for i in range(len(fields))))
+    _pad(buffer, 8)
+    table = len(buffer)
+    buffer += bytes(inline_size)
+    struct.pack_into('<i', buffer, table, table - vtable)
+
+    for i, field in present:
+        position = table + layout[i]
+        kind = field[0]
+        if kind == 'string':
+            _pad(buffer, 4)
+            target = len(buffer)
+            text = field[1].encode('utf-8')
+            buffer += struct.pack('<I', len(text)) + text + b'\x00'
+        elif kind == 'vector':
+            if isinstance(field[2], bytes):
+                values = np.frombuffer(field[2], dtype=np.uint8)
+            else:
+                values = np.asarray(field[2], dtype='<' + field[1])
+            _pad(buffer, max(4, values.itemsize), 4)
+            target = len(buffer)
+            buffer += struct.pack('<I', len(values)) + values.tobytes()
+        elif kind == 'table':
+            target = _write_table(buffer, field[1])
+        elif kind == 'tables':
+            _pad(buffer, 4)
+            target = len(buffer)
+            buffer += struct.pack('<I', len(field[1])) + bytes(4 * len(field[1]))
+            for n, child in enumerate(field[1]):
+                slot = target + 4 + 4 * n
+                struct.pack_into('<I', buffer, slot, _write_table(buffer, child) - slot)
+        else:
+            struct.pack_into('<' + kind, buffer, position, field[1])
+            continue
+        struct.pack_into('<I', buffer, position, target - position)
+
+    return table
@@ -1,14 +1,21 @@
+import math
 from typing import Union
+from weakref import WeakValueDictionary
 
-from pyproj import Geod
-
+from kmlplus.cache import get_geometry_cache, canonical_key
 from kmlplus.interface import ILocation, ILocationFactory, ICurvedSegmentFactory, ICurvedSegment
-from kmlplus.util import dms_to_decimal, detect_coordinate_type, split_segment_string, convert_to_metres
+from kmlplus.tokenizer import CoordinateSyntaxError, parse_arc, parse_point
+from kmlplus.util import dms_to_decimal, convert_to_metres
+
+# Points are considered equal when their coordinates agree to these resolutions, roughly 0.1mm
+COORDINATE_RESOLUTION = 1e-9
+ELEVATION_RESOLUTION = 1e-4
 
 
 class Point(ILocation):
     """
-    A class for representing a coordinate using y, x, z representation.
+    A class for representing a coordinate using y, x, z representation. Points shared between shapes by intern_point
+    cannot be changed, as every shape, set and dict holding them would change too.
 
     Attributes:
         y (str): Latitude
@@ -18,9 +25,10 @@ class Point(ILocation):
         z (float): Elevation
         uom (str): Unit of measure for elevation. Defaults to Metres
     """
-    __slots__ = ('_y', '_x', '_z', 'uom')
+    __slots__ = ('_y', '_x', '_z', '_uom', 'shared')
 
     def __init__(self, y: Union[str, float], x: Union[str, float], **kwargs: Union[str, int, float]):
+        self.shared = False
         self.uom = kwargs.get('uom', 'M')
         self.y: Union[str, float] = y
         self.x: Union[str, float] = x
@@ -33,7 +41,40 @@ class Point(ILocation):
         return f'{__class__} x: {self.x} y: {self.y} z: {self.z}'
 
     def __eq__(self, other) -> bool:
-        return self.__str__ == other.__str__
+        if not isinstance(other, Point):
+            return NotImplemented
+        return self.key() == other.key()
+
+    def __hash__(self) -> int:
+        return hash(self.key())
+
+    def key(self) -> tuple[int, int, int]:
+        """
+        Quantises the coordinates so that points which differ only by floating point noise compare and hash equally.
+        Points lying either side of a quantisation boundary are not equal, however close they are.
+
+        Returns:
+            key (tuple[int, int, int]): The quantised y, x and z values.
+        """
+        return round(self._y / COORDINATE_RESOLUTION), round(self._x / COORDINATE_RESOLUTION), \
+            round(self._z / ELEVATION_RESOLUTION)
+
+    def check_unshared(self) -> None:
+        """
+        Raises:
+            AttributeError: If the point is shared between shapes.
+        """
+        if self.shared:
+            raise AttributeError('A shared Point cannot be changed. Create a new Point instead.')
+
+    @property
+    def uom(self) -> str:
+        return self._uom
+
+    @uom.setter
+    def uom(self, value: str) -> None:
+        self.check_unshared()
+        self._uom = value
 
     @property
     def y(self) -> Union[str, float]:
@@ -41,6 +82,7 @@ class Point(ILocation):
 
     @y.setter
     def y(self, value) -> None:
+        self.check_unshared()
         if isinstance(value, float):
             self._y = value
         else:
@@ -52,6 +94,7 @@ class Point(ILocation):
 
     @x.setter
     def x(self, value: float) -> None:
+        self.check_unshared()
         if isinstance(value, float):
             self._x = value
         else:
@@ -70,6 +113,7 @@ class Point(ILocation):
 
     @z.setter
     def z(self, value) -> None:
+        self.check_unshared()
         if isinstance(value, float):
             self._z = convert_to_metres(value, self.uom)
         else:
@@ -151,8 +195,9 @@ class Point(ILocation):
         Returns:
             A Point object at the declared bearing and distance from another Point object.
         """
-        g = Geod(ellps='WGS84')
-        p = g.fwd(point.x, point.y, az=bearing, dist=distance)
+        from kmlplus.geodesic import get_geodesic_backend
+
+        p = get_geodesic_backend().fwd(point.x, point.y, bearing, distance)
 
         return cls(p[1], p[0], z=kwargs.get('z', 0), uom=kwargs.get('uom', 'M'))
 
@@ -169,9 +214,10 @@ class Point(ILocation):
             distance (float): The distance between two points.
 
         """
-        g = Geod(ellps='WGS84')
-        geo_tup = g.inv(self.x, self.y, another_point.x, another_point.y)
-        # PyProj gives distance in metres
+        from kmlplus.geodesic import get_geodesic_backend
+
+        geo_tup = get_geodesic_backend().inv(self.x, self.y, another_point.x, another_point.y)
+        # Backends give distance in metres
         distance = geo_tup[2]
 
         return distance
@@ -186,8 +232,9 @@ class Point(ILocation):
         Returns:
             bearing (float): The bearing between two points
         """
-        g = Geod(ellps='WGS84')
-        geo_tup = g.inv(self.x, self.y, another_point.x, another_point.y)
+        from kmlplus.geodesic import get_geodesic_backend
+
+        geo_tup = get_geodesic_backend().inv(self.x, self.y, another_point.x, another_point.y)
         bearing = geo_tup[0]
         return bearing
 
@@ -201,8 +248,9 @@ class Point(ILocation):
         Returns:
             bearing (float): The inverse bearing between two points
         """
-        g = Geod(ellps='WGS84')
-        geo_tup = g.inv(self.x, self.y, another_point.x, another_point.y)
+        from kmlplus.geodesic import get_geodesic_backend
+
+        geo_tup = get_geodesic_backend().inv(self.x, self.y, another_point.x, another_point.y)
         bearing = geo_tup[1]
         return bearing
 
@@ -211,24 +259,270 @@ class Point(ILocation):
         return kml_tuple
 
 
+# Shared points, keyed by the string they were parsed from and by value. Entries are dropped once a point is no
+# longer referenced by any shape.
+_parsed_points = WeakValueDictionary()
+_interned_points = WeakValueDictionary()
+
+
+def point_from_token(token: tuple, z_override: Union[float, None] = None, uom: str = 'M') -> ILocation:
+    """
+    Creates a Point from a point token produced by kmlplus.tokenizer.
+
+    Args:
+        token (tuple): (POINT, latitude, longitude, z)
+        z_override (float | None): Elevation used in place of the token's
+        uom (str): Unit of measure of the elevation
+
+    Returns:
+        point (ILocation)
+    """
+    _, y, x, z = token
+    if z_override is not None:
+        z = z_override
+    return Point(y, x, z=0.0 if z is None else z, uom=uom)
+
+
+def coordinate_tuple(coordinate: Union[str, ILocation, tuple, list], z_override: Union[float, None] = None,
+                     uom: str = 'M') -> tuple[float, float, float]:
+    """
+    Converts a coordinate straight to a kml formatted x, y, z tuple without creating a Point, for adding many points
+    at once. Gives the same values as parsing the coordinate into a Point.
+
+    Args:
+        coordinate (str | ILocation | tuple | list): A coordinate string in DD or DMS, a parsed point, or a longitude,
+            latitude and optional elevation
+        z_override (float | None): Elevation used in place of the coordinate's
+        uom (str): Unit of measure of the elevation, other than that of a parsed point
+
+    Returns:
+        coordinate (tuple[float, float, float]): Longitude, latitude and elevation in metres
+
+    Raises:
+        CoordinateSyntaxError: If a string is not a valid coordinate.
+    """
+    if isinstance(coordinate, str):
+        _, y, x, z = parse_point(coordinate)
+    elif isinstance(coordinate, ILocation):
+        if z_override is None:
+            return coordinate.kml_friendly()
+        x, y, z = coordinate.x, coordinate.y, None
+    else:
+        x, y, z = coordinate[0], coordinate[1], coordinate[2] if len(coordinate) > 2 else None
+
+    if z_override is not None:
+        z = z_override
+    return float(x), float(y), convert_to_metres(0.0 if z is None else float(z), uom)
+
+
+def intern_point(point: ILocation) -> ILocation:
+    """
+    Returns the shared Point equal in value and uom to the one given, registering it if there is none yet. A
+    registered point is marked shared and can no longer be changed.
+
+    Args:
+        point (ILocation)
+
+    Returns:
+        point (ILocation)
+    """
+    key = (point.key(), point.uom)
+    interned = _interned_points.get(key)
+    if interned is None:
+        point.shared = True
+        _interned_points[key] = point
+        interned = point
+    return interned
+
+
+def densify_points(point_list: list[ILocation], max_spacing: float) -> list[ILocation]:
+    """
+    Inserts points along the geodesic between consecutive vertices wherever they are further apart than max_spacing,
+    so that long straight edges follow the curve of the earth rather than a chord. The inverse solution for every edge
+    and the forward solution for every inserted point are each made in a single batched call. Elevation is
+    interpolated linearly along each edge.
+
+    Args:
+        point_list (list[ILocation]): The vertices to densify
+        max_spacing (float): Maximum distance in metres between consecutive points
+
+    Returns:
+        point_list (list[ILocation]): The original vertices with the inserted points between them.
+    """
+    if max_spacing <= 0:
+        raise ValueError('Densification spacing must be greater than 0.')
+    if len(point_list) < 2:
+        return list(point_list)
+
+    from kmlplus.geodesic import get_geodesic_backend
+
+    backend = get_geodesic_backend()
+    starts, ends = point_list[:-1], point_list[1:]
+    azimuths, _, distances = backend.inv([p.x for p in starts], [p.y for p in starts],
+                                         [p.x for p in ends], [p.y for p in ends])
+
+    # Number of points to insert along each edge
+    inserts = [max(math.ceil(distance / max_spacing) - 1, 0) for distance in distances]
+    if not any(inserts):
+        return list(point_list)
+
+    lons, lats, edge_azimuths, edge_distances, zs = [], [], [], [], []
+    for start, end, azimuth, distance, count in zip(starts, ends, azimuths, distances, inserts):
+        for n in range(1, count + 1):
+            fraction = n / (count + 1)
+            lons.append(start.x)
+            lats.append(start.y)
+            edge_azimuths.append(azimuth)
+            edge_distances.append(distance * fraction)
+            zs.append(start.z + (end.z - start.z) * fraction)
+
+    xs, ys, _ = backend.fwd(lons, lats, edge_azimuths, edge_distances)
+
+    densified = []
+    position = 0
+    for start, count in zip(starts, inserts):
+        densified.append(start)
+        for n in range(position, position + count):
+            point = Point(ys[n], xs[n], z=zs[n])
+            point.uom = start.uom
+            densified.append(point)
+        position += count
+    densified.append(point_list[-1])
+
+    return densified
+
+
+def arc_coordinates(centre: ILocation, start_bearing: float, bearing_increment: float, distance: float,
+                    sample: int) -> list[tuple]:
+    """
+    Solves the x, y coordinates of points at a fixed distance from a centre, stepping the bearing by a fixed increment.
+    Short distances use the tangent plane fast path where its error is within tolerance. Results are read from, and
+    written to, the geometry cache when one is set.
+
+    Args:
+        centre (ILocation): The centre of the arc
+        start_bearing (float): Bearing of the first point from the centre
+        bearing_increment (float): Change in bearing between each point. Negative values step anticlockwise.
+        distance (float): Distance from the centre in metres
+        sample (int): Number of increments, giving sample + 1 points
+
+    Returns:
+        coordinates (list[tuple]): x, y pairs
+    """
+    return concentric_arc_coordinates(centre, start_bearing, bearing_increment, [distance], sample)[0]
+
+
+def concentric_arc_coordinates(centre: ILocation, start_bearing: float, bearing_increment: float,
+                               distances: list[float], sample: int) -> list[list[tuple]]:
+    """
+    Solves arcs of the same bearings at several distances from one centre, such as the rings of a frustum, in a single
+    batched call. See arc_coordinates and solve_arcs.
+
+    Args:
+        distances (list[float]): Distance of each arc from the centre in metres
+
+    Returns:
+        arcs (list[list[tuple]]): x, y pairs of the arc at each distance, in the order given.
+    """
+    return solve_arcs([(centre, start_bearing, bearing_increment, d, sample) for d in distances])
+
+
+def solve_arcs(arcs: list[tuple]) -> list[list[tuple]]:
+    """
+    Solves many arcs, about any number of centres, with one array call to the tangent plane fast path for the arcs
+    short enough to use it and one to the geodesic backend for the rest. Array calls to pyproj release the GIL, so
+    larger batches leave more of the work free to run in parallel threads. Arcs already in the geometry cache, solved
+    by the same backend and tangent plane tolerance, are not solved again and identical arcs are solved once.
+
+    Args:
+        arcs (list[tuple]): The centre, start bearing, bearing increment, distance and sample of each arc, as taken by
+            arc_coordinates
+
+    Returns:
+        arcs (list[list[tuple]]): x, y pairs of each arc, in the order given.
+    """
+    from kmlplus.geodesic import get_geodesic_backend, solver_key, tangent_plane_fwd, tangent_plane_limit
+
+    cache = get_geometry_cache()
+    keys = [(arc[0].y, arc[0].x) + tuple(arc[1:]) for arc in arcs]
+    solved = {}
+    if cache is not None:
+        solver = solver_key()
+        for key in keys:
+            if key not in solved:
+                coordinates = cache.get(canonical_key('arc', solver, *key))
+                if coordinates is not None:
+                    solved[key] = coordinates
+
+    missing = {key: arc for key, arc in zip(keys, arcs) if key not in solved}
+    limit = tangent_plane_limit()
+    for fast in (True, False):
+        batch = [(key, arc) for key, arc in missing.items() if (arc[3] <= limit) == fast]
+        if not batch:
+            continue
+
+        lons, lats, bearings, distances = [], [], [], []
+        for _, (centre, start_bearing, bearing_increment, distance, sample) in batch:
+            count = sample + 1
+            lons += [centre.x] * count
+            lats += [centre.y] * count
+            bearings += [start_bearing + bearing_increment * n for n in range(count)]
+            distances += [distance] * count
+
+        if fast:
+            xs, ys = tangent_plane_fwd(lons, lats, bearings, distances)
+            xs, ys = xs.tolist(), ys.tolist()
+        else:
+            xs, ys, _ = get_geodesic_backend().fwd(lons, lats, bearings, distances)
+
+        position = 0
+        for key, arc in batch:
+            count = arc[4] + 1
+            coordinates = list(zip(xs[position:position + count], ys[position:position + count]))
+            position += count
+            solved[key] = coordinates
+            if cache is not None:
+                cache.put(canonical_key('arc', solver, *key), coordinates)
+
+    return [solved[key] for key in keys]
+
+
+def arc_bearings(centre: ILocation, start: ILocation, end: ILocation) -> tuple[float, float, float]:
+    """
+    Solves the bearings from the centre of an arc to its start and end, and its radius, in one call.
+
+    Returns:
+        start_bearing, end_bearing, radius (tuple[float, float, float]): Bearings in degrees and the radius in metres.
+    """
+    from kmlplus.geodesic import get_geodesic_backend
+
+    azimuths, _, distances = get_geodesic_backend().inv([centre.x, centre.x], [centre.y, centre.y],
+                                                        [start.x, end.x], [start.y, end.y])
+    return float(azimuths[0]), float(azimuths[1]), float(distances[0])
+
+
 class PointFactory(ILocationFactory):
     """
     A class which interprets how to handle the coordinate strings provided. It deduces between DMS/DD and straight
     or curved lines.
 
     Args:
-        coordinate_list (list): A list of strings containing coordinates in DMS or DD
+        coordinate_list (list): A list of strings containing coordinates in DMS or DD. ILocations which have already
+            been parsed may be included and are used as they are, other than applying any z override.
 
     Keyword Args:
         z_override: A value with which to override all z values given in the string
+        densify (float): Maximum spacing in metres between consecutive points. Longer edges have points inserted along
+            the geodesic between their vertices. Defaults to None, no densification.
     """
 
-    __slots__ = ('_coordinate_list', 'z_override', 'uom')
+    __slots__ = ('_coordinate_list', 'z_override', 'uom', 'densify')
 
     def __init__(self, coordinate_list: list, **kwargs):
         self.z_override = kwargs.get('z', None)
         self.coordinate_list = coordinate_list
         self.uom = kwargs.get('uom', 'M')
+        self.densify = kwargs.get('densify', None)
 
     @property
     def coordinate_list(self) -> list[str]:
@@ -249,32 +543,69 @@ class PointFactory(ILocationFactory):
             point_list (list[ILocation]): A list of ILocation objects
         """
         point_list = self.populate_point_list()
+        if self.densify:
+            point_list = densify_points(point_list, self.densify)
         return point_list
 
     def populate_point_list(self) -> list[ILocation]:
         """
-        Deduces whether the string represents a single point or a curved segment.
+        Deduces whether the string represents a single point or a curved segment. The arcs of every curved segment in
+        the list are solved together in one batched call.
 
         Returns:
             point_list (list[ILocation])
         """
 
         def is_curved_segment(coordinate_string: str) -> bool:
-            if 'start=' in coordinate_string:
+            if '=' in coordinate_string:
                 return True
             else:
                 return False
 
+        items = []
+        segments = []
+        for index, i in enumerate(self.coordinate_list):
+            try:
+                if isinstance(i, ILocation):
+                    items.append(self.pass_through(i))
+                # Check if a curved segment
+                elif is_curved_segment(i):
+                    segment = CurvedSegmentFactory(i, z_override=self.z_override, uom=self.uom).process_segment()
+                    items.append(segment)
+                    segments.append(segment)
+                else:
+                    items.append(self.create_new_point(i))
+            except CoordinateSyntaxError as e:
+                e.item = index
+                raise
+
+        if not segments:
+            return items
+
+        arcs = iter(solve_arcs([segment.arc() for segment in segments]))
         point_list = []
-        for i in self.coordinate_list:
-            # Check if a curved segment
-            if is_curved_segment(i):
-                point_list += self.create_curved_segment(i)
+        for item in items:
+            if isinstance(item, ICurvedSegment):
+                point_list += item.get_points(next(arcs))
             else:
-                point_list.append(self.create_new_point(i))
+                point_list.append(item)
 
         return point_list
 
+    def pass_through(self, point: ILocation) -> ILocation:
+        """
+        Returns a point which has already been parsed, replacing its elevation if the factory has a z override.
+
+        Args:
+            point (ILocation): A parsed point
+
+        Returns:
+            point (ILocation)
+        """
+        if self.z_override is None:
+            return point
+        return Point(point.y, point.x, z=self.z_override, uom=self.uom)
+
     def create_curved_segment(self, i: str) -> list[ILocation]:
         curved_segment_points = CurvedSegmentFactory(i, z_override=self.z_override, uom=self.uom). \
             generate_segment()
@@ -282,7 +613,21 @@ class PointFactory(ILocationFactory):
         return curved_segment_points
 
     def create_new_point(self, i: str) -> ILocation:
-        point_obj = self.process_string(i)
+        """
+        Creates a point from a coordinate string. Strings which have been parsed before with the same z override and
+        uom, and points of equal value, return the same shared Point object. Shared points must not be modified.
+
+        Args:
+            i (str): A coordinate string in DD or DMS
+
+        Returns:
+            point (ILocation)
+        """
+        parse_key = (i, self.z_override, self.uom)
+        point_obj = _parsed_points.get(parse_key)
+        if point_obj is None:
+            point_obj = intern_point(self.process_string(i))
+            _parsed_points[parse_key] = point_obj
         return point_obj
 
     def process_string(self, coordinate_string: str) -> ILocation:
@@ -290,28 +635,14 @@ class PointFactory(ILocationFactory):
         Processes a single coordinate string as a single ILocation, ie - not a curved segment.
         Args:
             coordinate_string (str): A coordinate string in DD or DMS
-            coordinate_type (str): DD or DMS
 
         Returns:
             point (ILocation): An ILocation object
-        """
-        coordinate_type = detect_coordinate_type(coordinate_string)
-        type_dict = {'dd': 'from_decimal_degrees', 'dms': 'from_dms'}
-        split = coordinate_string.split(' ')
 
-        if coordinate_type == 'dd' or coordinate_type == 'dms':
-            func = getattr(Point, type_dict[coordinate_type])
-            if len(split) == 2:
-                point = self.process_x_y(split, func)
-            elif len(split) == 3:
-                point = self.process_x_y_z(split, func)
-            else:
-                raise IndexError('Coordinate strings should contain latitude and longitude or latitude, longitude'
-                                 'and height only.')
-        else:
-            raise ValueError('Coordinates must be Decimal Degrees (DD.ddddd) or Degrees Minutes Seconds (DDMMSS.dd).')
-
-        return point
+        Raises:
+            CoordinateSyntaxError: If the string is not a valid coordinate.
+        """
+        return point_from_token(parse_point(coordinate_string), self.z_override, self.uom)
 
     def process_x_y(self, split: list[str], func: callable) -> ILocation:
         """
@@ -373,59 +704,30 @@ class CurvedSegmentFactory(ICurvedSegmentFactory):
 
         Returns:
             segment (ICurvedSegment)
-        """
-        string_dict = split_segment_string(self.coordinate_string)
-        direction = string_dict.setdefault('direction', 'clockwise')
 
-        # Check coordinate type and process_points point objects
+        Raises:
+            CoordinateSyntaxError: If the string is not a valid curved segment.
+        """
+        _, clockwise, sample, start, end, centre = parse_arc(self.coordinate_string)
 
-        point_list = self.construct_point_list(string_dict)
+        kwargs = {'sample': sample, 'z': self.z_override, 'uom': self.uom}
+        if centre is not None:
+            kwargs['centre'] = self.create_point(centre)
 
-        if direction == 'anticlockwise':
-            # return an anticlockwise segment
-            segment = self.create_anticlockwise_segment(point_list, string_dict)
-        else:
-            segment = self.create_clockwise_segment(point_list, string_dict)
+        segment_class = ClockwiseCurvedSegment if clockwise else AnticlockwiseCurvedSegment
+        return segment_class(self.create_point(start), self.create_point(end), **kwargs)
 
-        return segment
-
-    def construct_point_list(self, string_dict: dict) -> list[ILocation]:
+    def create_point(self, token: tuple) -> ILocation:
         """
-        Creates each individual ILocation object in the segment.
+        Creates the shared Point for a point token of the segment.
+
         Args:
-            string_dict (dict): A dict containing start, end and other optional data for the curved segment.
+            token (tuple): A point token, see kmlplus.tokenizer
 
         Returns:
-            point_list (list[ILocation])
+            point (ILocation)
         """
-        if string_dict.get('centre') is not None:
-            point_list = PointFactory([f"{string_dict['start']}", f"{string_dict['end']}",
-                                       f"{string_dict.get('centre')}"], z=self.z_override,
-                                      uom=self.uom).process_coordinates()
-        else:
-            point_list = PointFactory([f"{string_dict['start']}", f"{string_dict['end']}"],
-                                      z=self.z_override, uom=self.uom).process_coordinates()
-        return point_list
-
-    def create_clockwise_segment(self, point_list: list, string_dict: dict) -> ICurvedSegment:
-        if string_dict.get('centre') is not None:
-            segment = ClockwiseCurvedSegment(point_list[0], point_list[1], centre=point_list[2],
-                                             sample=string_dict.get('sample', 100), z=self.z_override,
-                                             uom=self.uom)
-        else:
-            segment = ClockwiseCurvedSegment(point_list[0], point_list[1], sample=string_dict.get('sample', 100),
-                                             z=self.z_override, uom=self.uom)
-        return segment
-
-    def create_anticlockwise_segment(self, point_list: list, string_dict: dict) -> ICurvedSegment:
-        if string_dict.get('centre') is not None:
-            segment = AnticlockwiseCurvedSegment(point_list[0], point_list[1], centre=point_list[2],
-                                                 sample=string_dict.get('sample', 100), z=self.z_override,
-                                                 uom=self.uom)
-        else:
-            segment = AnticlockwiseCurvedSegment(point_list[0], point_list[1], sample=string_dict.get('sample', 100),
-                                                 z=self.z_override, uom=self.uom)
-        return segment
+        return intern_point(point_from_token(token, self.z_override, self.uom))
 
     def generate_segment(self) -> list[ILocation]:
         segment = self.process_segment()
@@ -438,7 +740,7 @@ class ClockwiseCurvedSegment(ICurvedSegment):
     """
     A class for creating curved segments in a clockwise direction.
     """
-    __slots__ = ('z', '_start', '_end', '_centre', '_sample', 'start_bearing', 'end_bearing', 'uom')
+    __slots__ = ('z', '_start', '_end', '_centre', '_sample', 'start_bearing', 'end_bearing', 'radius', 'uom')
 
     def __init__(self, start: ILocation, end: ILocation, **kwargs):
         self.z = kwargs.get('z', None)
@@ -447,8 +749,7 @@ class ClockwiseCurvedSegment(ICurvedSegment):
         self.uom = kwargs.get('uom', 'M')
         self.centre = kwargs.get('centre', self.find_midpoint())
         self.sample = kwargs.get('sample', 100)
-        self.start_bearing = self.find_start_bearing()
-        self.end_bearing = self.find_end_bearing()
+        self.start_bearing, self.end_bearing, self.radius = arc_bearings(self.centre, self.start, self.end)
 
     @property
     def start(self) -> ILocation:
@@ -537,27 +838,33 @@ class ClockwiseCurvedSegment(ICurvedSegment):
         bearing = self.centre.get_bearing(self.end)
         return bearing
 
-    def get_points(self) -> list:
+    def arc(self) -> tuple:
+        """
+        Returns:
+            arc (tuple): The centre, start bearing, bearing increment, radius and sample of the segment's arc, as taken
+                by arc_coordinates and solve_arcs.
+        """
+        return self.centre, self.start_bearing, self.get_bearing_increment(), self.radius, self.sample
+
+    def get_points(self, coordinates: Union[list[tuple], None] = None) -> list:
         """
         Creates the individual points of the segment
+
+        Args:
+            coordinates (list[tuple]): x, y pairs of the arc, if already solved with solve_arcs
+
         Returns:
             point_list (list[ILocation])
 
         """
-        bearing_inc = self.get_bearing_increment()
         height_inc = self.get_height_increment()
-        start_bearing = self.start_bearing
-        distance = self.centre.get_distance(self.start)
         point_list = []
 
-        for n in range(0, self.sample + 1):
+        for x, y in coordinates or arc_coordinates(*self.arc()):
             if self.z is None:
                 self.z = self.start.z
 
-            arc_point = Point.from_point_bearing_and_distance(self.centre, start_bearing, distance, z=self.z,
-                                                              uom=self.uom)
-            point_list.append(arc_point)
-            start_bearing += bearing_inc
+            point_list.append(Point(y, x, z=self.z, uom=self.uom))
             self.z += height_inc
 
         point_list.append(self.end)
@@ -595,7 +902,7 @@ class AnticlockwiseCurvedSegment(ICurvedSegment):
     """
     Creates an AnticlockwiseCurvedSegment. For documentation, see ClockwiseCurvedSegment.
     """
-    __slots__ = ('z', '_start', '_end', '_centre', '_sample', 'start_bearing', 'end_bearing', 'uom')
+    __slots__ = ('z', '_start', '_end', '_centre', '_sample', 'start_bearing', 'end_bearing', 'radius', 'uom')
 
     def __init__(self, start: ILocation, end: ILocation, **kwargs):
         self.start = start
@@ -604,8 +911,7 @@ class AnticlockwiseCurvedSegment(ICurvedSegment):
         self.uom = kwargs.get('uom', 'M')
         self.centre = kwargs.pop('centre', self.find_midpoint())
         self.sample = kwargs.pop('sample', 100)
-        self.start_bearing = self.find_start_bearing()
-        self.end_bearing = self.find_end_bearing()
+        self.start_bearing, self.end_bearing, self.radius = arc_bearings(self.centre, self.start, self.end)
 
     @property
     def start(self) -> ILocation:
@@ -666,23 +972,18 @@ class AnticlockwiseCurvedSegment(ICurvedSegment):
         bearing = self.centre.get_bearing(self.end)
         return bearing
 
-    def get_points(self) -> list:
-        # How many plots to point on the arc, default 100.
-        bearing_inc = self.get_bearing_increment()
-        height_inc = self.get_height_increment()
-        start_bearing = self.centre.get_bearing(self.start)
-        distance = self.centre.get_distance(self.start)
+    def arc(self) -> tuple:
+        return self.centre, self.start_bearing, -self.get_bearing_increment(), self.radius, self.sample
 
+    def get_points(self, coordinates: Union[list[tuple], None] = None) -> list:
+        height_inc = self.get_height_increment()
         point_list = []
 
-        for n in range(0, self.sample + 1):
+        for x, y in coordinates or arc_coordinates(*self.arc()):
             if self.z is None:
                 self.z = self.start.z
 
-            arc_point = Point.from_point_bearing_and_distance(self.centre, start_bearing, distance, z=self.z,
-                                                              uom=self.uom)
-            point_list.append(arc_point)
-            start_bearing -= bearing_inc
+            point_list.append(Point(y, x, z=self.z, uom=self.uom))
             self.z += height_inc
 
         point_list.append(self.end)
@@ -0,0 +1,384 @@
+import random
+import time
+from typing import Union
+
+import numpy as np
+
+from kmlplus.interface import IGeodesicBackend
+
+# WGS84 ellipsoid
+SEMI_MAJOR_AXIS = 6378137.0
+FLATTENING = 1 / 298.257223563
+ECCENTRICITY_SQUARED = FLATTENING * (2 - FLATTENING)
+
+
+class PyprojBackend(IGeodesicBackend):
+    """
+    Solves geodesics on the WGS84 ellipsoid with pyproj.Geod. Accurate to within a few nanometres.
+    """
+    name = 'pyproj'
+
+    __slots__ = ('geod',)
+
+    def __init__(self):
+        from pyproj import Geod
+        self.geod = Geod(ellps='WGS84')
+
+    def fwd(self, lons, lats, azimuths, distances) -> tuple:
+        return self.geod.fwd(lons, lats, azimuths, distances)
+
+    def inv(self, lons1, lats1, lons2, lats2) -> tuple:
+        return self.geod.inv(lons1, lats1, lons2, lats2)
+
+
+class GeographiclibBackend(IGeodesicBackend):
+    """
+    Solves geodesics on the WGS84 ellipsoid with geographiclib. Accurate to within a few nanometres.
+    """
+    name = 'geographiclib'
+
+    __slots__ = ('geodesic',)
+
+    def __init__(self):
+        from geographiclib.geodesic import Geodesic
+        self.geodesic = Geodesic.WGS84
+
+    def fwd(self, lons, lats, azimuths, distances) -> tuple:
+        def solve(lon, lat, azimuth, distance):
+            result = self.geodesic.Direct(lat, lon, azimuth, distance)
+            return result['lon2'], result['lat2'], back_azimuth(result['azi2'])
+
+        return broadcast(solve, lons, lats, azimuths, distances)
+
+    def inv(self, lons1, lats1, lons2, lats2) -> tuple:
+        def solve(lon1, lat1, lon2, lat2):
+            result = self.geodesic.Inverse(lat1, lon1, lat2, lon2)
+            return result['azi1'], back_azimuth(result['azi2']), result['s12']
+
+        return broadcast(solve, lons1, lats1, lons2, lats2)
+
+
+class SphericalBackend(IGeodesicBackend):
+    """
+    Solves geodesics on a sphere fitted to the ellipsoid at the start point, using vectorized NumPy trigonometry.
+
+    North-south displacements are scaled by the ratio of the meridional and prime vertical radii of curvature at the
+    start point, so the first order error of a pure sphere is removed. The remaining error grows with the square of
+    the distance; use benchmark_backends to check it against an error budget before relying on it over long ranges.
+    """
+    name = 'spherical'
+
+    __slots__ = ()
+
+    def fwd(self, lons, lats, azimuths, distances) -> tuple:
+        lon1, lat1, azimuth, distance = np.broadcast_arrays(*[np.radians(np.asarray(v, dtype=float)) if i < 3
+                                                             else np.asarray(v, dtype=float)
+                                                             for i, v in enumerate((lons, lats, azimuths, distances))])
+        meridional, prime_vertical = radii_of_curvature(lat1)
+        scale = prime_vertical / meridional
+
+        # Displacement on a sphere of the prime vertical radius, stretched north-south
+        north = distance * np.cos(azimuth) * scale
+        east = distance * np.sin(azimuth)
+        sphere_azimuth = np.arctan2(east, north)
+        delta = np.hypot(north, east) / prime_vertical
+
+        sin_lat1, cos_lat1 = np.sin(lat1), np.cos(lat1)
+        sin_lat2 = sin_lat1 * np.cos(delta) + cos_lat1 * np.sin(delta) * np.cos(sphere_azimuth)
+        lat2 = np.arcsin(np.clip(sin_lat2, -1, 1))
+        lon2 = lon1 + np.arctan2(np.sin(sphere_azimuth) * np.sin(delta) * cos_lat1, np.cos(delta) - sin_lat1 * sin_lat2)
+
+        back_sphere = sphere_bearing(lat2, lon2, lat1, lon1)
+        back = np.arctan2(np.sin(back_sphere), np.cos(back_sphere) / scale)
+
+        return like(lons, wrap_longitude(np.degrees(lon2))), like(lats, np.degrees(lat2)), \
+            like(azimuths, wrap_azimuth(np.degrees(back)))
+
+    def inv(self, lons1, lats1, lons2, lats2) -> tuple:
+        lon1, lat1, lon2, lat2 = np.broadcast_arrays(*[np.radians(np.asarray(v, dtype=float))
+                                                       for v in (lons1, lats1, lons2, lats2)])
+        meridional, prime_vertical = radii_of_curvature(lat1)
+        scale = prime_vertical / meridional
+
+        sin_half_lat = np.sin((lat2 - lat1) / 2)
+        sin_half_lon = np.sin((lon2 - lon1) / 2)
+        a = sin_half_lat ** 2 + np.cos(lat1) * np.cos(lat2) * sin_half_lon ** 2
+        delta = 2 * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+
+        forward_sphere = sphere_bearing(lat1, lon1, lat2, lon2)
+        back_sphere = sphere_bearing(lat2, lon2, lat1, lon1)
+
+        north = prime_vertical * delta * np.cos(forward_sphere) / scale
+        east = prime_vertical * delta * np.sin(forward_sphere)
+
+        forward = np.arctan2(east, north)
+        back = np.arctan2(np.sin(back_sphere), np.cos(back_sphere) / scale)
+
+        return like(lons1, np.degrees(forward)), like(lats1, wrap_azimuth(np.degrees(back))), \
+            like(lons2, np.hypot(north, east))
+
+
+# Worst case position error of the tangent plane solution, in metres, per square metre of distance from the centre.
+# Measured against pyproj between 80S and 80N.
+TANGENT_PLANE_ERROR = 1e-9
+
+_tangent_plane_tolerance = 0.01
+
+
+def set_tangent_plane_tolerance(tolerance: float) -> None:
+    """
+    Sets the largest position error, in metres, accepted from the tangent plane fast path used for small circles and
+    arcs. Pass 0 to always solve the full ellipsoidal geodesic.
+
+    Args:
+        tolerance (float): Acceptable error in metres. Defaults to 0.01
+    """
+    global _tangent_plane_tolerance
+    _tangent_plane_tolerance = float(tolerance)
+
+
+def get_tangent_plane_tolerance() -> float:
+    """
+    Returns:
+        tolerance (float): The largest position error, in metres, accepted from the tangent plane fast path.
+    """
+    return _tangent_plane_tolerance
+
+
+def tangent_plane_limit() -> float:
+    """
+    Returns:
+        distance (float): The largest radius, in metres, for which the tangent plane fast path is within tolerance.
+    """
+    return (_tangent_plane_tolerance / TANGENT_PLANE_ERROR) ** 0.5
+
+
+def solver_key() -> str:
+    """
+    Returns:
+        key (str): The name of the geodesic backend and the tangent plane limit in use, which together decide the
+            coordinates solved for any arc or ring. Part of every cache key for solved geometry.
+    """
+    return f'{get_geodesic_backend().name}:{tangent_plane_limit()!r}'
+
+
+def tangent_plane_fwd(lon, lat, azimuths, distance) -> tuple:
+    """
+    Solves the points at given distances and azimuths from a centre, or from one centre per azimuth. The points are
+    laid out in an azimuthal equidistant frame at their centre, whose scale is fitted to the ellipsoid's radii of
+    curvature there, and converted back to longitude and latitude in one vectorized step.
+
+    Args:
+        lon: Longitude of the centre, either one for every azimuth or one per azimuth
+        lat: Latitude of the centre, either one for every azimuth or one per azimuth
+        azimuths: Azimuths in degrees
+        distance: Distance from the centre in metres, either one for every azimuth or one per azimuth
+
+    Returns:
+        lons, lats (tuple[np.ndarray, np.ndarray])
+    """
+    lon, distance = np.asarray(lon, dtype=float), np.asarray(distance, dtype=float)
+    lat0 = np.radians(lat)
+    meridional, prime_vertical = radii_of_curvature(lat0)
+    sin_lat0, cos_lat0 = np.sin(lat0), np.cos(lat0)
+
+    # Frame coordinates, with north stretched onto a sphere of the prime vertical radius
+    azimuths = np.radians(np.asarray(azimuths, dtype=float))
+    north = np.cos(azimuths) * (distance * prime_vertical / meridional)
+    east = np.sin(azimuths) * distance
+
+    delta = np.hypot(north, east) / prime_vertical
+    sin_delta, cos_delta = np.sin(delta), np.cos(delta)
+    # sin and cos of the sphere azimuth, scaled by sin(delta)
+    radius = np.where(delta > 0, np.hypot(north, east), 1.0)
+    sin_lat = sin_lat0 * cos_delta + cos_lat0 * sin_delta * north / radius
+    lats = np.degrees(np.arcsin(np.clip(sin_lat, -1, 1)))
+    lons = lon + np.degrees(np.arctan2(sin_delta * east / radius * cos_lat0, cos_delta - sin_lat0 * sin_lat))
+
+    return wrap_longitude(lons), lats
+
+
+BACKENDS = {
+    'pyproj': PyprojBackend,
+    'geographiclib': GeographiclibBackend,
+    'spherical': SphericalBackend,
+}
+
+_backend = None
+
+
+def get_geodesic_backend() -> IGeodesicBackend:
+    """
+    Returns:
+        backend (IGeodesicBackend): The backend used for all geodesic calculations. Defaults to pyproj.
+    """
+    global _backend
+    if _backend is None:
+        _backend = PyprojBackend()
+    return _backend
+
+
+def set_geodesic_backend(backend: Union[IGeodesicBackend, str]) -> IGeodesicBackend:
+    """
+    Sets the backend used for all geodesic calculations.
+
+    Args:
+        backend (IGeodesicBackend | str): A backend instance or one of 'pyproj', 'geographiclib' or 'spherical'
+
+    Returns:
+        backend (IGeodesicBackend): The backend now in use.
+    """
+    global _backend
+    if isinstance(backend, str):
+        try:
+            backend = BACKENDS[backend.lower()]()
+        except KeyError:
+            raise ValueError(f'{backend} is not a geodesic backend. Accepted backends are '
+                             f'{", ".join(BACKENDS)}')
+    elif not isinstance(backend, IGeodesicBackend):
+        raise TypeError('Geodesic backends must be of type kmlplus.interface.IGeodesicBackend')
+
+    _backend = backend
+    return _backend
+
+
+def available_backends() -> list[IGeodesicBackend]:
+    """
+    Returns:
+        backends (list[IGeodesicBackend]): An instance of every backend whose dependencies are installed.
+    """
+    backends = []
+    for backend in BACKENDS.values():
+        try:
+            backends.append(backend())
+        except ImportError:
+            pass
+    return backends
+
+
+def benchmark_backends(**kwargs: Union[int, float]) -> list[dict]:
+    """
+    Measures the speed and accuracy of each available backend over a set of random sectors. Accuracy is measured as
+    the distance between each backend's forward solution and pyproj's.
+
+    Keyword Args:
+        max_distance (float): Longest sector to test, in metres. Defaults to 20 nautical miles.
+        sample (int): Number of sectors to solve. Defaults to 10000.
+        repeat (int): Number of timed runs per backend. The fastest is reported. Defaults to 3.
+        seed (int): Seed for the random sectors. Defaults to 0.
+
+    Returns:
+        results (list[dict]): Per backend 'name', 'backend', 'seconds' and 'max_error' (metres), fastest first.
+    """
+    max_distance = kwargs.get('max_distance', 20 * 1852)
+    sample = kwargs.get('sample', 10000)
+    repeat = kwargs.get('repeat', 3)
+    rng = random.Random(kwargs.get('seed', 0))
+
+    lons = np.array([rng.uniform(-180, 180) for _ in range(sample)])
+    lats = np.array([rng.uniform(-80, 80) for _ in range(sample)])
+    azimuths = np.array([rng.uniform(0, 360) for _ in range(sample)])
+    distances = np.array([rng.uniform(0, max_distance) for _ in range(sample)])
+
+    reference = PyprojBackend()
+    expected_lons, expected_lats, _ = reference.fwd(lons, lats, azimuths, distances)
+
+    results = []
+    for backend in available_backends():
+        seconds = float('inf')
+        for _ in range(repeat):
+            start = time.perf_counter()
+            result_lons, result_lats, _ = backend.fwd(lons, lats, azimuths, distances)
+            seconds = min(seconds, time.perf_counter() - start)
+
+        errors = reference.inv(expected_lons, expected_lats, np.asarray(result_lons), np.asarray(result_lats))[2]
+        results.append({'name': backend.name, 'backend': backend, 'seconds': seconds,
+                        'max_error': float(np.max(errors))})
+
+    return sorted(results, key=lambda r: r['seconds'])
+
+
+def select_backend(error_budget: float = 0.5, **kwargs: Union[int, float]) -> IGeodesicBackend:
+    """
+    Benchmarks the available backends and sets the fastest one whose error is within budget.
+
+    Args:
+        error_budget (float): Largest acceptable position error in metres. Defaults to 0.5.
+
+    Keyword Args:
+        See benchmark_backends.
+
+    Returns:
+        backend (IGeodesicBackend): The backend now in use.
+    """
+    for result in benchmark_backends(**kwargs):
+        if result['max_error'] <= error_budget:
+            return set_geodesic_backend(result['backend'])
+
+    return set_geodesic_backend(PyprojBackend())
+
+
+def radii_of_curvature(latitude):
+    """
+    Args:
+        latitude: Geodetic latitude in radians
+
+    Returns:
+        meridional, prime_vertical: Radii of curvature of the WGS84 ellipsoid in metres.
+    """
+    w = 1 - ECCENTRICITY_SQUARED * np.sin(latitude) ** 2
+    prime_vertical = SEMI_MAJOR_AXIS / np.sqrt(w)
+    meridional = prime_vertical * (1 - ECCENTRICITY_SQUARED) / w
+    return meridional, prime_vertical
+
+
+def sphere_bearing(lat1, lon1, lat2, lon2):
+    """
+    Initial great circle bearing, in radians, between points given in radians.
+    """
+    d_lon = lon2 - lon1
+    return np.arctan2(np.sin(d_lon) * np.cos(lat2),
+                      np.cos(lat1) * np.sin(lat2) - np.sin(lat1) * np.cos(lat2) * np.cos(d_lon))
+
+
+def wrap_longitude(longitude):
+    return (longitude + 180) % 360 - 180
+
+
+def wrap_azimuth(azimuth):
+    return (azimuth + 180) % 360 - 180
+
+
+def back_azimuth(azimuth: float) -> float:
+    """
+    Converts the forward azimuth at the end of a geodesic into the azimuth pointing back along it, as pyproj reports.
+    """
+    return wrap_azimuth(azimuth + 180)
+
+
+def like(template, values):
+    """
+    Returns values in the same form as the input, ie - a float for scalar input and a list for list or tuple input, in
+    line with pyproj.
+    """
+    if np.ndim(template) == 0 and np.ndim(values) == 0:
+        return float(values)
+    elif isinstance(template, np.ndarray):
+        return values
+    return np.asarray(values).tolist()
+
+
+def broadcast(solve: callable, *args) -> tuple:
+    """
+    Applies a scalar solver over arguments which may be scalars or sequences.
+    """
+    if all(np.ndim(a) == 0 for a in args):
+        return solve(*[float(a) for a in args])
+
+    arrays = np.broadcast_arrays(*[np.asarray(a, dtype=float) for a in args])
+    results = [solve(*values) for values in zip(*[a.ravel().tolist() for a in arrays])]
+    columns = [list(column) for column in zip(*results)] if results else [[], [], []]
+
+    if isinstance(args[0], np.ndarray):
+        return tuple(np.array(column) for column in columns)
+    return tuple(columns)
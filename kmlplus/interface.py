@@ -103,10 +103,6 @@ class I2DObject(ABC):
     def __iter__(self):
         pass
 
-    @abstractmethod
-    def __next__(self):
-        pass
-
     @abstractmethod
     def __getitem__(self, index):
         pass
@@ -188,3 +184,13 @@ class ICylinder(ABC):
     @abstractmethod
     def upper_radius(self):
         pass
+
+
+class IGeodesicBackend(ABC):
+    @abstractmethod
+    def fwd(self, lons, lats, azimuths, distances):
+        pass
+
+    @abstractmethod
+    def inv(self, lons1, lats1, lons2, lats2):
+        pass
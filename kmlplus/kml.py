@@ -1,9 +1,19 @@
-from typing import Union
-
-import simplekml
-
-from kmlplus.geo import PointFactory
+import os
+import tempfile
+import threading
+from array import array
+from collections.abc import Sized
+from contextlib import nullcontext
+from itertools import repeat
+from typing import Callable, Iterable, Union
+
+from kmlplus.cache import GeometryCache, get_geometry_cache, set_geometry_cache, using_geometry_cache
+from kmlplus.geo import PointFactory, coordinate_tuple
+from kmlplus.manifest import BuildManifest
+from kmlplus.placemarks import PointPlacemarks, TrackPlacemark, insert_blocks, insert_kmz_blocks, track_kind
+from kmlplus.progress import Progress
 from kmlplus.shapes import Polyhedron, Circle, Cylinder, LineString
+from kmlplus.tokenizer import CoordinateSyntaxError
 
 
 class KmlPlus:
@@ -12,6 +22,9 @@ class KmlPlus:
     Points, LineString, Circle, Cylinder, Polygon and Polyhedron shapes. Each invocation of a function will save and
     update the outputted .kml file.
 
+    A document may be shared by threads adding shapes concurrently. Each shape's geometry is computed in the calling
+    thread without holding a lock, and only appending it to the document, and any save, is serialised.
+
     Attributes:
         output_path (str): The location to save the created .kml file.
         save_name (str): The name to be given to the .kml file
@@ -20,12 +33,270 @@ class KmlPlus:
     Keyword Args:
         output_path (str): The location to save the created .kml file.
         save_name (str): Name for the new file
+        manifest (str): Path to a build manifest. When given, geometry generated for circles, cylinders and polyhedra
+            is stored against a hash of each shape's inputs and reused by later builds, so only changed shapes are
+            recomputed.
+        autosave (bool): Whether to save the file after every shape is added. Defaults to True. Set to False for large
+            builds and call save() once all shapes have been added.
+        cache_dir (str): Directory for a persistent geometry cache. Rings and arcs computed by this and any other run or
+            process using the same directory are reused instead of being solved again. The cache is only used for
+            this document's shapes; other documents and shapes use the cache set by set_geometry_cache.
+        precision (int): Decimal places to round output coordinates to. Defaults to full precision.
+        progress (Callable): Called with a ProgressReport of the shapes, vertices and bytes produced so far, the
+            current throughput and, if expected_shapes is given, the estimated time remaining. Called at most once per
+            progress_interval as shapes are added and after every save.
+        progress_interval (float): Minimum seconds between progress reports. Defaults to 1.0.
+        expected_shapes (int): Number of shapes the build will add, used to estimate the time remaining.
+        ordered (bool): Whether to append shapes in the order given by their order keyword argument rather than the
+            order in which threads finish computing them, so concurrent builds produce the same document. Orders
+            count up from 0. A shape which finishes early is held until every earlier shape has been appended.
+            Defaults to False.
+        pretty (bool): Whether to indent the saved file. Defaults to True. Indenting parses the whole document again
+            when saving, so set to False for documents of many thousands of shapes. The Placemarks written by points
+            and track are not indented.
     """
 
     def __init__(self, **kwargs):
+        import simplekml
+
         self.output_path = kwargs.get('output', None)
         self.save_name = kwargs.get('file_name', 'KmlPlus.kml')
         self.kml = simplekml.Kml()
+        self.autosave = kwargs.get('autosave', True)
+        self.bounds = None
+        self.model_count = 0
+        self.precision = kwargs.get('precision', None)
+        self.precomputed: dict = {}
+        # Holds the COLLADA files of models until they are packed into a .kmz
+        self._model_dir = None
+        self.pretty = kwargs.get('pretty', True)
+        # Styles and Placemarks added by points and track, keyed by the id of their folder in document order. They are
+        # rendered into their folders by save rather than held as simplekml objects.
+        self._blocks: dict = {}
+
+        self.lock = threading.RLock()
+        self.ordered = kwargs.get('ordered', False)
+        # Shapes waiting for an earlier order, keyed by order, and the order of the next shape to append
+        self._pending: dict = {}
+        self._next_order = 0
+
+        callback = kwargs.get('progress', None)
+        self.progress = Progress(callback, interval=kwargs.get('progress_interval', 1.0),
+                                 total=kwargs.get('expected_shapes', None)) if callback else None
+
+        manifest_path = kwargs.get('manifest', None)
+        self.manifest = BuildManifest(manifest_path) if manifest_path else None
+
+        cache_dir = kwargs.get('cache_dir', None)
+        self.cache = GeometryCache(os.path.join(cache_dir, 'geometry.sqlite')) if cache_dir else None
+
+    def save(self) -> None:
+        """
+        Saves the .kml file and, if one is in use, the build manifest. File names ending .kmz are saved as a zipped
+        KMZ archive.
+
+        Returns:
+            None
+        """
+        with self.lock:
+            if self.save_name.lower().endswith('.kmz'):
+                self.kml.savekmz(self.save_name, format=self.pretty)
+                if self._blocks:
+                    insert_kmz_blocks(self.save_name, self._blocks)
+            else:
+                with open(self.save_name, 'w', encoding='utf-8', newline='') as f:
+                    f.write(insert_blocks(self.kml.kml(format=self.pretty), self._blocks))
+
+            if self.progress is not None:
+                self.progress.update(bytes_written=os.path.getsize(self.save_name), force=True)
+
+            if self.manifest is not None:
+                self.manifest.save()
+
+    def build_geometry(self, kind: str, builder: callable, *args, **kwargs):
+        """
+        Generates the geometry for a shape, reusing geometry computed by precompute or the result of a previous build
+        where the shape's inputs are unchanged.
+
+        Args:
+            kind (str): The type of shape, used as part of the manifest key
+            builder (callable): Function which generates the geometry from args and kwargs
+
+        Returns:
+            geometry: The output of builder, either freshly computed or read from the manifest.
+        """
+        if self.manifest is None and not self.precomputed:
+            return self.round_coordinates(self.solve(builder, *args, **kwargs))
+
+        key = BuildManifest.shape_key(kind, *args, **kwargs)
+        with self.lock:
+            geometry = self.precomputed.pop(key, None)
+            if geometry is None and self.manifest is not None:
+                geometry = self.manifest.get(key)
+        if geometry is None:
+            geometry = self.solve(builder, *args, **kwargs)
+        if self.manifest is not None:
+            with self.lock:
+                self.manifest.put(key, geometry)
+
+        return self.round_coordinates(geometry)
+
+    def solve(self, function: Callable, *args, **kwargs):
+        """
+        Calls a geometry function with the document's geometry cache, if cache_dir was given, in use in the calling
+        thread.
+
+        Returns:
+            geometry: The output of function.
+        """
+        with using_geometry_cache(self.cache) if self.cache is not None else nullcontext():
+            return function(*args, **kwargs)
+
+    def precompute(self, calls: list[tuple], jobs: Union[int, None] = None, threads: bool = False) -> None:
+        """
+        Computes the geometry of many circles, cylinders and polyhedra in parallel workers ahead of adding them. Adding
+        the same shapes afterwards takes the precomputed geometry rather than solving it again, so only the document
+        is built serially.
+
+        Args:
+            calls (list[tuple]): The KmlPlus method name, args and kwargs of each shape
+            jobs (int): Number of workers. Defaults to the number of CPUs.
+            threads (bool): Whether to use a pool of threads rather than processes. Threads share this process's
+                memory and geometry cache, so nothing is pickled, and run in parallel while the geodesic backend
+                solves their arrays outside the GIL. Processes also run parsing and object creation in parallel.
+                Defaults to False.
+
+        Returns:
+            None
+        """
+        requests = {}
+        for method, args, kwargs in calls:
+            if method in GEOMETRY_BUILDERS:
+                geometry_args = geometry_kwargs(method, kwargs)
+                key = BuildManifest.shape_key(method, *args, **geometry_args)
+                if key not in self.precomputed and (self.manifest is None or key not in self.manifest):
+                    requests[key] = (method, args, geometry_args)
+        if not requests:
+            return
+
+        workers = jobs or os.cpu_count() or 1
+        if threads:
+            from concurrent.futures import ThreadPoolExecutor
+
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                geometry = list(executor.map(self.solve, repeat(compute_geometry), requests.values()))
+            with self.lock:
+                self.precomputed.update(zip(requests, geometry))
+            return
+
+        from concurrent.futures import ProcessPoolExecutor
+
+        chunksize = max(1, len(requests) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers, initializer=init_worker,
+                                 initargs=self.solve(worker_settings)) as executor:
+            geometry = executor.map(compute_geometry, requests.values(), chunksize=chunksize)
+            self.precomputed.update(zip(requests, geometry))
+
+    def round_coordinates(self, coordinates):
+        """
+        Rounds kml coordinate tuples, or nested lists and tuples of them, to the document's precision.
+        """
+        if self.precision is None:
+            return coordinates
+        return round_coordinates(coordinates, self.precision)
+
+    def autosave_file(self) -> None:
+        if self.autosave:
+            self.save()
+
+    def append(self, write: Callable, coordinates: list[tuple], vertices: int, order: Union[int, None] = None,
+               shapes: int = 1) -> None:
+        """
+        Appends a shape whose geometry has already been computed to the document. Called by each shape method, and
+        serialised so that only one thread modifies the document at a time.
+
+        Args:
+            write (Callable): Adds the shape's elements to the document
+            coordinates (list[tuple]): kml formatted tuples the shape covers, used to extend the document bounds
+            vertices (int): Number of vertices written for the shape, including those of any walls
+            order (int): Position of the shape in an ordered document
+            shapes (int): Number of shapes write adds, counted towards the progress reports. Defaults to 1.
+
+        Raises:
+            ValueError: If the document is ordered and the order is missing or has already been given.
+        """
+        with self.lock:
+            if not self.ordered:
+                self.write_shape(write, coordinates, vertices, shapes)
+                return
+
+            if order is None:
+                raise ValueError('Shapes added to an ordered document require an order')
+            if order < self._next_order or order in self._pending:
+                raise ValueError(f'A shape with order {order} has already been added')
+
+            self._pending[order] = (write, coordinates, vertices, shapes)
+            while self._next_order in self._pending:
+                # Moved past before writing, so a shape which fails to write does not hold back every later one
+                shape = self._pending.pop(self._next_order)
+                self._next_order += 1
+                self.write_shape(*shape)
+
+    def flush(self) -> int:
+        """
+        Appends the shapes of an ordered document still waiting for an earlier order which was never given, in order.
+
+        Returns:
+            count (int): Number of shapes appended.
+        """
+        with self.lock:
+            orders = sorted(self._pending)
+            for order in orders:
+                self.write_shape(*self._pending.pop(order))
+            if orders:
+                self._next_order = orders[-1] + 1
+            return len(orders)
+
+    def write_shape(self, write: Callable, coordinates: list[tuple], vertices: int, shapes: int = 1) -> None:
+        """
+        Adds a shape's elements to the document and extends its bounds. Must be called holding the lock.
+        """
+        write()
+        self.update_bounds(coordinates)
+        self.shape_added(vertices, shapes)
+
+    def shape_added(self, vertices: int, shapes: int = 1) -> None:
+        """
+        Called once each shape is in the document. Counts the shape towards the progress reports,
+        if a progress callback is registered, and saves the file if autosave is enabled.
+
+        Args:
+            vertices (int): Number of vertices written for the shape, including those of any walls
+            shapes (int): Number of shapes added. Defaults to 1.
+        """
+        if self.progress is not None:
+            self.progress.update(shapes, vertices)
+        self.autosave_file()
+
+    def update_bounds(self, coordinates: list[tuple]) -> None:
+        """
+        Extends the bounding box of the document to include the given kml coordinates.
+
+        Args:
+            coordinates (list[tuple]): kml formatted x, y, z tuples
+
+        Returns:
+            None
+        """
+        xs = [c[0] for c in coordinates]
+        ys = [c[1] for c in coordinates]
+        north, south, east, west = max(ys), min(ys), max(xs), min(xs)
+
+        if self.bounds is not None:
+            north, south = max(north, self.bounds[0]), min(south, self.bounds[1])
+            east, west = max(east, self.bounds[2]), min(west, self.bounds[3])
+
+        self.bounds = (north, south, east, west)
 
     def point(self, coordinate_list: list, **kwargs: str) -> None:
         """
@@ -42,29 +313,109 @@ class KmlPlus:
             colour_hex (str): String representing a colour hex
             extrude (int): 1 or 0, Whether to extrude the point
             altitude_mode (str): Accepts simplekml Altitude mode options
+            order (int): Position of the shape in an ordered document
 
 
         Returns:
             None
 
         """
-        if kwargs.get('altitude_mode') == 'relativetoground':
-            altitude_mode = simplekml.AltitudeMode.relativetoground
-        else:
-            altitude_mode = simplekml.AltitudeMode.absolute
+        altitude_mode = kml_altitude_mode(kwargs)
 
-        point = PointFactory(coordinate_list, z=kwargs.get('z', None),
-                             uom=kwargs.get('uom', 'M')).process_coordinates()
+        point = self.solve(PointFactory(coordinate_list, z=kwargs.get('z', None),
+                                        uom=kwargs.get('uom', 'M')).process_coordinates)
+        coords = self.round_coordinates([point[0].kml_friendly()])
 
-        fol = self.kml.newfolder(name=kwargs.get('fol', 'KmlPlus Point'))
+        def write():
+            fol = self.kml.newfolder(name=kwargs.get('fol', 'KmlPlus Point'))
 
-        pnt = fol.newpoint(name=kwargs.get('point_name', 'KmlPlus Point'))
-        pnt.coords = [(point[0].x, point[0].y, point[0].z)]
-        pnt.style.color = kwargs.get('colour_hex', '7Fc0c0c0')
-        pnt.extrude = kwargs.get('extrude', 0)
-        pnt.altitudemode = altitude_mode
+            pnt = fol.newpoint(name=kwargs.get('point_name', 'KmlPlus Point'))
+            pnt.coords = coords
+            pnt.style.color = kwargs.get('colour_hex', '7Fc0c0c0')
+            pnt.extrude = kwargs.get('extrude', 0)
+            pnt.altitudemode = altitude_mode
 
-        self.kml.save(self.save_name)
+        self.append(write, coords, 1, kwargs.get('order', None))
+
+    def points(self, coordinates: Iterable, **kwargs: Union[str, int, Iterable]) -> int:
+        """
+        Adds many points to a single folder at once. Coordinates are parsed straight to flat arrays and written as
+        plain Placemarks, without a Point or simplekml object per coordinate, so hundreds of thousands of points can
+        be added to one document. Points of the same colour share a single style.
+
+        Args:
+            coordinates (Iterable): Coordinate strings in DD or DMS, parsed points, or longitude, latitude and optional
+                elevation rows such as those of a numpy array. Elevations are to be given in uom.
+
+        Keyword Args:
+            fol (str): A string to name the folder in which the points are stored.
+            names (Iterable[str]): The name of each point. Defaults to point_name for every point.
+            point_name (str): Name given to every point when names is not given
+            colours (Iterable[str]): The colour hex of each point. Defaults to colour_hex for every point.
+            colour_hex (str): Colour hex of every point when colours is not given
+            z (float): The Z value for every point, in place of the coordinates' own.
+            uom (str): The unit of measurement for the Z values. Default is metres (M).
+            extrude (int): 1 or 0, Whether to extrude the points
+            altitude_mode (str): Accepts simplekml Altitude mode options
+            order (int): Position of the points in an ordered document
+
+        Returns:
+            count (int): Number of points added.
+
+        Raises:
+            CoordinateSyntaxError: If a coordinate string is invalid, giving its position in coordinates.
+            ValueError: If names or colours do not give one value per coordinate.
+        """
+        import simplekml
+
+        if hasattr(coordinates, 'tolist'):
+            coordinates = coordinates.tolist()
+        z_override, uom = kwargs.get('z', None), kwargs.get('uom', 'M')
+
+        flat = array('d')
+        for index, coordinate in enumerate(coordinates):
+            try:
+                flat.extend(coordinate_tuple(coordinate, z_override, uom))
+            except CoordinateSyntaxError as e:
+                e.item = index
+                raise
+        if self.precision is not None:
+            flat = array('d', [round(c, self.precision) for c in flat])
+        count = len(flat) // 3
+        if not count:
+            return 0
+
+        names = kwargs.get('names', None)
+        names = kwargs.get('point_name', 'KmlPlus Point') if names is None else [str(name) for name in names]
+        colours = kwargs.get('colours', None)
+        styles = None
+        if colours is None:
+            colours = [kwargs.get('colour_hex', '7Fc0c0c0')]
+        else:
+            style_index: dict = {}
+            styles = array('I', [style_index.setdefault(colour, len(style_index)) for colour in colours])
+            colours = list(style_index)
+        for label, values in (('names', names), ('colours', styles)):
+            if isinstance(values, Sized) and not isinstance(values, str) and len(values) != count:
+                raise ValueError(f'{label} gives {len(values)} values for {count} coordinates')
+
+        xs, ys = flat[0::3], flat[1::3]
+        corners = [(min(xs), min(ys), 0.0), (max(xs), max(ys), 0.0)]
+        altitude_mode = kml_altitude_mode(kwargs)
+
+        def write():
+            fol = self.kml.newfolder(name=kwargs.get('fol', 'KmlPlus Points'))
+            kml_styles = []
+            for colour in colours:
+                style = simplekml.Style()
+                style.iconstyle.color = colour
+                kml_styles.append(style)
+            self._blocks[fol.id] = kml_styles + [
+                PointPlacemarks(flat, names, [f'#{style.id}' for style in kml_styles], styles,
+                                extrude=kwargs.get('extrude', 0), altitude_mode=altitude_mode)]
+
+        self.append(write, corners, count, kwargs.get('order', None), shapes=count)
+        return count
 
     def linestring(self, coordinate_list: list, **kwargs: str) -> None:
         """
@@ -80,29 +431,91 @@ class KmlPlus:
             extrude (int): 1 or 0, Whether to extrude the point
             width(int): Line width
             altitude_mode(str): Accepts simplekml Altitude mode options
+            densify (float): Maximum spacing in metres between vertices. Longer edges are divided along the geodesic.
+            order (int): Position of the shape in an ordered document
 
 
         Returns:
             None
 
         """
-        fol = self.kml.newfolder(name=kwargs.get('name', 'KmlPlus LineString'))
+        linestring = self.solve(LineString, coordinate_list, densify=kwargs.get('densify', None))
 
-        linestring = LineString(coordinate_list)
+        altitude_mode = kml_altitude_mode(kwargs)
+        coords = self.round_coordinates([(p.x, p.y, p.z) for p in linestring])
 
-        if kwargs.get('altitude_mode') == 'relativetoground':
-            altitude_mode = simplekml.AltitudeMode.relativetoground
-        else:
-            altitude_mode = simplekml.AltitudeMode.absolute
+        def write():
+            fol = self.kml.newfolder(name=kwargs.get('name', 'KmlPlus LineString'))
 
-        s = fol.newlinestring(name=kwargs.get('linestring_name', 'KmlPlus Linestring'))
-        s.coords = [(p.x, p.y, p.z) for p in linestring]
-        s.style.color = kwargs.get('colour_hex', '7Fc0c0c0')
-        s.extrude = kwargs.get('extrude', 0)
-        s.style.linestyle.width = kwargs.get('width', 1)
-        s.altitudemode = altitude_mode
+            s = fol.newlinestring(name=kwargs.get('linestring_name', 'KmlPlus Linestring'))
+            s.coords = coords
+            s.style.color = kwargs.get('colour_hex', '7Fc0c0c0')
+            s.extrude = kwargs.get('extrude', 0)
+            s.style.linestyle.width = kwargs.get('width', 1)
+            s.altitudemode = altitude_mode
 
-        self.kml.save(self.save_name)
+        self.append(write, coords, len(coords), kwargs.get('order', None))
+
+    def track(self, fixes: Iterable[tuple], **kwargs: Union[str, int, float]) -> int:
+        """
+        Adds a flight or vehicle track from a stream of fixes, such as ADS-B reports. Fixes are decimated as they are
+        read and only those kept are held, in flat arrays, so a track of millions of fixes costs no more memory than
+        the vertices written. Use kmlplus.tracks.TrackWriter to stream tracks straight to a file instead.
+
+        Args:
+            fixes (Iterable[tuple]): Latitude, longitude, altitude and optional time of each fix, in order. Times may
+                be seconds since the Unix epoch, datetimes or ISO 8601 strings.
+
+        Keyword Args:
+            fol (str): A string to name the folder in which the track is stored.
+            track_name (str): String to name the track
+            kind (str): 'linestring' or 'track'. A gx:Track requires a time for every fix. Defaults to 'linestring'.
+            colour_hex (str): String representing a colour hex
+            width (int): Line width
+            extrude (int): 1 or 0, Whether to extrude a LineString
+            altitude_mode (str): Accepts simplekml Altitude mode options
+            order (int): Position of the shape in an ordered document
+            Decimation keyword arguments as for kmlplus.tracks.decimate, including uom for the altitudes.
+
+        Returns:
+            count (int): Number of fixes kept.
+
+        Raises:
+            ValueError: If kind is not 'linestring' or 'track', or a gx:Track fix has no time.
+        """
+        import simplekml
+
+        from kmlplus.tracks import decimate
+
+        kind = track_kind(kwargs.get('kind', 'linestring'))
+        coordinates, times = array('d'), array('d')
+        for x, y, z, time in decimate(fixes, **kwargs):
+            if time is None and kind == 'track':
+                raise ValueError('Every fix of a gx:Track requires a time')
+            coordinates.extend((x, y, z))
+            times.append(0.0 if time is None else time)
+        if self.precision is not None:
+            coordinates = array('d', [round(c, self.precision) for c in coordinates])
+        count = len(times)
+        if not count:
+            return 0
+
+        xs, ys = coordinates[0::3], coordinates[1::3]
+        corners = [(min(xs), min(ys), 0.0), (max(xs), max(ys), 0.0)]
+        altitude_mode = kml_altitude_mode(kwargs)
+
+        def write():
+            fol = self.kml.newfolder(name=kwargs.get('fol', 'KmlPlus Track'))
+            style = simplekml.Style()
+            style.linestyle.color = kwargs.get('colour_hex', '7Fc0c0c0')
+            style.linestyle.width = kwargs.get('width', 1)
+            self._blocks[fol.id] = [style, TrackPlacemark(kwargs.get('track_name', 'KmlPlus Track'),
+                                                          f'<styleUrl>#{style.id}</styleUrl>', coordinates, times,
+                                                          kind=kind, extrude=kwargs.get('extrude', 0),
+                                                          altitude_mode=altitude_mode)]
+
+        self.append(write, corners, count, kwargs.get('order', None))
+        return count
 
     def polyhedron(
             self,
@@ -128,53 +541,51 @@ class KmlPlus:
             outline (str): 1 or 0, whether to include outline of polygon
             extrude (str): 1 or 0, Whether to extrude the point
             altitude_mode (str): Accepts simplekml Altitude mode options
+            densify (float): Maximum spacing in metres between the vertices of each layer.
+            order (int): Position of the shape in an ordered document
 
         Returns:
             None
         """
-        poly = Polyhedron(
+        lower, upper, sides = self.build_geometry(
+            'polyhedron',
+            polyhedron_geometry,
             lower_coordinate_list,
             upper_coordinate_list,
-            lower_layer=kwargs.get('lower_layer', None),
-            upper_layer=kwargs.get('upper_layer', None),
-            lower_layer_uom=kwargs.get('lower_layer_uom', 'M'),
-            upper_layer_uom=kwargs.get('upper_layer_uom', 'M')
+            **geometry_kwargs('polyhedron', kwargs)
         )
 
-        lower, upper, sides = poly.to_kml()
-
-        fol = self.kml.newfolder(name=kwargs.get('fol', 'KmlPlus Polyhedron'))
-
-        if kwargs.get('altitude_mode') == 'relativetoground':
-            altitude_mode = simplekml.AltitudeMode.relativetoground
-        else:
-            altitude_mode = simplekml.AltitudeMode.absolute
-
-        lower_pol = fol.newpolygon(name=kwargs.get('lower_polygon_name', 'Lower Polygon'))
-        lower_pol.outerboundaryis = lower
-        lower_pol.polystyle.color = kwargs.get('colour_hex', '7Fc0c0c0')
-        lower_pol.polystyle.fill = kwargs.get('fill', 1)
-        lower_pol.style.polystyle.outline = kwargs.get('outline', 1)
-        lower_pol.extrude = kwargs.get('extrude', 0)
-        lower_pol.altitudemode = altitude_mode
-
-        upper_pol = fol.newpolygon(name=kwargs.get('upper_polygon_name', 'Upper Polygon'))
-        upper_pol.outerboundaryis = upper
-        upper_pol.polystyle.color = kwargs.get('colour_hex', '7Fc0c0c0')
-        upper_pol.polystyle.fill = kwargs.get('fill', 1)
-        upper_pol.style.polystyle.outline = kwargs.get('outline', 1)
-        upper_pol.extrude = kwargs.get('extrude', 0)
-        upper_pol.altitudemode = altitude_mode
-
-        for coords in sides:
-            side_pol = fol.newpolygon(name='KmlPlus Polygon')
-            side_pol.outerboundaryis = coords
-            side_pol.polystyle.color = kwargs.get('colour_hex', '7Fc0c0c0')
-            side_pol.polystyle.fill = kwargs.get('fill', 1)
-            side_pol.style.polystyle.outline = kwargs.get('outline', 1)
-            side_pol.altitudemode = altitude_mode
-
-        self.kml.save(self.save_name)
+        altitude_mode = kml_altitude_mode(kwargs)
+
+        def write():
+            fol = self.kml.newfolder(name=kwargs.get('fol', 'KmlPlus Polyhedron'))
+
+            lower_pol = fol.newpolygon(name=kwargs.get('lower_polygon_name', 'Lower Polygon'))
+            lower_pol.outerboundaryis = lower
+            lower_pol.polystyle.color = kwargs.get('colour_hex', '7Fc0c0c0')
+            lower_pol.polystyle.fill = kwargs.get('fill', 1)
+            lower_pol.style.polystyle.outline = kwargs.get('outline', 1)
+            lower_pol.extrude = kwargs.get('extrude', 0)
+            lower_pol.altitudemode = altitude_mode
+
+            upper_pol = fol.newpolygon(name=kwargs.get('upper_polygon_name', 'Upper Polygon'))
+            upper_pol.outerboundaryis = upper
+            upper_pol.polystyle.color = kwargs.get('colour_hex', '7Fc0c0c0')
+            upper_pol.polystyle.fill = kwargs.get('fill', 1)
+            upper_pol.style.polystyle.outline = kwargs.get('outline', 1)
+            upper_pol.extrude = kwargs.get('extrude', 0)
+            upper_pol.altitudemode = altitude_mode
+
+            for coords in sides:
+                side_pol = fol.newpolygon(name='KmlPlus Polygon')
+                side_pol.outerboundaryis = coords
+                side_pol.polystyle.color = kwargs.get('colour_hex', '7Fc0c0c0')
+                side_pol.polystyle.fill = kwargs.get('fill', 1)
+                side_pol.style.polystyle.outline = kwargs.get('outline', 1)
+                side_pol.altitudemode = altitude_mode
+
+        self.append(write, lower + upper, len(lower) + len(upper) + sum(len(side) for side in sides),
+                    kwargs.get('order', None))
 
     def circle(self, coordinate_list: list, radius: float, **kwargs: str) -> None:
         """
@@ -193,28 +604,27 @@ class KmlPlus:
             colour_hex (str): String representing a colour hex
             extrude (int): 1 or 0, Whether to extrude the point
             altitude_mode (str): Accepts simplekml Altitude mode options
+            order (int): Position of the shape in an ordered document
 
         Returns:
             None
 
         """
-        if kwargs.get('altitude_mode') == 'relativetoground':
-            altitude_mode = simplekml.AltitudeMode.relativetoground
-        else:
-            altitude_mode = simplekml.AltitudeMode.absolute
+        altitude_mode = kml_altitude_mode(kwargs)
 
-        points = Circle(coordinate_list, radius, radius_uom=kwargs.get('radius_uom', 'M'),
-                        uom=('uom', 'M')).process_points()
+        points = self.build_geometry('circle', circle_geometry, coordinate_list, radius,
+                                     **geometry_kwargs('circle', kwargs))
 
-        fol = self.kml.newfolder(name=kwargs.get('fol', 'KmlPlus Circle'))
+        def write():
+            fol = self.kml.newfolder(name=kwargs.get('fol', 'KmlPlus Circle'))
 
-        pol = fol.newpolygon(name=kwargs.get('name', 'KmlPlus Circle'))
-        pol.outerboundaryis = points
-        pol.polystyle.colour = kwargs.get('colour_hex', '7Fc0c0c0')
-        pol.extrude = kwargs.get('extrude', 0)
-        pol.altitudemode = altitude_mode
+            pol = fol.newpolygon(name=kwargs.get('name', 'KmlPlus Circle'))
+            pol.outerboundaryis = points
+            pol.polystyle.colour = kwargs.get('colour_hex', '7Fc0c0c0')
+            pol.extrude = kwargs.get('extrude', 0)
+            pol.altitudemode = altitude_mode
 
-        self.kml.save(self.save_name)
+        self.append(write, points, len(points), kwargs.get('order', None))
 
     def cylinder(self, coordinate_list: list, radius: float, **kwargs: Union[str, int]):
         """
@@ -223,6 +633,8 @@ class KmlPlus:
             coordinate_list: A list containing a single set of coordinates representing the centre of the circle
             radius: The radius of the circle
         Keyword Args:
+            upper_radius (float): The radius of the upper circle, in radius_uom. Defaults to radius. A different
+              radius gives a frustum, such as an approach funnel.
             lower_layer (float): Height/Altitude of the lower layer
             upper_layer (float): Height/Altitude of the upper layer
             lower_layer_uom (str): The unit of measurement of the lower layer z. Defaults to metres
@@ -238,55 +650,219 @@ class KmlPlus:
             fill (str): 1 or 0, whether or not to fill the polygon
             outline (str): 1 or 0, whether to include outline of polygon
             altitude_mode (str): Accepts simplekml Altitude mode options
+            order (int): Position of the shape in an ordered document
 
         Returns:
             None
         """
-        if kwargs.get('altitude_mode') == 'relativetoground':
-            altitude_mode = simplekml.AltitudeMode.relativetoground
-        else:
-            altitude_mode = simplekml.AltitudeMode.absolute
-
-        cylinder = Cylinder(
-            (
-                coordinate_list,
-                radius,
-            ),
-            (
-                coordinate_list,
-                radius,
-            ),
-            radius_uom=kwargs.get('radius_uom', 'M'),
-            lower_layer=kwargs.get('lower_layer', None),
-            upper_layer=kwargs.get('upper_layer', None),
-            lower_layer_uom=kwargs.get('lower_layer_uom', 'FT'),
-            upper_layer_uom=kwargs.get('upper_layer_uom', 'FT'),
-            sample=kwargs.get('sample', 100), uom=kwargs.get('uom', 'M'),
+        altitude_mode = kml_altitude_mode(kwargs)
+
+        lower, upper, sides = self.build_geometry(
+            'cylinder',
+            cylinder_geometry,
+            coordinate_list,
+            radius,
+            **geometry_kwargs('cylinder', kwargs)
         )
-        lower, upper, sides = cylinder.to_kml()
-
-        fol = self.kml.newfolder(name=kwargs.get('fol', 'KmlPlus Cylinder'))
-
-        lower_pol = fol.newpolygon(name=kwargs.get('lower_circle_name', 'KmlPlus Circle'))
-        lower_pol.outerboundaryis = lower
-        lower_pol.polystyle.color = kwargs.get('colour_hex', '7Fc0c0c0')
-        lower_pol.polystyle.fill = kwargs.get('fill', 1)
-        lower_pol.style.polystyle.outline = kwargs.get('outline', 1)
-        lower_pol.altitudemode = altitude_mode
-
-        upper_pol = fol.newpolygon(name=kwargs.get('upper_name', 'Upper Circle'))
-        upper_pol.outerboundaryis = upper
-        upper_pol.polystyle.color = kwargs.get('colour_hex', '7Fc0c0c0')
-        upper_pol.polystyle.fill = kwargs.get('fill', 1)
-        upper_pol.style.polystyle.outline = kwargs.get('outline', 1)
-        upper_pol.altitudemode = altitude_mode
-
-        for coords in sides:
-            side_pol = fol.newpolygon(name='A side')
-            side_pol.outerboundaryis = coords
-            side_pol.polystyle.color = kwargs.get('colour_hex', '7Fc0c0c0')
-            side_pol.polystyle.fill = kwargs.get('fill', 1)
-            side_pol.style.polystyle.outline = kwargs.get('outline', 1)
-            side_pol.altitudemode = altitude_mode
-
-        self.kml.save(self.save_name)
+
+        def write():
+            fol = self.kml.newfolder(name=kwargs.get('fol', 'KmlPlus Cylinder'))
+
+            lower_pol = fol.newpolygon(name=kwargs.get('lower_circle_name', 'KmlPlus Circle'))
+            lower_pol.outerboundaryis = lower
+            lower_pol.polystyle.color = kwargs.get('colour_hex', '7Fc0c0c0')
+            lower_pol.polystyle.fill = kwargs.get('fill', 1)
+            lower_pol.style.polystyle.outline = kwargs.get('outline', 1)
+            lower_pol.altitudemode = altitude_mode
+
+            upper_pol = fol.newpolygon(name=kwargs.get('upper_name', 'Upper Circle'))
+            upper_pol.outerboundaryis = upper
+            upper_pol.polystyle.color = kwargs.get('colour_hex', '7Fc0c0c0')
+            upper_pol.polystyle.fill = kwargs.get('fill', 1)
+            upper_pol.style.polystyle.outline = kwargs.get('outline', 1)
+            upper_pol.altitudemode = altitude_mode
+
+            for coords in sides:
+                side_pol = fol.newpolygon(name='A side')
+                side_pol.outerboundaryis = coords
+                side_pol.polystyle.color = kwargs.get('colour_hex', '7Fc0c0c0')
+                side_pol.polystyle.fill = kwargs.get('fill', 1)
+                side_pol.style.polystyle.outline = kwargs.get('outline', 1)
+                side_pol.altitudemode = altitude_mode
+
+        self.append(write, lower + upper, len(lower) + len(upper) + sum(len(side) for side in sides),
+                    kwargs.get('order', None))
+
+    def model(self, volume, **kwargs: str) -> None:
+        """
+        Adds a Cylinder or Polyhedron as a single KML Model rather than separate polygons for each layer and wall. The
+        volume is written as an indexed triangle mesh to a COLLADA file alongside the .kml, or only inside the archive
+        when saving a .kmz. Large scenes load and render far faster as models.
+
+        Args:
+            volume: A Cylinder or Polyhedron
+
+        Keyword Args:
+            fol (str): Name of the folder in which the KML objects are stored.
+            name (str): What to name the Model object
+            model_file (str): File name of the COLLADA model. Defaults to a numbered name unique to this document.
+            colour_hex (str): String representing a colour hex
+            order (int): Position of the shape in an ordered document
+
+        Returns:
+            None
+        """
+        import simplekml
+        from kmlplus.mesh import volume_mesh, write_dae
+
+        kmz = self.save_name.lower().endswith('.kmz')
+        with self.lock:
+            self.model_count += 1
+            model_number = self.model_count
+            if kmz and self._model_dir is None:
+                self._model_dir = tempfile.TemporaryDirectory()
+        mesh = volume_mesh(volume, name=kwargs.get('name', 'KmlPlus Model'),
+                           colour_hex=kwargs.get('colour_hex', '7Fc0c0c0'))
+
+        model_file = kwargs.get('model_file', f'kmlplus_model_{model_number}.dae')
+        model_path = os.path.join(self._model_dir.name if kmz else os.path.dirname(self.save_name), model_file)
+        write_dae(mesh, model_path)
+
+        lower, upper, _ = volume.to_kml()
+
+        def write():
+            if kmz:
+                href = self.kml.addfile(model_path)
+            else:
+                href = model_file
+
+            fol = self.kml.newfolder(name=kwargs.get('fol', 'KmlPlus Model'))
+            mod = fol.newmodel(name=kwargs.get('name', 'KmlPlus Model'))
+            mod.altitudemode = simplekml.AltitudeMode.absolute
+            mod.location = simplekml.Location(longitude=mesh.origin[0], latitude=mesh.origin[1],
+                                              altitude=mesh.origin[2])
+            mod.link = simplekml.Link(href=href)
+
+        self.append(write, lower + upper, len(mesh.vertices), kwargs.get('order', None))
+
+
+def kml_altitude_mode(kwargs: dict) -> str:
+    """
+    Returns:
+        altitude_mode (str): relativeToGround if requested by the altitude_mode keyword argument, otherwise absolute.
+    """
+    import simplekml
+
+    if kwargs.get('altitude_mode') == 'relativetoground':
+        return simplekml.AltitudeMode.relativetoground
+    return simplekml.AltitudeMode.absolute
+
+
+def polyhedron_geometry(lower_coordinate_list: list, upper_coordinate_list: list, **kwargs) -> tuple:
+    """
+    Generates the kml coordinates of a polyhedron. See KmlPlus.polyhedron for keyword arguments.
+
+    Returns:
+        lower, upper, sides (tuple[list, list, list]): Lists of kml formatted tuples.
+    """
+    return Polyhedron(lower_coordinate_list, upper_coordinate_list, **kwargs).to_kml()
+
+
+def circle_geometry(coordinate_list: list, radius: float, **kwargs) -> list[tuple]:
+    """
+    Generates the kml coordinates of a circle. See KmlPlus.circle for keyword arguments.
+
+    Returns:
+        circle (list[tuple]): A list of kml formatted tuples.
+    """
+    return [p.kml_friendly() for p in Circle(coordinate_list, radius, **kwargs).process_points()]
+
+
+def cylinder_geometry(coordinate_list: list, radius: float, **kwargs) -> tuple:
+    """
+    Generates the kml coordinates of a cylinder, or of a frustum if upper_radius is given, with the same centre at both
+    layers. See KmlPlus.cylinder for keyword arguments.
+
+    Returns:
+        lower, upper, sides (tuple[list, list, list]): Lists of kml formatted tuples.
+    """
+    return Cylinder((coordinate_list, radius), (coordinate_list, radius), **kwargs).to_kml()
+
+
+def geometry_kwargs(method: str, kwargs: dict) -> dict:
+    """
+    Selects the keyword arguments of a KmlPlus shape method which affect its geometry, filling in their defaults.
+
+    Args:
+        method (str): 'polyhedron', 'circle' or 'cylinder'
+        kwargs (dict): Keyword arguments given to the method
+
+    Returns:
+        kwargs (dict): Keyword arguments for the method's geometry function.
+    """
+    if method == 'polyhedron':
+        return {'lower_layer': kwargs.get('lower_layer', None), 'upper_layer': kwargs.get('upper_layer', None),
+                'lower_layer_uom': kwargs.get('lower_layer_uom', 'M'),
+                'upper_layer_uom': kwargs.get('upper_layer_uom', 'M'), 'densify': kwargs.get('densify', None)}
+    elif method == 'circle':
+        return {'radius_uom': kwargs.get('radius_uom', 'M'), 'uom': kwargs.get('uom', 'M')}
+    elif method == 'cylinder':
+        return {'radius_uom': kwargs.get('radius_uom', 'M'), 'upper_radius': kwargs.get('upper_radius', None),
+                'lower_layer': kwargs.get('lower_layer', None), 'upper_layer': kwargs.get('upper_layer', None),
+                'lower_layer_uom': kwargs.get('lower_layer_uom', 'FT'),
+                'upper_layer_uom': kwargs.get('upper_layer_uom', 'FT'), 'sample': kwargs.get('sample', 100),
+                'uom': kwargs.get('uom', 'M')}
+    raise ValueError(f'{method} has no geometry function')
+
+
+def compute_geometry(request: tuple):
+    """
+    Runs the geometry function for a shape. Run in a worker process or thread by KmlPlus.precompute.
+
+    Args:
+        request (tuple): The KmlPlus method name, args and geometry kwargs of the shape
+
+    Returns:
+        geometry: Kml formatted tuples as returned by the geometry function.
+    """
+    method, args, kwargs = request
+    return GEOMETRY_BUILDERS[method](*args, **kwargs)
+
+
+def worker_settings() -> tuple:
+    """
+    Returns:
+        settings (tuple): The geometry cache, geodesic backend and tangent plane tolerance in use, as initargs for
+            init_worker. Built in backends are passed by name and others as the instance.
+    """
+    from kmlplus.geodesic import BACKENDS, get_geodesic_backend, get_tangent_plane_tolerance
+
+    backend = get_geodesic_backend()
+    if type(backend) is BACKENDS.get(backend.name):
+        backend = backend.name
+    return get_geometry_cache(), backend, get_tangent_plane_tolerance()
+
+
+def init_worker(cache, backend, tolerance: float) -> None:
+    """
+    Initialises a worker process with the settings of the process that started it, as returned by worker_settings.
+    Workers started with the spawn or forkserver methods would otherwise import kmlplus afresh and solve geometry
+    with the default backend and tolerance.
+    """
+    from kmlplus.geodesic import set_geodesic_backend, set_tangent_plane_tolerance
+
+    set_geometry_cache(cache)
+    set_geodesic_backend(backend)
+    set_tangent_plane_tolerance(tolerance)
+
+
+def round_coordinates(coordinates, precision: int):
+    """
+    Rounds kml formatted tuples, or nested lists and tuples of them, to a number of decimal places.
+    """
+    if isinstance(coordinates, tuple) and all(isinstance(c, (int, float)) for c in coordinates):
+        return tuple(round(c, precision) for c in coordinates)
+    return type(coordinates)(round_coordinates(c, precision) for c in coordinates)
+
+
+GEOMETRY_BUILDERS = {'polyhedron': polyhedron_geometry, 'circle': circle_geometry, 'cylinder': cylinder_geometry}
@@ -0,0 +1,140 @@
+import hashlib
+import json
+import os
+from typing import Union
+
+
+class BuildManifest:
+    """
+    A persisted record of the geometry generated for each shape during a build. Shapes are keyed by a content hash of
+    their normalised inputs, so a later build over a largely unchanged dataset only recomputes the shapes whose inputs
+    have changed.
+
+    Args:
+        path (str): Location of the manifest file. It is created on the first save if it does not already exist.
+
+    Attributes:
+        hits (int): Number of shapes whose geometry was reused from the manifest.
+        misses (int): Number of shapes which had to be computed.
+    """
+    __slots__ = ('path', '_entries', '_used', 'hits', 'misses')
+
+    def __init__(self, path: str):
+        self.path = path
+        self._entries: dict = self.load()
+        self._used: set = set()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+
+    @staticmethod
+    def shape_key(kind: str, *args, **kwargs) -> str:
+        """
+        Creates a content hash from the normalised inputs of a shape, GEOMETRY_VERSION and the geodesic solver in use,
+        so geometry stored by an earlier version of kmlplus or another backend is not reused.
+
+        Args:
+            kind (str): The type of shape eg 'cylinder' or 'polyhedron'
+            *args: The positional inputs of the shape, ie - coordinate lists and radius
+
+        Keyword Args:
+            Any keyword argument which affects the generated geometry, ie - layers, units of measure and sample.
+
+        Returns:
+            key (str): A hex digest identifying the shape's inputs.
+        """
+        from kmlplus.cache import GEOMETRY_VERSION
+        from kmlplus.geodesic import solver_key
+
+        canonical = json.dumps([GEOMETRY_VERSION, solver_key(), kind, normalise(args), normalise(kwargs)],
+                               sort_keys=True, separators=(',', ':'))
+        return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+    def load(self) -> dict:
+        """
+        Reads the manifest from disk.
+
+        Returns:
+            entries (dict): Previously generated geometry keyed by shape hash. Empty if no manifest exists yet.
+        """
+        if not os.path.exists(self.path):
+            return {}
+
+        with open(self.path, 'r') as f:
+            try:
+                entries = json.load(f)
+            except ValueError:
+                # A truncated or corrupt manifest only costs a full rebuild
+                return {}
+
+        return {key: to_tuples(value) for key, value in entries.items()}
+
+    def get(self, key: str) -> Union[list, tuple, None]:
+        """
+        Retrieves previously generated geometry.
+
+        Args:
+            key (str): A shape hash created by shape_key
+
+        Returns:
+            geometry (list | tuple | None): The stored geometry or None if the shape has not been seen before.
+        """
+        geometry = self._entries.get(key)
+        if geometry is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self._used.add(key)
+        return geometry
+
+    def put(self, key: str, geometry: Union[list, tuple]) -> None:
+        self._entries[key] = geometry
+        self._used.add(key)
+
+    def save(self) -> None:
+        """
+        Writes the manifest to disk. Only entries used during this build are kept, so shapes which have been removed
+        from the source data do not accumulate in the manifest.
+        """
+        entries = {key: self._entries[key] for key in self._used}
+        tmp_path = f'{self.path}.tmp'
+
+        with open(tmp_path, 'w') as f:
+            json.dump(entries, f, separators=(',', ':'))
+
+        os.replace(tmp_path, self.path)
+
+
+def normalise(value):
+    """
+    Normalises shape inputs so that cosmetic differences, such as whitespace within a coordinate string or the case of
+    a unit of measure, do not produce a different hash.
+    """
+    if isinstance(value, str):
+        return ' '.join(value.split()).upper()
+    elif isinstance(value, bool) or value is None:
+        return value
+    elif isinstance(value, (int, float)):
+        return float(value)
+    elif isinstance(value, dict):
+        return {key: normalise(item) for key, item in value.items()}
+    elif isinstance(value, (list, tuple)):
+        return [normalise(item) for item in value]
+    else:
+        return str(value)
+
+
+def to_tuples(value):
+    """
+    Restores kml coordinate tuples from their JSON representation, where tuples are stored as lists.
+    """
+    if isinstance(value, list):
+        if value and all(isinstance(item, (int, float)) for item in value):
+            return tuple(value)
+        return [to_tuples(item) for item in value]
+    return value
@@ -0,0 +1,236 @@
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import tracemalloc
+from typing import Iterable, Union
+
+from kmlplus.geodesic import get_geodesic_backend
+from kmlplus.kml import KmlPlus
+
+
+def synthetic_cylinders(count: int, seed: int = 0) -> list[tuple]:
+    """
+    Generates the KmlPlus calls for a reproducible set of cylinders scattered over the British Isles, with radii of
+    0.5 to 10 nautical miles and varied layers.
+
+    Args:
+        count (int): Number of cylinders
+        seed (int): Seed for the random centres, radii and layers. Defaults to 0.
+
+    Returns:
+        calls (list[tuple]): The KmlPlus method name, args and kwargs of each cylinder.
+    """
+    rng = random.Random(seed)
+    calls = []
+    for i in range(count):
+        centre = f'{rng.uniform(50.0, 59.0):.6f} {rng.uniform(-8.0, 2.0):.6f}'
+        lower = rng.choice((0, 500, 1500, 3500))
+        calls.append(('cylinder', ([centre], round(rng.uniform(0.5, 10.0), 2)),
+                      {'radius_uom': 'NM', 'lower_layer': lower, 'upper_layer': lower + rng.choice((1000, 2500, 6500)),
+                       'fol': f'Cylinder {i}'}))
+    return calls
+
+
+def peak_rss() -> Union[int, None]:
+    """
+    Returns:
+        rss (int | None): The largest resident set size of this process so far in bytes, or None where the platform
+            does not report it.
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return rss if sys.platform == 'darwin' else rss * 1024
+
+
+def module_name(filename: str, modules: dict) -> str:
+    """
+    Finds the module defining a source file, falling back to the file name for code which is not a loaded module.
+    """
+    return modules.get(os.path.normcase(os.path.abspath(filename)), filename)
+
+
+def allocations_by_module(snapshot: tracemalloc.Snapshot) -> dict:
+    """
+    Sums the live allocations in a tracemalloc snapshot by the module which made them, so Point objects are counted
+    against kmlplus.geo, Polygons against kmlplus.shapes and document elements against simplekml's modules.
+
+    Returns:
+        modules (dict): Bytes allocated by each module, largest first.
+    """
+    files = {}
+    for name, module in list(sys.modules.items()):
+        path = getattr(module, '__file__', None)
+        if path:
+            files[os.path.normcase(os.path.abspath(path))] = name
+
+    totals = {}
+    for stat in snapshot.statistics('filename'):
+        name = module_name(stat.traceback[0].filename, files)
+        totals[name] = totals.get(name, 0) + stat.size
+    return dict(sorted(totals.items(), key=lambda item: item[1], reverse=True))
+
+
+def measure_build(calls: list[tuple], output: Union[str, None] = None) -> dict:
+    """
+    Builds and saves a document while tracing memory allocations.
+
+    Args:
+        calls (list[tuple]): The KmlPlus method name, args and kwargs of each shape
+        output (str): Location to save the document. Defaults to a temporary file which is removed afterwards.
+
+    Returns:
+        result (dict): 'shapes' and 'vertices' written, 'build_peak' and 'save_peak', the most memory traced while
+            adding shapes and while saving, 'bytes_per_vertex', the larger peak divided by the vertices, 'peak_rss' of
+            the process and 'modules', the memory held by each module once every shape is added.
+    """
+    # Load the geodesic backend and build the first shape untraced, so the modules they import are not counted
+    get_geodesic_backend()
+    if calls:
+        method, args, kwargs = calls[0]
+        getattr(KmlPlus(autosave=False), method)(*args, **kwargs)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        kml = KmlPlus(file_name=output or os.path.join(tmp, 'memory.kml'), autosave=False,
+                      progress=lambda report: None, progress_interval=float('inf'))
+
+        tracing = tracemalloc.is_tracing()
+        if not tracing:
+            tracemalloc.start()
+        try:
+            tracemalloc.reset_peak()
+            baseline = tracemalloc.get_traced_memory()[0]
+            for method, args, kwargs in calls:
+                getattr(kml, method)(*args, **kwargs)
+            build_peak = tracemalloc.get_traced_memory()[1] - baseline
+            modules = allocations_by_module(tracemalloc.take_snapshot().filter_traces(
+                [tracemalloc.Filter(False, tracemalloc.__file__)]))
+
+            tracemalloc.reset_peak()
+            kml.save()
+            save_peak = tracemalloc.get_traced_memory()[1] - baseline
+        finally:
+            if not tracing:
+                tracemalloc.stop()
+
+    vertices = kml.progress.vertices
+    return {'shapes': kml.progress.shapes, 'vertices': vertices, 'build_peak': build_peak, 'save_peak': save_peak,
+            'bytes_per_vertex': max(build_peak, save_peak) / vertices if vertices else 0.0, 'peak_rss': peak_rss(),
+            'modules': modules}
+
+
+def memory_benchmark(sizes: Iterable[int] = (10, 100, 1000), **kwargs: Union[int, bool]) -> list[dict]:
+    """
+    Measures the memory used to build synthetic cylinder documents of increasing size. See measure_build.
+
+    Args:
+        sizes (Iterable[int]): Number of cylinders in each document. Defaults to 10, 100 and 1000.
+
+    Keyword Args:
+        seed (int): Seed for the synthetic cylinders. Defaults to 0.
+        isolate (bool): Whether to build each document in a fresh worker process, so each peak RSS belongs to one
+            size only. Defaults to True.
+
+    Returns:
+        results (list[dict]): The result of measure_build for each size, with its 'size'.
+    """
+    seed = kwargs.get('seed', 0)
+    results = []
+    for size in sizes:
+        calls = synthetic_cylinders(size, seed)
+        if kwargs.get('isolate', True):
+            from concurrent.futures import ProcessPoolExecutor
+
+            with ProcessPoolExecutor(max_workers=1) as executor:
+                result = executor.submit(measure_build, calls).result()
+        else:
+            result = measure_build(calls)
+        results.append(dict(result, size=size))
+    return results
+
+
+def check_regression(results: list[dict], **kwargs: Union[float, dict, None]) -> list[str]:
+    """
+    Compares the bytes per vertex of benchmark results against a fixed limit and against a previous run.
+
+    Keyword Args:
+        max_bytes_per_vertex (float): Largest acceptable bytes per vertex at any size
+        baseline (dict): Bytes per vertex keyed by size from a previous run
+        tolerance (float): Fraction by which bytes per vertex may exceed the baseline. Defaults to 0.1.
+
+    Returns:
+        failures (list[str]): A description of each regression. Empty if there are none.
+    """
+    limit = kwargs.get('max_bytes_per_vertex', None)
+    baseline = kwargs.get('baseline', None) or {}
+    tolerance = kwargs.get('tolerance', 0.1)
+
+    failures = []
+    for result in results:
+        size, measured = result['size'], result['bytes_per_vertex']
+        if limit is not None and measured > limit:
+            failures.append(f'{size} cylinders: {measured:.0f} bytes per vertex exceeds the limit of {limit:.0f}')
+        expected = baseline.get(str(size))
+        if expected is not None and measured > expected * (1 + tolerance):
+            failures.append(f'{size} cylinders: {measured:.0f} bytes per vertex is more than {tolerance:.0%} above '
+                            f'the baseline of {expected:.0f}')
+    return failures
+
+
+def report(results: list[dict], top: int = 5) -> str:
+    """
+    Formats benchmark results as a table of sizes followed by the modules holding the most memory at each size.
+    """
+    lines = [f'{"cylinders":>10} {"vertices":>10} {"build peak":>12} {"save peak":>12} {"bytes/vertex":>13} '
+             f'{"peak rss":>12}']
+    for r in results:
+        rss = '-' if r['peak_rss'] is None else r['peak_rss']
+        lines.append(f'{r["size"]:>10} {r["vertices"]:>10} {r["build_peak"]:>12} {r["save_peak"]:>12} '
+                     f'{r["bytes_per_vertex"]:>13.1f} {rss:>12}')
+    for r in results:
+        lines.append(f'\n{r["size"]} cylinders, memory held after adding shapes:')
+        for name, size in list(r['modules'].items())[:top]:
+            lines.append(f'  {name:<40} {size:>12}')
+    return '\n'.join(lines)
+
+
+def main(argv: Union[list[str], None] = None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m kmlplus.memory',
+                                     description='Measure the memory used to build cylinder documents.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 100, 1000], help='Cylinders per document')
+    parser.add_argument('--seed', type=int, default=0, help='Seed for the synthetic cylinders')
+    parser.add_argument('--top', type=int, default=5, help='Modules to list per size')
+    parser.add_argument('--max-bytes-per-vertex', type=float, help='Fail if any size uses more bytes per vertex')
+    parser.add_argument('--baseline', help='JSON file of bytes per vertex by size from a previous run to compare with')
+    parser.add_argument('--tolerance', type=float, default=0.1,
+                        help='Fraction bytes per vertex may rise above the baseline. Defaults to 0.1')
+    parser.add_argument('--save-baseline', help='Write the measured bytes per vertex by size to a JSON file')
+    args = parser.parse_args(argv)
+
+    results = memory_benchmark(args.sizes, seed=args.seed)
+    print(report(results, args.top))
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    if args.save_baseline:
+        with open(args.save_baseline, 'w') as f:
+            json.dump({str(r['size']): r['bytes_per_vertex'] for r in results}, f, indent=2)
+
+    failures = check_regression(results, max_bytes_per_vertex=args.max_bytes_per_vertex, baseline=baseline,
+                                tolerance=args.tolerance)
+    for failure in failures:
+        print(f'kmlplus: regression: {failure}', file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,353 @@
+import json
+import struct
+from typing import Union
+from xml.etree import ElementTree
+
+import numpy as np
+
+from kmlplus.geodesic import ECCENTRICITY_SQUARED, SEMI_MAJOR_AXIS, wrap_longitude
+
+_GLB_MAGIC = 0x46546C67
+_GLB_JSON_CHUNK = 0x4E4F534A
+_GLB_BIN_CHUNK = 0x004E4942
+_FLOAT = 5126
+_UNSIGNED_INT = 5125
+_ARRAY_BUFFER = 34962
+_ELEMENT_ARRAY_BUFFER = 34963
+
+
+class Mesh:
+    """
+    An indexed triangle mesh of a closed volume. Vertices are shared between the layers and walls and are held in
+    metres east, north and up of an origin on the WGS84 ellipsoid, which is the frame KML places a Model in.
+
+    Args:
+        origin (tuple): Longitude, latitude and altitude in metres of the mesh's local origin
+        vertices (np.ndarray): An (n, 3) array of east, north and up offsets in metres
+        indices (np.ndarray): An (m, 3) array of vertex indices for each triangle, wound anticlockwise when viewed
+            from outside the volume
+
+    Keyword Args:
+        name (str): Name given to the mesh in exported files. Defaults to 'KmlPlus Mesh'
+        colour_hex (str): KML aabbggrr colour hex used for the exported material. Defaults to '7Fc0c0c0'
+    """
+    __slots__ = ('origin', 'vertices', 'indices', 'name', 'colour_hex')
+
+    def __init__(self, origin: tuple, vertices: np.ndarray, indices: np.ndarray, **kwargs: str):
+        self.origin = tuple(float(i) for i in origin)
+        self.vertices = np.asarray(vertices, dtype=float).reshape(-1, 3)
+        self.indices = np.asarray(indices, dtype=np.uint32).reshape(-1, 3)
+        self.name = kwargs.get('name', 'KmlPlus Mesh')
+        self.colour_hex = kwargs.get('colour_hex', '7Fc0c0c0')
+
+    def __len__(self) -> int:
+        return len(self.indices)
+
+    def __repr__(self) -> str:
+        return f'{__class__} {self.name} vertices: {len(self.vertices)} triangles: {len(self.indices)}'
+
+    def rgba(self) -> list[float]:
+        """
+        Returns:
+            rgba (list[float]): The mesh colour as red, green, blue and alpha between 0 and 1.
+        """
+        a, b, g, r = (int(self.colour_hex[i:i + 2], 16) / 255 for i in range(0, 8, 2))
+        return [r, g, b, a]
+
+    def volume(self) -> float:
+        """
+        Returns:
+            volume (float): Enclosed volume in cubic metres. Positive when the triangles face outwards.
+        """
+        a, b, c = (self.vertices[self.indices[:, i]] for i in range(3))
+        return float(np.einsum('ij,ij->i', a, np.cross(b, c)).sum() / 6)
+
+
+def to_local(lons, lats, alts, origin: tuple) -> np.ndarray:
+    """
+    Converts geographic coordinates to east, north and up offsets from an origin through earth-centred coordinates.
+
+    Args:
+        lons: Longitudes in decimal degrees
+        lats: Latitudes in decimal degrees
+        alts: Altitudes in metres above the ellipsoid
+        origin (tuple): Longitude, latitude and altitude of the local frame's origin
+
+    Returns:
+        enu (np.ndarray): An (n, 3) array of east, north and up offsets in metres.
+    """
+    points = _to_ecef(np.asarray(lons, dtype=float), np.asarray(lats, dtype=float), np.asarray(alts, dtype=float))
+    centre = _to_ecef(*(np.asarray([i], dtype=float) for i in origin))
+    return (points - centre) @ _rotation(origin).T
+
+
+def _rotation(origin: tuple) -> np.ndarray:
+    """Rotation from earth-centred axes to east, north and up axes at an origin."""
+    lon, lat = np.radians(origin[0]), np.radians(origin[1])
+    return np.array([
+        [-np.sin(lon), np.cos(lon), 0],
+        [-np.sin(lat) * np.cos(lon), -np.sin(lat) * np.sin(lon), np.cos(lat)],
+        [np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)]
+    ])
+
+
+def _to_ecef(lons: np.ndarray, lats: np.ndarray, alts: np.ndarray) -> np.ndarray:
+    lon, lat = np.radians(lons), np.radians(lats)
+    prime_vertical = SEMI_MAJOR_AXIS / np.sqrt(1 - ECCENTRICITY_SQUARED * np.sin(lat) ** 2)
+    return np.column_stack((
+        (prime_vertical + alts) * np.cos(lat) * np.cos(lon),
+        (prime_vertical + alts) * np.cos(lat) * np.sin(lon),
+        (prime_vertical * (1 - ECCENTRICITY_SQUARED) + alts) * np.sin(lat)
+    ))
+
+
+def volume_mesh(volume, **kwargs: Union[str, tuple]) -> Mesh:
+    """
+    Builds a closed triangle mesh from the layers of a Cylinder or Polyhedron. Each layer vertex is stored once and
+    shared by the cap and the two walls which meet at it, so a volume with n vertices per layer has 2n vertices and
+    4n - 4 triangles.
+
+    Args:
+        volume: A Cylinder or Polyhedron
+
+    Keyword Args:
+        origin (tuple): Longitude, latitude and altitude of the mesh origin. Defaults to the middle of the lower layer
+            at the lowest altitude of the volume.
+        name (str): Name of the mesh
+        colour_hex (str): KML aabbggrr colour hex
+
+    Returns:
+        mesh (Mesh)
+
+    Raises:
+        IndexError: If the layers do not contain the same number of points.
+    """
+    lower = _open_ring(volume.lower_layer.point_list)
+    upper = _open_ring(volume.upper_layer.point_list)
+    if len(lower) != len(upper):
+        raise IndexError(f'Lower and upper layer must contain the same amount of points. Point count - lower layer: '
+                         f'{len(lower)} upper layer: {len(upper)}')
+    if len(lower) < 3:
+        raise ValueError('A volume requires at least 3 points per layer to be meshed')
+
+    points = lower + upper
+    xs = np.array([p.x for p in points])
+    ys = np.array([p.y for p in points])
+    zs = np.array([p.z for p in points], dtype=float)
+    xs = xs[0] + wrap_longitude(xs - xs[0])
+
+    origin = kwargs.get('origin', None)
+    if origin is None:
+        n = len(lower)
+        origin = (float(wrap_longitude((xs[:n].min() + xs[:n].max()) / 2)), float((ys[:n].min() + ys[:n].max()) / 2),
+                  float(zs.min()))
+    vertices = to_local(xs, ys, zs, origin)
+
+    n = len(lower)
+    if _signed_area(vertices[:n, :2]) < 0:
+        order = np.r_[np.arange(n)[::-1], n + np.arange(n)[::-1]]
+        vertices = vertices[order]
+
+    ring = np.arange(n)
+    following = np.roll(ring, -1)
+    walls = np.concatenate((
+        np.column_stack((ring, following, following + n)),
+        np.column_stack((ring, following + n, ring + n))
+    ))
+    floor = triangulate(vertices[:n, :2])[:, ::-1]
+    ceiling = triangulate(vertices[n:, :2]) + n
+
+    return Mesh(origin, vertices, np.concatenate((floor, ceiling, walls)),
+                name=kwargs.get('name', 'KmlPlus Mesh'), colour_hex=kwargs.get('colour_hex', '7Fc0c0c0'))
+
+
+def _open_ring(point_list: list) -> list:
+    if len(point_list) > 1 and point_list[0] == point_list[-1]:
+        return list(point_list[:-1])
+    return list(point_list)
+
+
+def _signed_area(xy: np.ndarray) -> float:
+    x, y = xy[:, 0], xy[:, 1]
+    return float(np.dot(x, np.roll(y, -1)) - np.dot(np.roll(x, -1), y)) / 2
+
+
+def triangulate(xy: np.ndarray) -> np.ndarray:
+    """
+    Triangulates a simple polygon by ear clipping. Convex rings such as circles are clipped in a single pass.
+
+    Args:
+        xy (np.ndarray): An (n, 2) array of vertices in anticlockwise order
+
+    Returns:
+        triangles (np.ndarray): An (n - 2, 3) array of vertex indices, each wound anticlockwise.
+    """
+    remaining = list(range(len(xy)))
+    triangles = []
+    position, misses = 0, 0
+
+    while len(remaining) > 3:
+        count = len(remaining)
+        position %= count
+        a, b, c = remaining[position - 1], remaining[position], remaining[(position + 1) % count]
+
+        # A degenerate ring with no ears left is clipped regardless so that triangulation always completes
+        if _is_ear(xy, a, b, c, remaining) or misses >= count:
+            triangles.append((a, b, c))
+            del remaining[position]
+            misses = 0
+        else:
+            position += 1
+            misses += 1
+
+    triangles.append(tuple(remaining))
+    return np.array(triangles, dtype=np.uint32)
+
+
+def _is_ear(xy: np.ndarray, a: int, b: int, c: int, remaining: list) -> bool:
+    (ax, ay), (bx, by), (cx, cy) = xy[a], xy[b], xy[c]
+    if (bx - ax) * (cy - ay) - (by - ay) * (cx - ax) <= 0:
+        return False
+
+    for i in remaining:
+        if i in (a, b, c):
+            continue
+        px, py = xy[i]
+        if ((bx - ax) * (py - ay) - (by - ay) * (px - ax) >= 0 and
+                (cx - bx) * (py - by) - (cy - by) * (px - bx) >= 0 and
+                (ax - cx) * (py - cy) - (ay - cy) * (px - cx) >= 0):
+            return False
+    return True
+
+
+def write_glb(meshes: list[Mesh], path: str) -> None:
+    """
+    Writes meshes to a binary glTF file, one node per mesh. glTF is y up, so each mesh's east, up and north offsets are
+    stored as x, y and -z respectively. Meshes are placed relative to the origin of the first mesh and the origin is
+    recorded in the scene extras as longitude, latitude and altitude.
+
+    Args:
+        meshes (list[Mesh]): The meshes to write
+        path (str): Location to save the .glb file
+    """
+    if isinstance(meshes, Mesh):
+        meshes = [meshes]
+    origin = meshes[0].origin
+
+    binary = bytearray()
+    gltf = {
+        'asset': {'version': '2.0', 'generator': 'KmlPlus'},
+        'scene': 0,
+        'scenes': [{'nodes': list(range(len(meshes))), 'extras': {'origin': list(origin)}}],
+        'nodes': [], 'meshes': [], 'materials': [], 'accessors': [], 'bufferViews': []
+    }
+
+    for index, mesh in enumerate(meshes):
+        vertices = mesh.vertices if mesh.origin == origin else _reframe(mesh, origin)
+        positions = np.column_stack((vertices[:, 0], vertices[:, 2], -vertices[:, 1])).astype('<f4')
+        indices = mesh.indices.astype('<u4')
+
+        position_accessor = _add_view(gltf, binary, positions.tobytes(), _ARRAY_BUFFER, {
+            'componentType': _FLOAT, 'count': len(positions), 'type': 'VEC3',
+            'min': positions.min(axis=0).tolist(), 'max': positions.max(axis=0).tolist()
+        })
+        index_accessor = _add_view(gltf, binary, indices.tobytes(), _ELEMENT_ARRAY_BUFFER, {
+            'componentType': _UNSIGNED_INT, 'count': indices.size, 'type': 'SCALAR'
+        })
+
+        colour = mesh.rgba()
+        gltf['materials'].append({
+            'name': mesh.name,
+            'pbrMetallicRoughness': {'baseColorFactor': colour, 'metallicFactor': 0.0},
+            'alphaMode': 'BLEND' if colour[3] < 1 else 'OPAQUE',
+            'doubleSided': True
+        })
+        gltf['meshes'].append({'name': mesh.name, 'primitives': [
+            {'attributes': {'POSITION': position_accessor}, 'indices': index_accessor, 'material': index}
+        ]})
+        gltf['nodes'].append({'name': mesh.name, 'mesh': index})
+
+    gltf['buffers'] = [{'byteLength': len(binary)}]
+
+    json_chunk = json.dumps(gltf, separators=(',', ':')).encode('utf-8')
+    json_chunk += b' ' * (-len(json_chunk) % 4)
+    binary += b'\x00' * (-len(binary) % 4)
+
+    with open(path, 'wb') as f:
+        f.write(struct.pack('<III', _GLB_MAGIC, 2, 12 + 8 + len(json_chunk) + 8 + len(binary)))
+        f.write(struct.pack('<II', len(json_chunk), _GLB_JSON_CHUNK))
+        f.write(json_chunk)
+        f.write(struct.pack('<II', len(binary), _GLB_BIN_CHUNK))
+        f.write(binary)
+
+
+def _add_view(gltf: dict, binary: bytearray, data: bytes, target: int, accessor: dict) -> int:
+    binary += b'\x00' * (-len(binary) % 4)
+    gltf['bufferViews'].append({'buffer': 0, 'byteOffset': len(binary), 'byteLength': len(data), 'target': target})
+    binary += data
+    gltf['accessors'].append(dict(accessor, bufferView=len(gltf['bufferViews']) - 1))
+    return len(gltf['accessors']) - 1
+
+
+def _reframe(mesh: Mesh, origin: tuple) -> np.ndarray:
+    """Moves a mesh's vertices into the local frame of another origin."""
+    ecef = mesh.vertices @ _rotation(mesh.origin) + _to_ecef(*(np.asarray([i], dtype=float) for i in mesh.origin))
+    return (ecef - _to_ecef(*(np.asarray([i], dtype=float) for i in origin))) @ _rotation(origin).T
+
+
+def write_dae(mesh: Mesh, path: str) -> None:
+    """
+    Writes a mesh as a COLLADA model in metres with z up, the format referenced by a KML Model placed at the mesh
+    origin.
+
+    Args:
+        mesh (Mesh): The mesh to write
+        path (str): Location to save the .dae file
+    """
+    ElementTree.register_namespace('', 'http://www.collada.org/2005/11/COLLADASchema')
+    ns = '{http://www.collada.org/2005/11/COLLADASchema}'
+
+    def sub(parent, tag, text=None, **attributes):
+        element = ElementTree.SubElement(parent, ns + tag, {k: str(v) for k, v in attributes.items()})
+        if text is not None:
+            element.text = text
+        return element
+
+    root = ElementTree.Element(ns + 'COLLADA', version='1.4.1')
+    asset = sub(root, 'asset')
+    sub(sub(asset, 'contributor'), 'authoring_tool', 'KmlPlus')
+    sub(asset, 'unit', name='meter', meter=1)
+    sub(asset, 'up_axis', 'Z_UP')
+
+    effect = sub(sub(root, 'library_effects'), 'effect', id='effect')
+    phong = sub(sub(sub(effect, 'profile_COMMON'), 'technique', sid='common'), 'lambert')
+    colour = mesh.rgba()
+    sub(sub(phong, 'diffuse'), 'color', ' '.join(f'{c:.4f}' for c in colour[:3]) + ' 1')
+    sub(sub(phong, 'transparency'), 'float', f'{colour[3]:.4f}')
+    extra = sub(sub(effect, 'extra'), 'technique', profile='GOOGLEEARTH')
+    sub(extra, 'double_sided', '1')
+
+    material = sub(sub(root, 'library_materials'), 'material', id='material', name=mesh.name)
+    sub(material, 'instance_effect', url='#effect')
+
+    geometry = sub(sub(root, 'library_geometries'), 'geometry', id='geometry', name=mesh.name)
+    geometry_mesh = sub(geometry, 'mesh')
+    source = sub(geometry_mesh, 'source', id='positions')
+    sub(source, 'float_array', ' '.join(f'{v:.3f}' for v in mesh.vertices.ravel()), id='positions-array',
+        count=mesh.vertices.size)
+    accessor = sub(sub(source, 'technique_common'), 'accessor', source='#positions-array', count=len(mesh.vertices),
+                   stride=3)
+    for axis in 'XYZ':
+        sub(accessor, 'param', name=axis, type='float')
+    sub(sub(geometry_mesh, 'vertices', id='vertices'), 'input', semantic='POSITION', source='#positions')
+    triangles = sub(geometry_mesh, 'triangles', material='material', count=len(mesh.indices))
+    sub(triangles, 'input', semantic='VERTEX', source='#vertices', offset=0)
+    sub(triangles, 'p', ' '.join(map(str, mesh.indices.ravel().tolist())))
+
+    scene = sub(sub(root, 'library_visual_scenes'), 'visual_scene', id='scene')
+    node = sub(scene, 'node', id='node', name=mesh.name)
+    bind = sub(sub(sub(node, 'instance_geometry', url='#geometry'), 'bind_material'), 'technique_common')
+    sub(bind, 'instance_material', symbol='material', target='#material')
+    sub(sub(root, 'scene'), 'instance_visual_scene', url='#scene')
+
+    ElementTree.ElementTree(root).write(path, encoding='utf-8', xml_declaration=True)
@@ -0,0 +1,167 @@
+import numpy as np
+
+from kmlplus.geodesic import ECCENTRICITY_SQUARED, SEMI_MAJOR_AXIS, get_geodesic_backend, wrap_longitude
+
+_ECCENTRICITY = ECCENTRICITY_SQUARED ** 0.5
+
+
+def _q(sin_lat):
+    return (1 - ECCENTRICITY_SQUARED) * (sin_lat / (1 - ECCENTRICITY_SQUARED * sin_lat ** 2) - 1 / (
+            2 * _ECCENTRICITY) * np.log((1 - _ECCENTRICITY * sin_lat) / (1 + _ECCENTRICITY * sin_lat)))
+
+
+_Q_POLE = _q(1.0)
+# Radius of the sphere with the same surface area as the WGS84 ellipsoid
+AUTHALIC_RADIUS = SEMI_MAJOR_AXIS * (_Q_POLE / 2) ** 0.5
+
+
+class PolygonMetrics:
+    """
+    Geodesic measurements of a polygon.
+
+    Attributes:
+        area (float): Area in square metres, on the WGS84 ellipsoid via its authalic sphere
+        perimeter (float): Length of the boundary in metres along geodesics
+        north (float): Northern limit in decimal degrees
+        south (float): Southern limit in decimal degrees
+        east (float): Eastern limit in decimal degrees. Less than west when the polygon crosses the antimeridian.
+        west (float): Western limit in decimal degrees
+        centroid_y (float): Latitude of the area-weighted centroid
+        centroid_x (float): Longitude of the area-weighted centroid
+    """
+    __slots__ = ('area', 'perimeter', 'north', 'south', 'east', 'west', 'centroid_y', 'centroid_x')
+
+    def __init__(self, area: float, perimeter: float, bounds: tuple, centroid: tuple):
+        self.area = area
+        self.perimeter = perimeter
+        self.north, self.south, self.east, self.west = bounds
+        self.centroid_y, self.centroid_x = centroid
+
+    def __repr__(self) -> str:
+        return f'{__class__} area: {self.area} perimeter: {self.perimeter} centroid: {self.centroid_y} ' \
+               f'{self.centroid_x}'
+
+
+def vertex_arrays(shape) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Args:
+        shape: A kmlplus shape with a point_list, any sequence of ILocations or an x, y tuple of arrays
+
+    Returns:
+        xs, ys (tuple[np.ndarray, np.ndarray]): Longitudes and latitudes of the vertices.
+    """
+    if isinstance(shape, tuple) and len(shape) == 2:
+        return np.asarray(shape[0], dtype=float), np.asarray(shape[1], dtype=float)
+
+    points = getattr(shape, 'point_list', shape)
+    xs = np.fromiter((p.x for p in points), dtype=float, count=len(points))
+    ys = np.fromiter((p.y for p in points), dtype=float, count=len(points))
+    return xs, ys
+
+
+def polygon_metrics(shape) -> PolygonMetrics:
+    """
+    Calculates the area, perimeter, bounding box and centroid of a single polygon.
+
+    Args:
+        shape: See vertex_arrays
+
+    Returns:
+        metrics (PolygonMetrics)
+    """
+    return batch_polygon_metrics([shape])[0]
+
+
+def batch_polygon_metrics(shapes: list) -> list[PolygonMetrics]:
+    """
+    Calculates the area, perimeter, bounding box and centroid of many polygons in one vectorized pass over all of their
+    vertices. Polygons need not be closed.
+
+    Args:
+        shapes (list): Polygons in any form accepted by vertex_arrays
+
+    Returns:
+        metrics (list[PolygonMetrics]): In the same order as shapes.
+    """
+    arrays = [vertex_arrays(shape) for shape in shapes]
+    if not arrays:
+        return []
+
+    counts = np.array([len(xs) for xs, _ in arrays])
+    if np.any(counts == 0):
+        raise ValueError('Cannot calculate metrics for a polygon without vertices')
+
+    xs = np.concatenate([a[0] for a in arrays])
+    ys = np.concatenate([a[1] for a in arrays])
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    ring = np.repeat(np.arange(len(arrays)), counts)
+
+    # Index of the following vertex within each ring
+    following = np.arange(len(xs)) + 1
+    following[starts + counts - 1] = starts
+
+    # Perimeter, solving every edge of every polygon in one call
+    distances = np.asarray(get_geodesic_backend().inv(xs, ys, xs[following], ys[following])[2], dtype=float)
+    perimeters = np.add.reduceat(distances, starts)
+
+    # Longitudes unwrapped relative to the first vertex of each ring so antimeridian crossings are continuous
+    unwrapped = xs[starts][ring] + wrap_longitude(xs - xs[starts][ring])
+    lons = np.radians(unwrapped)
+    lats = np.radians(ys)
+
+    # Area on the authalic sphere, summing the signed area between each great circle edge and the pole
+    tan_half_beta = np.tan(np.arcsin(_q(np.sin(lats)) / _Q_POLE) / 2)
+    tan_half_d_lon = np.tan(np.radians(wrap_longitude(xs[following] - xs)) / 2)
+    excess = 2 * np.arctan2(tan_half_d_lon * (tan_half_beta + tan_half_beta[following]),
+                            1 + tan_half_beta * tan_half_beta[following])
+    areas = np.abs(np.add.reduceat(excess, starts)) * AUTHALIC_RADIUS ** 2
+
+    north = np.maximum.reduceat(ys, starts)
+    south = np.minimum.reduceat(ys, starts)
+    east = wrap_longitude(np.maximum.reduceat(unwrapped, starts))
+    west = wrap_longitude(np.minimum.reduceat(unwrapped, starts))
+
+    centroid_y, centroid_x = _centroids(lons, lats, starts, counts, following, ring)
+
+    return [PolygonMetrics(float(areas[i]), float(perimeters[i]),
+                           (float(north[i]), float(south[i]), float(east[i]), float(west[i])),
+                           (float(centroid_y[i]), float(centroid_x[i])))
+            for i in range(len(arrays))]
+
+
+def _centroids(lons, lats, starts, counts, following, ring) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Area-weighted centroids, found by projecting each ring gnomonically about its mean direction and applying the
+    planar centroid formula. Rings without area, such as vertical side walls, use the mean direction.
+    """
+    cos_lat = np.cos(lats)
+    vectors = np.column_stack((cos_lat * np.cos(lons), cos_lat * np.sin(lons), np.sin(lats)))
+
+    mean = np.add.reduceat(vectors, starts, axis=0) / counts[:, None]
+    mean /= np.linalg.norm(mean, axis=1)[:, None]
+
+    # Tangent basis at each ring's mean direction
+    ref_lat = np.arcsin(np.clip(mean[:, 2], -1, 1))
+    ref_lon = np.arctan2(mean[:, 1], mean[:, 0])
+    east = np.column_stack((-np.sin(ref_lon), np.cos(ref_lon), np.zeros(len(ref_lon))))
+    north = np.column_stack((-np.sin(ref_lat) * np.cos(ref_lon), -np.sin(ref_lat) * np.sin(ref_lon), np.cos(ref_lat)))
+
+    projected = vectors / np.einsum('ij,ij->i', vectors, mean[ring])[:, None]
+    u = np.einsum('ij,ij->i', projected, east[ring])
+    w = np.einsum('ij,ij->i', projected, north[ring])
+
+    cross = u * w[following] - u[following] * w
+    doubled_area = np.add.reduceat(cross, starts)
+    cu = np.add.reduceat((u + u[following]) * cross, starts)
+    cw = np.add.reduceat((w + w[following]) * cross, starts)
+
+    has_area = np.abs(doubled_area) > 1e-20
+    safe_area = np.where(has_area, doubled_area, 1.0)
+    cu = np.where(has_area, cu / (3 * safe_area), 0.0)
+    cw = np.where(has_area, cw / (3 * safe_area), 0.0)
+
+    centroid = mean + cu[:, None] * east + cw[:, None] * north
+    centroid /= np.linalg.norm(centroid, axis=1)[:, None]
+
+    return np.degrees(np.arcsin(np.clip(centroid[:, 2], -1, 1))), np.degrees(np.arctan2(centroid[:, 1],
+                                                                                         centroid[:, 0]))
@@ -0,0 +1,244 @@
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Iterable, Union
+
+from kmlplus.geo import PointFactory
+from kmlplus.kml import GEOMETRY_BUILDERS, KmlPlus, geometry_kwargs, init_worker, worker_settings
+from kmlplus.manifest import BuildManifest
+
+# Marks the end of the shapes passing between stages
+_DONE = object()
+
+
+class _Failure:
+    """
+    Carries an exception raised in one stage through the queues to the writer, which raises it.
+    """
+    __slots__ = ('error',)
+
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+class Pipeline:
+    """
+    Adds shapes to a KmlPlus document in three overlapping stages connected by bounded queues. A parser thread turns
+    coordinate strings into points, a geometry stage computes the rings, layers and walls of circles, cylinders and
+    polyhedra in a pool of worker processes or threads, and the calling thread writes each shape into the document in
+    input order. A stage which gets ahead blocks on its full output queue, so memory is bounded by the queue size rather
+    than the number of shapes.
+
+    Args:
+        kml (KmlPlus): The document to add shapes to
+
+    Keyword Args:
+        jobs (int): Number of geometry workers. Defaults to the number of CPUs. 1 computes geometry in a thread of
+            this process instead.
+        threads (bool): Whether the geometry workers are threads rather than processes, avoiding the cost of
+            pickling each shape's arguments and geometry. See KmlPlus.precompute. Defaults to False.
+        queue_size (int): Maximum number of shapes waiting between each pair of stages. Defaults to 256.
+
+    Attributes:
+        timings (dict): Seconds each stage spent working during the last run, excluding time spent waiting on the
+            other stages. Geometry time is summed across workers.
+    """
+    __slots__ = ('kml', 'jobs', 'threads', 'queue_size', 'timings')
+
+    def __init__(self, kml: KmlPlus, **kwargs: Union[int, None]):
+        self.kml = kml
+        self.jobs = kwargs.get('jobs', None) or os.cpu_count() or 1
+        self.threads = kwargs.get('threads', False)
+        self.queue_size = kwargs.get('queue_size', 256)
+        self.timings = {'parse': 0.0, 'geometry': 0.0, 'write': 0.0}
+
+        if self.queue_size < 1:
+            raise ValueError('Pipeline queue size must be at least 1.')
+
+    def run(self, calls: Iterable[tuple]) -> int:
+        """
+        Adds every shape to the document. calls may be a generator, which is consumed as the pipeline has room. The
+        document is saved once at the end if autosave is enabled, rather than after every shape.
+
+        Args:
+            calls (Iterable[tuple]): The KmlPlus method name, args and kwargs of each shape
+
+        Returns:
+            count (int): The number of shapes added.
+        """
+        self.timings = {'parse': 0.0, 'geometry': 0.0, 'write': 0.0}
+        parsed = queue.Queue(self.queue_size)
+        pending = queue.Queue(self.queue_size)
+        stop = threading.Event()
+
+        executor = None
+        if self.jobs > 1 and self.threads:
+            from concurrent.futures import ThreadPoolExecutor
+
+            executor = ThreadPoolExecutor(max_workers=self.jobs)
+        elif self.jobs > 1:
+            from concurrent.futures import ProcessPoolExecutor
+
+            executor = ProcessPoolExecutor(max_workers=self.jobs, initializer=init_worker,
+                                           initargs=self.kml.solve(worker_settings))
+
+        threads = [threading.Thread(target=self.parse_stage, args=(calls, parsed, stop), daemon=True),
+                   threading.Thread(target=self.geometry_stage, args=(parsed, pending, executor, stop), daemon=True)]
+        for thread in threads:
+            thread.start()
+
+        autosave = self.kml.autosave
+        self.kml.autosave = False
+        count = 0
+        try:
+            while True:
+                item = pending.get()
+                if item is _DONE:
+                    break
+                if isinstance(item, _Failure):
+                    raise item.error
+
+                method, args, parsed_args, kwargs, result = item
+                if isinstance(result, Future):
+                    result = result.result()
+
+                start = time.perf_counter()
+                if result is None:
+                    getattr(self.kml, method)(*parsed_args, **kwargs)
+                else:
+                    # Given the original arguments, the method finds the precomputed geometry under the same key as a
+                    # serial build, so manifests are shared between serial and pipelined builds
+                    key, geometry, seconds = result
+                    self.timings['geometry'] += seconds
+                    self.kml.precomputed[key] = geometry
+                    getattr(self.kml, method)(*args, **kwargs)
+                self.timings['write'] += time.perf_counter() - start
+                count += 1
+        finally:
+            stop.set()
+            for thread in threads:
+                thread.join()
+            if executor is not None:
+                executor.shutdown(cancel_futures=True)
+            self.kml.autosave = autosave
+
+        self.kml.autosave_file()
+        return count
+
+    def parse_stage(self, calls: Iterable[tuple], parsed: queue.Queue, stop: threading.Event) -> None:
+        try:
+            for method, args, kwargs in calls:
+                start = time.perf_counter()
+                args = tuple(args)
+                item = (method, args, self.kml.solve(parse_arguments, method, args, kwargs), kwargs)
+                self.timings['parse'] += time.perf_counter() - start
+                if not put(parsed, item, stop):
+                    return
+            put(parsed, _DONE, stop)
+        except Exception as e:
+            put(parsed, _Failure(e), stop)
+
+    def geometry_stage(self, parsed: queue.Queue, pending: queue.Queue, executor, stop: threading.Event) -> None:
+        while True:
+            item = get(parsed, stop)
+            if item is None:
+                return
+            if item is _DONE or isinstance(item, _Failure):
+                put(pending, item, stop)
+                return
+
+            method, args, parsed_args, kwargs = item
+            result = None
+            try:
+                if method in GEOMETRY_BUILDERS:
+                    if executor is None:
+                        result = self.kml.solve(solve_geometry, method, args, parsed_args, kwargs)
+                    elif self.threads:
+                        result = executor.submit(self.kml.solve, solve_geometry, method, args, parsed_args, kwargs)
+                    else:
+                        result = executor.submit(solve_geometry, method, args, parsed_args, kwargs)
+            except Exception as e:
+                put(pending, _Failure(e), stop)
+                return
+
+            if not put(pending, (method, args, parsed_args, kwargs, result), stop):
+                return
+
+
+def parse_arguments(method: str, args: tuple, kwargs: dict) -> tuple:
+    """
+    Parses the coordinate strings of a shape into points, applying the units the KmlPlus method would. The centres of
+    circles and cylinders are left for the geometry stage.
+
+    Args:
+        method (str): Name of the KmlPlus method which creates the shape
+        args (tuple): The method's positional arguments
+        kwargs (dict): The method's keyword arguments
+
+    Returns:
+        args (tuple): The positional arguments with coordinate lists replaced by lists of ILocations.
+    """
+    if method == 'point':
+        points = PointFactory(args[0], z=kwargs.get('z', None), uom=kwargs.get('uom', 'M')).process_coordinates()
+        return (points,) + args[1:]
+    elif method == 'linestring':
+        return (PointFactory(args[0]).process_coordinates(),) + args[1:]
+    elif method == 'polyhedron':
+        lower = PointFactory(args[0]).process_coordinates()
+        # Layers are often given the same outline. Parse it, and solve any arcs within it, once.
+        upper = lower if args[1] == args[0] else PointFactory(args[1]).process_coordinates()
+        return (lower, upper) + args[2:]
+    return args
+
+
+def solve_geometry(method: str, args: tuple, parsed_args: tuple, kwargs: dict) -> tuple:
+    """
+    Computes the geometry of a shape. Run in a worker process by the geometry stage.
+
+    Args:
+        method (str): Name of the KmlPlus method which creates the shape
+        args (tuple): The method's positional arguments as given, from which the manifest key is made
+        parsed_args (tuple): The positional arguments returned by parse_arguments, from which the geometry is made
+        kwargs (dict): The method's keyword arguments
+
+    Returns:
+        key, geometry, seconds (tuple): The shape's manifest key, its geometry and the time taken to compute it.
+    """
+    start = time.perf_counter()
+    geometry_args = geometry_kwargs(method, kwargs)
+    key = BuildManifest.shape_key(method, *args, **geometry_args)
+    geometry = GEOMETRY_BUILDERS[method](*parsed_args, **geometry_args)
+    return key, geometry, time.perf_counter() - start
+
+
+def put(destination: queue.Queue, item, stop: threading.Event) -> bool:
+    """
+    Puts an item on a bounded queue, blocking while it is full unless the pipeline is stopped.
+
+    Returns:
+        put (bool): False if the pipeline stopped before there was room.
+    """
+    while not stop.is_set():
+        try:
+            destination.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def get(source: queue.Queue, stop: threading.Event):
+    """
+    Takes an item from a queue, blocking while it is empty unless the pipeline is stopped.
+
+    Returns:
+        item: The next item or None if the pipeline stopped first.
+    """
+    while not stop.is_set():
+        try:
+            return source.get(timeout=0.1)
+        except queue.Empty:
+            continue
+    return None
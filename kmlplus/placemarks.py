@@ -0,0 +1,194 @@
+import os
+import tempfile
+from array import array
+from datetime import datetime, timezone
+from typing import Union
+from xml.sax.saxutils import escape
+
+
+class PointPlacemarks:
+    """
+    Many point Placemarks held as flat arrays rather than a simplekml object each, and rendered straight to KML text
+    when the document is saved. Inserted into a folder of the saved document by insert_blocks in place of the
+    individual points, so a document can hold hundreds of thousands of points at a few dozen bytes each.
+
+    Args:
+        coordinates (array): Longitude, latitude and elevation of each point, one after another
+        names (list[str] | str): The name of each point, or one name for every point
+        style_urls (list[str]): The styleUrl of each style used
+        styles (array | None): Index into style_urls of each point's style. None if every point uses the first.
+
+    Keyword Args:
+        extrude (int): 1 or 0, whether to extrude the points
+        altitude_mode (str): KML altitude mode of the points
+    """
+    __slots__ = ('coordinates', 'names', 'style_urls', 'styles', 'extrude', 'altitude_mode')
+
+    def __init__(self, coordinates: array, names: Union[list[str], str], style_urls: list[str],
+                 styles: Union[array, None] = None, **kwargs: Union[int, str]):
+        self.coordinates = coordinates
+        self.names = names
+        self.style_urls = style_urls
+        self.styles = styles
+        self.extrude = kwargs.get('extrude', 0)
+        self.altitude_mode = kwargs.get('altitude_mode', 'absolute')
+
+    def __len__(self) -> int:
+        return len(self.coordinates) // 3
+
+    def __str__(self) -> str:
+        geometry = f'<extrude>{self.extrude}</extrude><altitudeMode>{self.altitude_mode}</altitudeMode></Point>' \
+                   f'</Placemark>'
+        single_name = f'<Placemark><name>{escape(self.names)}</name>' if isinstance(self.names, str) else None
+        style_urls = [f'<styleUrl>{url}</styleUrl><Point><coordinates>' for url in self.style_urls]
+
+        coordinates = self.coordinates
+        buf = []
+        for i in range(len(self)):
+            buf.append(single_name or f'<Placemark><name>{escape(self.names[i])}</name>')
+            buf.append(style_urls[0 if self.styles is None else self.styles[i]])
+            buf.append(f'{coordinates[3 * i]!r},{coordinates[3 * i + 1]!r},{coordinates[3 * i + 2]!r}</coordinates>')
+            buf.append(geometry)
+        return ''.join(buf)
+
+
+def insert_blocks(text: str, blocks: dict) -> str:
+    """
+    Inserts Styles and Placemarks kept outside the simplekml document, such as PointPlacemarks and TrackPlacemark,
+    into its KML text. Each block is rendered with str and written at the end of its folder.
+
+    Args:
+        text (str): KML text of the document, as returned by simplekml.Kml.kml
+        blocks (dict): The items to write in each folder, keyed by the folder's id. Folders must be given in the
+            order they appear in the document and must not contain other folders.
+
+    Returns:
+        text (str): The KML text with the blocks inserted.
+    """
+    buf = []
+    position = 0
+    for folder_id, items in blocks.items():
+        end = text.index('</Folder>', text.index(f'<Folder id="{folder_id}">', position))
+        buf.append(text[position:end])
+        buf.extend(str(item) for item in items)
+        position = end
+    buf.append(text[position:])
+    return ''.join(buf)
+
+
+def insert_kmz_blocks(path: str, blocks: dict) -> None:
+    """
+    Inserts blocks, as for insert_blocks, into the doc.kml of a KMZ archive saved by simplekml, copying every other
+    file of the archive unchanged.
+
+    Args:
+        path (str): Location of the .kmz file
+        blocks (dict): The items to write in each folder, keyed by the folder's id
+    """
+    import zipfile
+
+    handle, temporary = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix='.tmp')
+    os.close(handle)
+    try:
+        with zipfile.ZipFile(path) as archive, zipfile.ZipFile(temporary, 'w', zipfile.ZIP_DEFLATED) as patched:
+            for info in archive.infolist():
+                data = archive.read(info.filename)
+                if info.filename == 'doc.kml':
+                    data = insert_blocks(data.decode('utf-8'), blocks).encode('utf-8')
+                patched.writestr(info, data)
+        os.replace(temporary, path)
+    finally:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+
+
+def kml_time(seconds: float) -> str:
+    """
+    Formats seconds since the Unix epoch as a KML dateTime in UTC.
+    """
+    return datetime.fromtimestamp(seconds, timezone.utc).isoformat().replace('+00:00', 'Z')
+
+
+def track_kind(kind: str) -> str:
+    """
+    Returns:
+        kind (str): The kind of track Placemark, if it is 'linestring' or 'track'.
+
+    Raises:
+        ValueError: If the kind is not 'linestring' or 'track'.
+    """
+    if kind not in ('linestring', 'track'):
+        raise ValueError(f"kind must be 'linestring' or 'track', not {kind!r}")
+    return kind
+
+
+class TrackPlacemark:
+    """
+    A LineString or gx:Track Placemark held as flat arrays and rendered straight to KML text when the document is
+    saved. The start, vertex and end methods also let a track be written out a fix at a time, as kmlplus.tracks
+    does.
+
+    Args:
+        name (str): The name of the Placemark
+        style (str): A styleUrl or Style element for the Placemark
+        coordinates (array): Longitude, latitude and elevation of each vertex, one after another
+        times (array | None): Seconds since the Unix epoch of each vertex. Required for a gx:Track.
+
+    Keyword Args:
+        kind (str): 'linestring' or 'track'. Defaults to 'linestring'.
+        extrude (int): 1 or 0, whether to extrude a LineString
+        altitude_mode (str): KML altitude mode of the vertices
+    """
+    __slots__ = ('name', 'style', 'coordinates', 'times', 'kind', 'extrude', 'altitude_mode')
+
+    def __init__(self, name: str, style: str, coordinates: array, times: Union[array, None] = None,
+                 **kwargs: Union[int, str]):
+        self.name = name
+        self.style = style
+        self.coordinates = coordinates
+        self.times = times
+        self.kind = track_kind(kwargs.get('kind', 'linestring'))
+        self.extrude = kwargs.get('extrude', 0)
+        self.altitude_mode = kwargs.get('altitude_mode', 'absolute')
+
+    def __len__(self) -> int:
+        return len(self.coordinates) // 3
+
+    def __str__(self) -> str:
+        coordinates = self.coordinates
+        buf = [self.start()]
+        if self.kind == 'track':
+            buf.extend(f'<when>{kml_time(t)}</when>' for t in self.times)
+        for i in range(0, len(coordinates), 3):
+            buf.append(self.vertex(coordinates[i], coordinates[i + 1], coordinates[i + 2]))
+        buf.append(self.end())
+        return ''.join(buf)
+
+    def start(self) -> str:
+        """
+        Returns:
+            text (str): The Placemark up to its first when or coordinate.
+        """
+        start = f'<Placemark><name>{escape(self.name)}</name>{self.style}'
+        if self.kind == 'track':
+            return f'{start}<gx:Track><altitudeMode>{self.altitude_mode}</altitudeMode>'
+        return f'{start}<LineString><extrude>{self.extrude}</extrude><altitudeMode>{self.altitude_mode}' \
+               f'</altitudeMode><coordinates>'
+
+    def vertex(self, x: float, y: float, z: float) -> str:
+        """
+        Returns:
+            text (str): A coordinate of the LineString, or gx:coord of the track.
+        """
+        if self.kind == 'track':
+            return f'<gx:coord>{x!r} {y!r} {z!r}</gx:coord>'
+        return f'{x!r},{y!r},{z!r} '
+
+    def end(self) -> str:
+        """
+        Returns:
+            text (str): The Placemark after its last coordinate.
+        """
+        if self.kind == 'track':
+            return '</gx:Track></Placemark>'
+        return '</coordinates></LineString></Placemark>'
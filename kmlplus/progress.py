@@ -0,0 +1,113 @@
+import time
+from typing import Callable, Union
+
+
+class ProgressReport:
+    """
+    A snapshot of a build's progress passed to progress callbacks.
+
+    Attributes:
+        shapes (int): Shapes added so far
+        vertices (int): Vertices generated so far, including those of walls
+        bytes_written (int): Bytes written by every save so far
+        elapsed (float): Seconds since the build started
+        shapes_per_second (float): Shapes added per second since the previous report
+        vertices_per_second (float): Vertices generated per second since the previous report
+        total (int | None): Number of shapes expected, if known
+        eta (float | None): Estimated seconds until the expected shapes have been added, from the average rate so far.
+            None if the total is unknown.
+    """
+    __slots__ = ('shapes', 'vertices', 'bytes_written', 'elapsed', 'shapes_per_second', 'vertices_per_second',
+                 'total', 'eta')
+
+    def __init__(self, shapes: int, vertices: int, bytes_written: int, elapsed: float, rates: tuple,
+                 total: Union[int, None]):
+        self.shapes = shapes
+        self.vertices = vertices
+        self.bytes_written = bytes_written
+        self.elapsed = elapsed
+        self.shapes_per_second, self.vertices_per_second = rates
+        self.total = total
+
+        if total is None:
+            self.eta = None
+        elif shapes >= total:
+            self.eta = 0.0
+        elif shapes:
+            self.eta = (total - shapes) * elapsed / shapes
+        else:
+            self.eta = float('inf')
+
+    def __repr__(self) -> str:
+        return f'{__class__} shapes: {self.shapes} vertices: {self.vertices} bytes: {self.bytes_written} ' \
+               f'shapes/s: {self.shapes_per_second:.1f} eta: {self.eta}'
+
+
+class Progress:
+    """
+    Counts the shapes, vertices and bytes produced by a build and passes a ProgressReport to a callback no more often
+    than a set interval. Intended to be updated from a single thread.
+
+    Args:
+        callback (Callable): Called with a ProgressReport
+
+    Keyword Args:
+        interval (float): Minimum seconds between reports. Defaults to 1.0. 0 reports every update.
+        total (int): Number of shapes expected, used to estimate the time remaining
+
+    Attributes:
+        shapes (int): Shapes added so far
+        vertices (int): Vertices generated so far
+        bytes_written (int): Bytes written so far
+    """
+    __slots__ = ('callback', 'interval', 'total', 'shapes', 'vertices', 'bytes_written', '_start', '_next',
+                 '_last')
+
+    def __init__(self, callback: Callable, **kwargs: Union[float, int, None]):
+        self.callback = callback
+        self.interval = kwargs.get('interval', 1.0)
+        self.total = kwargs.get('total', None)
+        self.shapes = 0
+        self.vertices = 0
+        self.bytes_written = 0
+        self._start = time.perf_counter()
+        self._next = self._start + self.interval
+        # Time, shapes and vertices at the previous report
+        self._last = (self._start, 0, 0)
+
+    def update(self, shapes: int = 0, vertices: int = 0, bytes_written: int = 0, force: bool = False) -> None:
+        """
+        Adds to the counts, reporting if the interval has passed since the previous report.
+
+        Args:
+            shapes (int): Shapes added
+            vertices (int): Vertices generated
+            bytes_written (int): Bytes written
+            force (bool): Report regardless of the interval
+        """
+        self.shapes += shapes
+        self.vertices += vertices
+        self.bytes_written += bytes_written
+
+        now = time.perf_counter()
+        if force or now >= self._next:
+            self.report(now)
+
+    def report(self, now: Union[float, None] = None) -> ProgressReport:
+        """
+        Passes the current progress to the callback.
+
+        Returns:
+            report (ProgressReport)
+        """
+        now = time.perf_counter() if now is None else now
+        last_time, last_shapes, last_vertices = self._last
+        period = now - last_time
+        rates = ((self.shapes - last_shapes) / period, (self.vertices - last_vertices) / period) if period > 0 \
+            else (0.0, 0.0)
+
+        report = ProgressReport(self.shapes, self.vertices, self.bytes_written, now - self._start, rates, self.total)
+        self._last = (now, self.shapes, self.vertices)
+        self._next = now + self.interval
+        self.callback(report)
+        return report
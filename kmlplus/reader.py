@@ -0,0 +1,404 @@
+import os
+import tempfile
+import zipfile
+from typing import Callable, Iterator, Union
+from xml.etree import ElementTree
+from xml.sax.saxutils import escape, quoteattr
+
+import numpy as np
+
+from kmlplus.geo import Point
+from kmlplus.shapes import LineString, Polygon
+
+KML_NAMESPACE = 'http://www.opengis.net/kml/2.2'
+GX_NAMESPACE = 'http://www.google.com/kml/ext/2.2'
+XML_NAMESPACE = 'http://www.w3.org/XML/1998/namespace'
+
+ElementTree.register_namespace('gx', GX_NAMESPACE)
+
+# Elements which are streamed through rather than held in memory with their children
+_CONTAINERS = {'kml', 'Document', 'Folder'}
+
+
+def local_name(tag: str) -> str:
+    return tag.rsplit('}', 1)[-1]
+
+
+def parse_coordinates(text: Union[str, None]) -> np.ndarray:
+    """
+    Parses the text of a KML coordinates element.
+
+    Args:
+        text (str): Whitespace separated x,y or x,y,z tuples
+
+    Returns:
+        coordinates (np.ndarray): An (n, 3) array of x, y, z. Missing z values are 0.
+    """
+    tuples = text.split() if text else []
+    if not tuples:
+        return np.zeros((0, 3))
+
+    width = tuples[0].count(',') + 1
+    values = ','.join(tuples).split(',')
+    if len(values) == width * len(tuples):
+        coordinates = np.array(values, dtype=float).reshape(-1, width)
+    else:
+        # Tuples of mixed width
+        coordinates = np.array([(t.split(',') + ['0'])[:3] for t in tuples], dtype=float)
+
+    if coordinates.shape[1] == 2:
+        coordinates = np.column_stack((coordinates, np.zeros(len(coordinates))))
+    return coordinates[:, :3]
+
+
+def format_coordinates(coordinates) -> str:
+    return ' '.join(','.join(repr(float(v)) for v in c) for c in coordinates)
+
+
+class KmlPlacemark:
+    """
+    A Placemark read from a KML document. Geometry coordinates are parsed when first accessed.
+
+    Args:
+        element (ElementTree.Element): The Placemark element
+        folders (tuple[str]): Names of the Folders containing the Placemark, outermost first
+
+    Attributes:
+        element (ElementTree.Element): The Placemark element. Changes to it are written out when patching.
+        folders (tuple[str]): Names of the enclosing Folders, outermost first
+    """
+    __slots__ = ('element', 'folders', '_geometries')
+
+    def __init__(self, element: ElementTree.Element, folders: tuple = ()):
+        self.element = element
+        self.folders = folders
+        self._geometries = None
+
+    def __repr__(self) -> str:
+        return f'{__class__} {self.name} {[g[0] for g in self.geometries]}'
+
+    @property
+    def name(self) -> Union[str, None]:
+        for child in self.element:
+            if local_name(child.tag) == 'name':
+                return child.text
+        return None
+
+    @property
+    def folder(self) -> Union[str, None]:
+        return self.folders[-1] if self.folders else None
+
+    @property
+    def geometries(self) -> list[tuple[str, list[np.ndarray]]]:
+        """
+        Returns:
+            geometries (list[tuple[str, list[np.ndarray]]]): The type of each Point, LineString and Polygon in the
+                Placemark with an (n, 3) coordinate array for each of its lines or rings. Polygons list their outer
+                ring first.
+        """
+        if self._geometries is None:
+            self._geometries = []
+            for geometry, coordinate_elements in self._coordinate_elements():
+                self._geometries.append((geometry, [parse_coordinates(c.text) for c in coordinate_elements]))
+        return self._geometries
+
+    def coordinates(self) -> list[np.ndarray]:
+        """
+        Returns:
+            coordinates (list[np.ndarray]): Every line or ring of every geometry, in document order.
+        """
+        return [ring for _, rings in self.geometries for ring in rings]
+
+    def set_coordinates(self, coordinates: list) -> None:
+        """
+        Replaces the coordinates of each line or ring, in the same order as coordinates().
+
+        Args:
+            coordinates (list): An x, y, z sequence for each line or ring, such as the kml_friendly() tuples of a
+                shape's points.
+
+        Raises:
+            IndexError: If the number of lines and rings does not match the Placemark.
+        """
+        elements = [c for _, coordinate_elements in self._coordinate_elements() for c in coordinate_elements]
+        if len(elements) != len(coordinates):
+            raise IndexError(f'Placemark has {len(elements)} coordinate elements but {len(coordinates)} were given')
+
+        for element, ring in zip(elements, coordinates):
+            element.text = format_coordinates(ring)
+        self._geometries = None
+
+    def _coordinate_elements(self) -> list[tuple[str, list[ElementTree.Element]]]:
+        found = []
+        for element in self.element.iter():
+            geometry = local_name(element.tag)
+            if geometry in ('Point', 'LineString'):
+                rings = [element]
+            elif geometry == 'Polygon':
+                rings = [r for boundary in ('outerBoundaryIs', 'innerBoundaryIs')
+                         for b in element if local_name(b.tag) == boundary
+                         for r in b.iter() if local_name(r.tag) == 'LinearRing']
+            else:
+                continue
+            found.append((geometry, [c for r in rings for c in r.iter() if local_name(c.tag) == 'coordinates']))
+        return found
+
+    def to_shapes(self) -> list:
+        """
+        Converts each geometry into a kmlplus shape. Polygons keep their outer ring only.
+
+        Returns:
+            shapes (list): Points, LineStrings and Polygons with elevations in metres.
+        """
+        shapes = []
+        for geometry, rings in self.geometries:
+            if not rings or not len(rings[0]):
+                continue
+            points = [Point(y, x, z=z) for x, y, z in rings[0].tolist()]
+            if geometry == 'Point':
+                shapes.append(points[0])
+            elif geometry == 'LineString':
+                shapes.append(LineString(points))
+            else:
+                shapes.append(Polygon(points))
+        return shapes
+
+
+def open_kml(path: str):
+    """
+    Opens a .kml file, or the main document inside a .kmz archive, for reading as bytes. Closing the stream returned
+    for a .kmz also closes the archive.
+    """
+    if zipfile.is_zipfile(path):
+        archive = zipfile.ZipFile(path)
+        try:
+            return KmzDocument(archive, archive.open(_kmz_document(archive)))
+        except BaseException:
+            archive.close()
+            raise
+    return open(path, 'rb')
+
+
+class KmzDocument:
+    """
+    The main document of a .kmz archive opened for reading, which closes the archive when it is closed.
+
+    Args:
+        archive (zipfile.ZipFile): The open archive
+        member (IO[bytes]): The document opened from the archive
+    """
+    __slots__ = ('archive', 'member')
+
+    def __init__(self, archive: zipfile.ZipFile, member):
+        self.archive = archive
+        self.member = member
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def read(self, size: int = -1) -> bytes:
+        return self.member.read(size)
+
+    def close(self) -> None:
+        self.member.close()
+        self.archive.close()
+
+
+def _kmz_document(archive: zipfile.ZipFile) -> str:
+    names = [n for n in archive.namelist() if n.lower().endswith('.kml')]
+    if not names:
+        raise ValueError('KMZ archive does not contain a .kml document')
+    return 'doc.kml' if 'doc.kml' in names else names[0]
+
+
+def _walk(source) -> Iterator[tuple]:
+    """
+    Streams a KML document, holding only the chain of open containers and the element being completed. Yields
+    ('start', element, folders, namespaces) and ('end', element, folders, ()) for Documents and Folders, and
+    ('child', element, folders, ()) for each complete element inside them, which is then detached so that it can be
+    freed. The namespaces of a start are the (prefix, uri) pairs declared on that element.
+    """
+    stack = []
+    folders = []
+    namespaces = []
+
+    for event, item in ElementTree.iterparse(source, events=('start-ns', 'start', 'end')):
+        if event == 'start-ns':
+            namespaces.append(item)
+            continue
+
+        tag = local_name(item.tag)
+
+        if event == 'start':
+            streamed = (not stack or stack[-1][1]) and tag in _CONTAINERS
+            stack.append((item, streamed))
+            if tag == 'Folder' and streamed:
+                folders.append(None)
+            if streamed:
+                yield 'start', item, tuple(folders), tuple(namespaces)
+            namespaces = []
+            continue
+
+        element, streamed = stack.pop()
+        is_child = bool(stack) and stack[-1][1] and not streamed
+        if streamed:
+            yield 'end', element, tuple(folders), ()
+            if tag == 'Folder':
+                folders.pop()
+            if stack:
+                stack[-1][0].remove(element)
+        elif is_child:
+            if tag == 'name' and local_name(stack[-1][0].tag) == 'Folder':
+                folders[-1] = element.text
+            yield 'child', element, tuple(f for f in folders if f is not None), ()
+            stack[-1][0].remove(element)
+
+
+def iter_placemarks(path: str) -> Iterator[KmlPlacemark]:
+    """
+    Streams the Placemarks of a KML or KMZ file. Each Placemark is detached from the document once read, so memory use
+    does not grow with the size of the file provided the caller does not keep them.
+
+    Args:
+        path (str): Location of a .kml or .kmz file
+
+    Returns:
+        placemarks (Iterator[KmlPlacemark])
+    """
+    with open_kml(path) as source:
+        for event, element, folders, _ in _walk(source):
+            if event == 'child' and local_name(element.tag) == 'Placemark':
+                yield KmlPlacemark(element, folders)
+
+
+def iter_shapes(path: str) -> Iterator:
+    """
+    Streams the geometry of a KML or KMZ file as kmlplus Points, LineStrings and Polygons.
+
+    Args:
+        path (str): Location of a .kml or .kmz file
+
+    Returns:
+        shapes (Iterator)
+    """
+    for placemark in iter_placemarks(path):
+        yield from placemark.to_shapes()
+
+
+def patch_kml(path: str, transform: Callable, destination: Union[str, None] = None) -> int:
+    """
+    Rewrites a KML or KMZ file one Placemark at a time rather than rebuilding it. Every Placemark is passed to
+    transform, which may edit it and return it, return None to remove it, or return a list of Placemarks or elements to
+    write in its place. Everything else in the document is copied unchanged.
+
+    Args:
+        path (str): Location of the .kml or .kmz file to patch
+        transform (Callable): Called with each KmlPlacemark
+        destination (str): Location to write the patched file. Defaults to replacing path.
+
+    Returns:
+        placemarks (int): The number of Placemarks written.
+    """
+    destination = destination or path
+    directory = os.path.dirname(os.path.abspath(destination))
+    handle, temporary = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    os.close(handle)
+
+    try:
+        if zipfile.is_zipfile(path):
+            with zipfile.ZipFile(path) as archive, \
+                    zipfile.ZipFile(temporary, 'w', zipfile.ZIP_DEFLATED) as patched:
+                document = _kmz_document(archive)
+                with archive.open(document) as source, patched.open(document, 'w') as out:
+                    count = _patch_stream(source, out, transform)
+                for info in archive.infolist():
+                    if info.filename != document:
+                        patched.writestr(info, archive.read(info.filename))
+        else:
+            with open(path, 'rb') as source, open(temporary, 'wb') as out:
+                count = _patch_stream(source, out, transform)
+        os.replace(temporary, destination)
+    finally:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+
+    return count
+
+
+def _patch_stream(source, out, transform: Callable) -> int:
+    out.write(b'<?xml version="1.0" encoding="UTF-8"?>\n')
+    count = 0
+    # Prefix of each namespace uri declared on the open containers, innermost last
+    scopes = [{XML_NAMESPACE: 'xml'}]
+
+    for event, element, folders, namespaces in _walk(source):
+        tag = local_name(element.tag)
+
+        if event == 'start':
+            # Containers keep the declarations made on them in the source
+            prefixes = dict(scopes[-1])
+            prefixes.update((uri, prefix) for prefix, uri in namespaces)
+            declarations = list(namespaces)
+            attributes = ''.join(f' {_attribute_name(k, prefixes, declarations)}={quoteattr(v)}'
+                                 for k, v in element.attrib.items())
+            attributes = ''.join(f' xmlns{":" + p if p else ""}={quoteattr(uri)}' for p, uri in declarations) \
+                + attributes
+            scopes.append(prefixes)
+            out.write(f'<{tag}{attributes}>\n'.encode('utf-8'))
+        elif event == 'end':
+            scopes.pop()
+            text = escape(element.text.strip()) if element.text and element.text.strip() else ''
+            out.write(f'{text}</{tag}>\n'.encode('utf-8'))
+        else:
+            written = [element]
+            if tag == 'Placemark':
+                result = transform(KmlPlacemark(element, folders))
+                if result is None:
+                    written = []
+                else:
+                    written = result if isinstance(result, list) else [result]
+                written = [w.element if isinstance(w, KmlPlacemark) else w for w in written]
+                count += sum(1 for w in written if local_name(w.tag) == 'Placemark')
+
+            prefixes = scopes[-1]
+            for w in written:
+                w.tail = None
+                _apply_prefixes(w, prefixes)
+                out.write(ElementTree.tostring(w, encoding='utf-8', xml_declaration=False))
+                out.write(b'\n')
+
+    return count
+
+
+def _attribute_name(key: str, prefixes: dict, declarations: list) -> str:
+    """
+    Returns the qualified name of a container's attribute. A namespace without a prefix in scope, or only bound to the
+    default namespace, which attributes do not take, is given a new prefix added to prefixes and declarations.
+    """
+    if key[0] != '{':
+        return key
+    uri, name = key[1:].split('}', 1)
+    if not prefixes.get(uri):
+        used = set(prefixes.values())
+        prefixes[uri] = next(p for p in (f'ns{i}' for i in range(len(used) + 1)) if p not in used)
+        declarations.append((prefixes[uri], uri))
+    return f'{prefixes[uri]}:{name}'
+
+
+def _apply_prefixes(element: ElementTree.Element, prefixes: dict) -> None:
+    """
+    Rewrites namespaced tags and attributes using the prefixes declared on the open containers, so that elements are
+    written without repeating namespace declarations. Names in other namespaces are left for ElementTree to declare.
+    """
+    for e in element.iter():
+        if e.tag[0] == '{':
+            uri, tag = e.tag[1:].split('}', 1)
+            if uri in prefixes:
+                e.tag = f'{prefixes[uri]}:{tag}' if prefixes[uri] else tag
+        for key in [k for k in e.attrib if k[0] == '{']:
+            uri, name = key[1:].split('}', 1)
+            if prefixes.get(uri):
+                e.attrib[f'{prefixes[uri]}:{name}'] = e.attrib.pop(key)
@@ -0,0 +1,156 @@
+import argparse
+import os
+import random
+import sys
+import time
+from typing import Iterable, Union
+
+from kmlplus.cache import get_geometry_cache, set_geometry_cache
+from kmlplus.corpus import SyntheticCorpus
+from kmlplus.geodesic import get_geodesic_backend
+from kmlplus.kml import GEOMETRY_BUILDERS, KmlPlus, compute_geometry, geometry_kwargs
+
+
+def geodesic_scaling(workers: Iterable[int] = (1, 2, 4), **kwargs: int) -> list[dict]:
+    """
+    Measures how forward geodesic solutions scale across threads. The same points are solved at each number of
+    threads, each thread solving an equal share in a single array call, so the speedup shows how much of the backend's
+    work runs outside the GIL.
+
+    Args:
+        workers (Iterable[int]): Numbers of threads to measure. Defaults to 1, 2 and 4.
+
+    Keyword Args:
+        points (int): Number of points to solve. Defaults to 200000.
+        repeat (int): Number of timed runs per number of threads. The fastest is reported. Defaults to 3.
+        seed (int): Seed for the random points. Defaults to 0.
+
+    Returns:
+        results (list[dict]): Per number of threads, the 'backend' name, 'workers', 'seconds' and 'speedup' over one
+            thread.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    import numpy as np
+
+    points = kwargs.get('points', 200000)
+    repeat = kwargs.get('repeat', 3)
+    rng = random.Random(kwargs.get('seed', 0))
+    columns = [np.array([rng.uniform(low, high) for _ in range(points)])
+               for low, high in ((-180, 180), (-80, 80), (0, 360), (0, 20 * 1852))]
+    backend = get_geodesic_backend()
+
+    def solve(part: tuple) -> None:
+        backend.fwd(*part)
+
+    results = []
+    for count in workers:
+        parts = list(zip(*[np.array_split(column, count) for column in columns]))
+        seconds = float('inf')
+        with ThreadPoolExecutor(max_workers=count) as executor:
+            for _ in range(repeat):
+                start = time.perf_counter()
+                list(executor.map(solve, parts))
+                seconds = min(seconds, time.perf_counter() - start)
+        results.append({'backend': backend.name, 'workers': count, 'seconds': seconds})
+
+    return with_speedup(results)
+
+
+def build_scaling(workers: Iterable[int] = (1, 2, 4), **kwargs: Union[int, tuple]) -> list[dict]:
+    """
+    Measures how KmlPlus.precompute scales with the number of thread and process workers over a synthetic corpus of
+    circles, cylinders and polyhedra. The geometry cache is disabled while measuring, so every shape is solved.
+
+    Args:
+        workers (Iterable[int]): Numbers of workers to measure. Defaults to 1, 2 and 4.
+
+    Keyword Args:
+        vertices (int): Approximate number of vertices in the corpus. Defaults to 100000.
+        seed (int): Seed for the synthetic corpus. Defaults to 0.
+        modes (tuple): 'thread', 'process' or both. Defaults to both.
+
+    Returns:
+        results (list[dict]): Per mode and number of workers, the 'mode', 'workers', 'shapes', 'seconds' and 'speedup'
+            over computing the same geometry serially, in one thread without a pool.
+    """
+    calls = [call for call in SyntheticCorpus(kwargs.get('seed', 0)).calls(kwargs.get('vertices', 100000))
+             if call[0] in GEOMETRY_BUILDERS]
+    requests = [(method, args, geometry_kwargs(method, shape_kwargs)) for method, args, shape_kwargs in calls]
+
+    cache = get_geometry_cache()
+    set_geometry_cache(None)
+    try:
+        # Load the geodesic backend and numpy before timing anything
+        compute_geometry(requests[0])
+
+        start = time.perf_counter()
+        for request in requests:
+            compute_geometry(request)
+        serial = time.perf_counter() - start
+
+        results = []
+        for mode in kwargs.get('modes', ('thread', 'process')):
+            for count in workers:
+                kml = KmlPlus(autosave=False)
+                start = time.perf_counter()
+                kml.precompute(calls, jobs=count, threads=mode == 'thread')
+                seconds = time.perf_counter() - start
+                results.append({'mode': mode, 'workers': count, 'shapes': len(calls), 'seconds': seconds,
+                                'speedup': serial / seconds})
+    finally:
+        set_geometry_cache(cache)
+
+    return results
+
+
+def with_speedup(results: list[dict]) -> list[dict]:
+    """
+    Adds each result's 'speedup' over the first result.
+    """
+    for result in results:
+        result['speedup'] = results[0]['seconds'] / result['seconds']
+    return results
+
+
+def report(geodesic: list[dict], build: list[dict]) -> str:
+    """
+    Formats scaling results as a table of geodesic throughput followed by a table of precompute throughput.
+    """
+    lines = [f'{os.cpu_count()} CPUs']
+    if geodesic:
+        lines.append(f'\n{geodesic[0]["backend"]} fwd {"threads":>9} {"seconds":>10} {"speedup":>9}')
+        for r in geodesic:
+            lines.append(f'{"":>{len(geodesic[0]["backend"]) + 4}} {r["workers"]:>9} {r["seconds"]:>10.3f} '
+                         f'{r["speedup"]:>9.2f}')
+    if build:
+        lines.append(f'\n{"precompute":<10} {"workers":>9} {"shapes":>8} {"seconds":>10} {"speedup":>9}')
+        for r in build:
+            lines.append(f'{r["mode"]:<10} {r["workers"]:>9} {r["shapes"]:>8} {r["seconds"]:>10.3f} '
+                         f'{r["speedup"]:>9.2f}')
+    return '\n'.join(lines)
+
+
+def main(argv: Union[list[str], None] = None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m kmlplus.scaling',
+                                     description='Measure how geometry computation scales across threads and '
+                                                 'processes.')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4], help='Numbers of workers to measure')
+    parser.add_argument('--points', type=int, default=200000, help='Points solved in the geodesic measurement')
+    parser.add_argument('--vertices', type=int, default=100000, help='Approximate vertices in the synthetic corpus')
+    parser.add_argument('--modes', nargs='+', choices=('thread', 'process'), default=['thread', 'process'],
+                        help='Pools to measure precompute with')
+    parser.add_argument('--seed', type=int, default=0, help='Seed for the random points and corpus')
+    args = parser.parse_args(argv)
+
+    if min(args.workers) < 1:
+        parser.error('--workers must be 1 or more')
+
+    geodesic = geodesic_scaling(args.workers, points=args.points, seed=args.seed)
+    build = build_scaling(args.workers, vertices=args.vertices, seed=args.seed, modes=tuple(args.modes))
+    print(report(geodesic, build))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
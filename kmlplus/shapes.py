@@ -1,9 +1,12 @@
-from typing import Union
+from typing import TYPE_CHECKING, Union
 
-from kmlplus.geo import PointFactory, Point
+from kmlplus.geo import PointFactory, Point, arc_coordinates, concentric_arc_coordinates, densify_points
 from kmlplus.interface import ICircle, ILocation, I3DObject, IPolygon, ICylinder, I2DObject
 from kmlplus.util import convert_to_metres
 
+if TYPE_CHECKING:
+    from kmlplus.metrics import PolygonMetrics
+
 
 class Circle(ICircle, I2DObject):
     """
@@ -17,8 +20,10 @@ class Circle(ICircle, I2DObject):
         radius_uom (str): Unit of measure for the radius. Accepts and defaults to metres ('M'), statute miles ('MI'),
          kilometres ('KM') and nautical miles ('NM')
         uom (str): Unit of measure for elevation. Accepts and defaults to feet ('FT') and metres ('M')
+        ring (list[tuple]): The x, y coordinates of the circumference, already solved for the same centre, radius and
+            sample by another circle. Used instead of solving them again.
     """
-    __slots__ = ('_centre', '_radius', 'uom', '_z', '_sample', 'point_list')
+    __slots__ = ('_centre', '_radius', 'uom', '_z', '_sample', 'point_list', '_ring')
 
     def __init__(self, centre: list, radius: float, **kwargs):
         self.uom: str = kwargs.get('uom', 'M')
@@ -26,6 +31,7 @@ class Circle(ICircle, I2DObject):
         self.sample: int = kwargs.get('sample', 100)
         self.centre: ILocation = self.plot_centre(centre)
         self.radius: float = convert_to_metres(radius, kwargs.get('radius_uom', 'M'))
+        self._ring: Union[list[tuple], None] = kwargs.get('ring', None)
         self.point_list: list[ILocation] = self.process_points()
 
     def __eq__(self, another_circle: ICircle) -> bool:
@@ -38,16 +44,8 @@ class Circle(ICircle, I2DObject):
         return len(self.point_list)
 
     def __iter__(self):
-        self.n = 0
-        return self
-
-    def __next__(self):
-        if self.n < len(self.point_list):
-            result = self.point_list[self.n]
-            self.n += 1
-            return result
-        else:
-            raise StopIteration
+        # A fresh iterator each time, so the same shape can be iterated by several loops or threads at once
+        return iter(self.point_list)
 
     def __getitem__(self, index):
         return self.point_list[index]
@@ -79,6 +77,7 @@ class Circle(ICircle, I2DObject):
             self._sample = value
         else:
             self._sample = int(value)
+        self._ring = None
 
     @property
     def centre(self) -> ILocation:
@@ -88,6 +87,7 @@ class Circle(ICircle, I2DObject):
     def centre(self, a_point: ILocation):
         if isinstance(a_point, Point):
             self._centre = a_point
+            self._ring = None
         else:
             raise TypeError('Centre must be passed a kmlplus.geo.Point object.')
 
@@ -97,6 +97,7 @@ class Circle(ICircle, I2DObject):
 
     @radius.setter
     def radius(self, a_radius: Union[float, int, str]):
+        self._ring = None
         if a_radius > 0 and isinstance(a_radius, float):
 
             self._radius = a_radius
@@ -130,26 +131,29 @@ class Circle(ICircle, I2DObject):
         Returns:
             point_list (list[ILocation]): List of ILocation objects which form the circle.
         """
-        point_list = []
+        if self.z:
+            z = self.z
+        else:
+            z = self.centre.z
+            # Change uom to metres as centre has already been converted. Failure to do so will have further
+            # calculations performed
+            self.uom = 'M'
 
-        start_bearing = 0
-        bearing_increment = 360 / self.sample
+        point_list = [Point(y, x, z=z, uom=self.uom) for x, y in self.ring_coordinates()]
 
-        for n in range(0, self.sample + 1):
-            if self.z:
-                z = self.z
-            else:
-                z = self.centre.z
-                # Change uom to metres as centre has already been converted. Failure to do so will have further
-                # calculations performed
-                self.uom = 'M'
+        return point_list
 
-            point = Point.from_point_bearing_and_distance(self.centre, start_bearing, self.radius, z=z,
-                                                          uom=self.uom)
-            point_list.append(point)
-            start_bearing -= bearing_increment
+    def ring_coordinates(self) -> list[tuple]:
+        """
+        Solves the x, y coordinates of the circle's circumference, starting due north and stepping anticlockwise. The
+        result is kept until the centre, radius or sample change.
 
-        return point_list
+        Returns:
+            coordinates (list[tuple]): sample + 1 x, y pairs.
+        """
+        if self._ring is None:
+            self._ring = arc_coordinates(self.centre, 0, -360 / self.sample, self.radius, self.sample)
+        return self._ring
 
     def to_kml(self) -> list[tuple]:
         """
@@ -158,16 +162,7 @@ class Circle(ICircle, I2DObject):
         Returns:
             circle (list[tuple]): A list of tuples containing x, y, z coordinate strings.
         """
-        point_list = []
-
-        start_bearing = 0
-        bearing_increment = 360 / self.sample
-
-        for n in range(0, self.sample + 1):
-            point = Point.from_point_bearing_and_distance(self.centre, start_bearing, self.radius, z=self.z,
-                                                          uom=self.uom)
-            point_list.append(point)
-            start_bearing -= bearing_increment
+        point_list = [Point(y, x, z=self.z, uom=self.uom) for x, y in self.ring_coordinates()]
 
         # kml tuples
         circle = [(p.x, p.y, p.z) for p in point_list]
@@ -178,6 +173,9 @@ class Circle(ICircle, I2DObject):
 class Cylinder(I3DObject, ICylinder):
     """
     Represents a 3D cylindrical object. Top and bottom layers are made up of 2x Circle objects of equal sample size.
+    The layers may have different radii, giving a frustum such as an approach funnel. Where both layers share a centre
+    their rings are solved together in one batched call, or once and shared if the radii are also equal, and the walls
+    are built from the layers' points by index.
 
     Args:
         lower_coordinates (list[str]): List of string representations of coordinates.
@@ -187,12 +185,13 @@ class Cylinder(I3DObject, ICylinder):
         radius_uom (str): Unit of measure for the radius. Accepts and defaults to metres ('M'), statute miles ('MI'),
          kilometres ('KM') and nautical miles ('NM')
         uom (str): Unit of measure for elevation. Accepts and defaults to feet ('FT') and metres ('M')
-        lower_radius (float): Overrides any radius in the string for the lower circle.
-        upper_radius (float): Overrides any radius in the string for the upper circle.
+        lower_radius (float): Overrides the radius given for the lower circle.
+        upper_radius (float): Overrides the radius given for the upper circle.
         lower_layer (float): Overrides any elevation in the string for the lower circle.
         upper_layer (float): Overrides any elevation in the string for the upper circle.
         lower_layer_uom (str): Unit of measure for elevation. Defaults to feet ('FT')
         upper_layer_uom (str): Unit of measure for elevation. Defaults to feet ('FT')
+        sample (int): How many points to use in each layer's circle. Defaults to 100.
 
     """
     __slots__ = (
@@ -201,17 +200,21 @@ class Cylinder(I3DObject, ICylinder):
     def __init__(self, lower_coordinates: list, upper_coordinates: list, **kwargs):
         self.sample = kwargs.get('sample', 100)
         self.radius_uom = kwargs.get('radius_uom', 'M')
-        self.lower_radius = lower_coordinates[1]
-        self.upper_radius = upper_coordinates[1]
+        lower_radius, upper_radius = kwargs.get('lower_radius', None), kwargs.get('upper_radius', None)
+        self.lower_radius = lower_coordinates[1] if lower_radius is None else lower_radius
+        self.upper_radius = upper_coordinates[1] if upper_radius is None else upper_radius
+        lower_ring, upper_ring = self.solve_rings(lower_coordinates[0], upper_coordinates[0])
         self.lower_layer = self.create_layer(
             (lower_coordinates[0], self.lower_radius),
             kwargs.get('lower_layer', None),
-            kwargs.get('lower_layer_uom', 'M')
+            kwargs.get('lower_layer_uom', 'M'),
+            ring=lower_ring
         )
         self._upper_layer = self.create_layer(
             (upper_coordinates[0], self.upper_radius),
             kwargs.get('upper_layer', None),
-            kwargs.get('upper_layer_uom', 'M')
+            kwargs.get('upper_layer_uom', 'M'),
+            ring=upper_ring
         )
         self._sides = self.generate_sides()
 
@@ -287,33 +290,50 @@ class Cylinder(I3DObject, ICylinder):
         """
         lower = [(p.x, p.y, p.z) for p in self.lower_layer]
         upper = [(p.x, p.y, p.z) for p in self.upper_layer]
-        sides = []
-
-        for polygon in self.sides:
-            holding_list = []
-            for point_list in polygon:
-                holding_list.append((point_list.x, point_list.y, point_list.z))
-            sides.append(holding_list)
+        sides = [[lower[i], lower[j], upper[j], upper[i], lower[i]] for i, j in wall_indices(len(lower))]
 
         return lower, upper, sides
 
-    def create_layer(self, coordinate_list: tuple[list[str, float, int]], layer_height, layer_uom) -> ICircle:
+    def solve_rings(self, lower_centre: list, upper_centre: list) -> tuple:
+        """
+        Solves the rings of both layers in one batched call when they share a centre.
+
+        Args:
+            lower_centre (list): The lower layer's centre coordinate
+            upper_centre (list): The upper layer's centre coordinate
+
+        Returns:
+            lower_ring, upper_ring (tuple): x, y coordinates of each layer's circumference, or None for both if the
+                centres differ and each layer must solve its own.
+        """
+        if lower_centre != upper_centre:
+            return None, None
+
+        centre = PointFactory(lower_centre).process_coordinates()[0]
+        radii = [convert_to_metres(float(r), self.radius_uom) for r in (self.lower_radius, self.upper_radius)]
+        lower_ring, upper_ring = concentric_arc_coordinates(centre, 0, -360 / self.sample, radii, self.sample)
+        return lower_ring, upper_ring
+
+    def create_layer(self, coordinate_list: tuple[list[str, float, int]], layer_height, layer_uom,
+                     ring: Union[list[tuple], None] = None) -> ICircle:
         """
         Creates a 2D circle to act as the top or bottom layer of the cylinder
         Args:
             coordinate_list (tuple[list[str, float, int]]): Contains string information for coordinate and radius
             layer_height: The z value of the layer
+            ring (list[tuple]): x, y coordinates of the circle, if already solved
 
         Returns:
             circle (ICircle): A circle object
         """
         circle = Circle(coordinate_list[0], coordinate_list[1], z=layer_height,
-                        uom=layer_uom, radius_uom=self.radius_uom)
+                        uom=layer_uom, radius_uom=self.radius_uom, sample=self.sample, ring=ring)
         return circle
 
     def generate_sides(self) -> list[ICircle]:
         """
-        Creates the sides of the cylinder. Requires both layers to contain the same amount of points.
+        Creates the sides of the cylinder. Requires both layers to contain the same amount of points, which need not
+        be the same distance from the centre.
 
         Returns:
             side_coordinates (list[IPolygon]): A list of polygons joining the upper and lower layers together.
@@ -325,18 +345,21 @@ class Cylinder(I3DObject, ICylinder):
             raise IndexError(f'Lower and upper polygon must contain the same amount of points.  Point count - lower'
                              f'polygon: {len(self.lower_layer)} upper polygon: {len(self.upper_layer)}')
         else:
-            side_coordinates = []
-            i = 0
-            while i < len(self.lower_layer) - 1:
-                polygon_coordinate_list = [self.lower_layer.point_list[i].__str__(), self.lower_layer[i + 1].__str__(),
-                                           self.upper_layer[i + 1].__str__(), self.upper_layer[i].__str__(),
-                                           self.lower_layer[i].__str__()]
+            # Each wall shares the Point objects of the layers rather than parsing copies of them
+            lower, upper = self.lower_layer.point_list, self.upper_layer.point_list
+            return [Polygon([lower[i], lower[j], upper[j], upper[i], lower[i]])
+                    for i, j in wall_indices(len(lower))]
 
-                side_coordinates.append(Polygon(polygon_coordinate_list))
 
-                i += 1
+def wall_indices(count: int) -> list[tuple[int, int]]:
+    """
+    Pairs the indices of consecutive vertices of a closed layer of count vertices, whose last vertex repeats the first.
+    Each pair (i, j) gives the wall from vertex i to vertex j of the lower layer up to the same vertices of the upper.
 
-            return side_coordinates
+    Returns:
+        pairs (list[tuple[int, int]])
+    """
+    return list(zip(range(count - 1), range(1, count)))
 
 
 class Polygon(IPolygon, I2DObject):
@@ -349,29 +372,24 @@ class Polygon(IPolygon, I2DObject):
     Keyword Args:
         uom (str): Unit of measure for elevation, FT or M
         z (float): Override all string elevation values with a single blanket value.
+        densify (float): Maximum spacing in metres between vertices, including the closing edge. Longer edges are
+            divided along the geodesic.
     """
-    __slots__ = ('uom', '_z', '_point_list', 'centroid')
+    __slots__ = ('uom', '_z', '_point_list', '_metrics', '_centroid')
 
     def __init__(self, coordinate_list: list, **kwargs: str):
         self.uom = kwargs.get('uom', 'M')
         self.z = kwargs.get('z', None)
         self.point_list = self.process_points(coordinate_list)
-        self.centroid = self.calculate_centroid()
+
+        if kwargs.get('densify', None):
+            self.point_list = densify_points(self.point_list, kwargs['densify'])
 
     def __len__(self) -> int:
         return len(self.point_list)
 
     def __iter__(self):
-        self.n = 0
-        return self
-
-    def __next__(self):
-        if self.n < len(self.point_list):
-            result = self.point_list[self.n]
-            self.n += 1
-            return result
-        else:
-            raise StopIteration
+        return iter(self.point_list)
 
     def __getitem__(self, index):
         return self.point_list[index]
@@ -379,6 +397,8 @@ class Polygon(IPolygon, I2DObject):
     def __setitem__(self, index, point):
         if isinstance(point, Point):
             self.point_list[index] = point
+            self._metrics = None
+            self._centroid = None
         else:
             raise TypeError('Polygon will only accept objects of type kmlplus.geo.Point')
 
@@ -408,9 +428,31 @@ class Polygon(IPolygon, I2DObject):
                 first_vertice = a_point_list[0]
                 a_point_list.append(first_vertice)
             self._point_list = a_point_list
+            self._metrics = None
+            self._centroid = None
         else:
             raise ValueError('Cannot process_points a polygon from less than 2 points')
 
+    @property
+    def metrics(self) -> 'PolygonMetrics':
+        """
+        Geodesic area, perimeter, bounding box and centroid of the polygon. Calculated on first access.
+
+        Returns:
+            metrics (PolygonMetrics)
+        """
+        if self._metrics is None:
+            from kmlplus.metrics import polygon_metrics
+
+            self._metrics = polygon_metrics(self)
+        return self._metrics
+
+    @property
+    def centroid(self) -> ILocation:
+        if self._centroid is None:
+            self._centroid = self.calculate_centroid()
+        return self._centroid
+
     def calculate_centroid(self) -> ILocation:
         """
         Calculates the centre (centroid) of the polygon's area. This is used for sorting the polygons so that they are
@@ -419,14 +461,7 @@ class Polygon(IPolygon, I2DObject):
         Returns:
             point (ILocation)
         """
-        latitude_total, longitude_total = 0, 0
-        for coordinate_instance in self.point_list:
-            latitude_total += coordinate_instance.y
-            longitude_total += coordinate_instance.x
-        latitude_average, longitude_average = latitude_total / len(self.point_list), \
-                                              longitude_total / len(self.point_list)
-
-        point = Point(latitude_average, longitude_average, uom=self.uom, z=self.z)
+        point = Point(self.metrics.centroid_y, self.metrics.centroid_x, uom=self.uom, z=self.z)
         return point
 
     def calculate_bearing_from_centroid(self, point: ILocation) -> ILocation:
@@ -475,12 +510,15 @@ class Polyhedron(I3DObject):
         lower_layer_uom (str): Unit of measure for elevation
         upper_layer (float): The elevation of the upper layer
         upper_layer_uom (str): Unit of measure for elevation
+        densify (float): Maximum spacing in metres between the vertices of each layer. Both layers must have the same
+            horizontal outline so that they are divided into the same number of vertices.
 
     """
 
-    __slots__ = ('uom', '_lower_layer', '_upper_layer', '_sides')
+    __slots__ = ('uom', '_lower_layer', '_upper_layer', '_sides', 'densify')
 
     def __init__(self, lower_coordinates: list[str], upper_coordinates: list[str], **kwargs: str):
+        self.densify = kwargs.get('densify', None)
         self.lower_layer = self.create_layer(
             lower_coordinates,
             kwargs.get('lower_layer', 0.0),
@@ -534,9 +572,9 @@ class Polyhedron(I3DObject):
 
         """
         if layer_height:
-            poly = Polygon(coordinate_list, z=layer_height, uom=layer_uom)
+            poly = Polygon(coordinate_list, z=layer_height, uom=layer_uom, densify=self.densify)
         else:
-            poly = Polygon(coordinate_list)
+            poly = Polygon(coordinate_list, densify=self.densify)
         return poly
 
     def to_kml(self) -> tuple:
@@ -595,29 +633,22 @@ class LineString(I2DObject):
 
     Keyword Args:
         uom (str): Unit of measure for elevation, FT or M.
+        densify (float): Maximum spacing in metres between vertices. Longer edges are divided along the geodesic.
     """
 
-    __slots__ = ('uom', '_z', 'point_list')
+    __slots__ = ('uom', '_z', 'point_list', 'densify')
 
     def __init__(self, coordinate_list, **kwargs):
         self.uom = kwargs.get('uom', 'M')
         self.z = kwargs.get('z', None)
+        self.densify = kwargs.get('densify', None)
         self.point_list = self.create(coordinate_list)
 
     def __len__(self):
         return len(self.point_list)
 
     def __iter__(self):
-        self.n = 0
-        return self
-
-    def __next__(self):
-        if self.n < len(self.point_list):
-            result = self.point_list[self.n]
-            self.n += 1
-            return result
-        else:
-            raise StopIteration
+        return iter(self.point_list)
 
     def __getitem__(self, index):
         return self.point_list[index]
@@ -640,5 +671,5 @@ class LineString(I2DObject):
             self._z = None
 
     def create(self, coordinate_list: list[str]) -> list[ILocation]:
-        point_list = PointFactory(coordinate_list, z=self.z, uom=self.uom).process_coordinates()
+        point_list = PointFactory(coordinate_list, z=self.z, uom=self.uom, densify=self.densify).process_coordinates()
         return point_list
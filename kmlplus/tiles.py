@@ -0,0 +1,145 @@
+import math
+import os
+from typing import Union
+
+from kmlplus.kml import KmlPlus, init_worker, worker_settings
+from kmlplus.tokenizer import ARC, tokenize
+
+
+class TiledKmlPlus:
+    """
+    Creates a tiled set of .kml files rather than a single document. Shapes are partitioned into a grid of tiles by the
+    location of their first coordinate and each tile is written to its own file by a pool of worker processes. A root
+    document links to every tile with a NetworkLink and Region so that clients only load the tiles in view.
+
+    Accepts the point, linestring, polyhedron, circle and cylinder methods of KmlPlus with the same arguments. The
+    points, track and model methods are not supported, as their shapes have no single coordinate string to place them
+    in a tile by.
+
+    Keyword Args:
+        output (str): Directory in which the root document and tiles are saved. Defaults to the working directory.
+        file_name (str): Name of the root document. Defaults to 'KmlPlus.kml'
+        tile_size (float): Width and height of each tile in decimal degrees. Defaults to 1.0
+        kmz (bool): Whether to save tiles as .kmz archives. Defaults to False
+        jobs (int): Number of worker processes. Defaults to the number of CPUs. 1 writes tiles in this process.
+        min_lod_pixels (int): Size in pixels a tile's region must reach on screen before it is loaded. Defaults to 128
+    """
+    __slots__ = ('output_path', 'save_name', 'tile_size', 'kmz', 'jobs', 'min_lod_pixels', 'tiles')
+
+    def __init__(self, **kwargs: Union[str, int, float, bool]):
+        self.output_path = kwargs.get('output', None) or os.getcwd()
+        self.save_name = kwargs.get('file_name', 'KmlPlus.kml')
+        self.tile_size = float(kwargs.get('tile_size', 1.0))
+        self.kmz = kwargs.get('kmz', False)
+        self.jobs = kwargs.get('jobs', None)
+        self.min_lod_pixels = kwargs.get('min_lod_pixels', 128)
+        self.tiles: dict = {}
+
+    def point(self, coordinate_list: list, **kwargs) -> None:
+        self.add('point', coordinate_list, **kwargs)
+
+    def linestring(self, coordinate_list: list, **kwargs) -> None:
+        self.add('linestring', coordinate_list, **kwargs)
+
+    def polyhedron(self, lower_coordinate_list: list, upper_coordinate_list: list, **kwargs) -> None:
+        self.add('polyhedron', lower_coordinate_list, upper_coordinate_list, **kwargs)
+
+    def circle(self, coordinate_list: list, radius: float, **kwargs) -> None:
+        self.add('circle', coordinate_list, radius, **kwargs)
+
+    def cylinder(self, coordinate_list: list, radius: float, **kwargs) -> None:
+        self.add('cylinder', coordinate_list, radius, **kwargs)
+
+    def add(self, method: str, coordinate_list: list, *args, **kwargs) -> None:
+        """
+        Records a shape against the tile containing its first coordinate. Geometry is not computed until save.
+
+        Args:
+            method (str): Name of the KmlPlus method which creates the shape
+            coordinate_list (list): The shape's coordinates
+        """
+        key = self.tile_key(coordinate_list)
+        self.tiles.setdefault(key, []).append((method, (coordinate_list,) + args, kwargs))
+
+    def tile_key(self, coordinate_list: list) -> tuple[int, int]:
+        """
+        Finds the grid cell containing the first coordinate of a shape.
+
+        Args:
+            coordinate_list (list): A list of coordinate strings
+
+        Returns:
+            row, column (tuple[int, int])
+        """
+        first = coordinate_list[0] if isinstance(coordinate_list, list) else coordinate_list
+        token = tokenize([first])[0]
+        if token[0] == ARC:
+            token = token[3]
+
+        _, y, x, _ = token
+        return math.floor(y / self.tile_size), math.floor(x / self.tile_size)
+
+    def tile_name(self, key: tuple[int, int]) -> str:
+        extension = 'kmz' if self.kmz else 'kml'
+        return f'tile_{key[0]}_{key[1]}.{extension}'
+
+    def save(self) -> list[str]:
+        """
+        Writes every tile in parallel followed by the root document.
+
+        Returns:
+            paths (list[str]): Paths of the tile files written.
+        """
+        import simplekml
+
+        os.makedirs(self.output_path, exist_ok=True)
+
+        keys = sorted(self.tiles)
+        paths = [os.path.join(self.output_path, self.tile_name(key)) for key in keys]
+        calls = [self.tiles[key] for key in keys]
+
+        if self.jobs == 1 or len(keys) < 2:
+            bounds = list(map(write_tile, paths, calls))
+        else:
+            from concurrent.futures import ProcessPoolExecutor
+
+            with ProcessPoolExecutor(max_workers=self.jobs, initializer=init_worker,
+                                     initargs=worker_settings()) as executor:
+                bounds = list(executor.map(write_tile, paths, calls))
+
+        root = simplekml.Kml()
+        for key, path, tile_bounds in zip(keys, paths, bounds):
+            if tile_bounds is None:
+                continue
+            north, south, east, west = tile_bounds
+
+            link = root.newnetworklink(name=os.path.splitext(os.path.basename(path))[0])
+            link.link.href = os.path.basename(path)
+            link.link.viewrefreshmode = simplekml.ViewRefreshMode.onregion
+            link.region = simplekml.Region(
+                simplekml.LatLonAltBox(north=north, south=south, east=east, west=west),
+                simplekml.Lod(minlodpixels=self.min_lod_pixels)
+            )
+
+        root.save(os.path.join(self.output_path, self.save_name))
+
+        return paths
+
+
+def write_tile(path: str, calls: list[tuple]) -> Union[tuple, None]:
+    """
+    Builds and saves a single tile. Run in a worker process by TiledKmlPlus.save.
+
+    Args:
+        path (str): Location to save the tile
+        calls (list[tuple]): The KmlPlus method name, args and kwargs for each shape in the tile
+
+    Returns:
+        bounds (tuple | None): The north, south, east and west extent of the tile's geometry.
+    """
+    kml = KmlPlus(file_name=path, autosave=False)
+    for method, args, kwargs in calls:
+        getattr(kml, method)(*args, **kwargs)
+    kml.save()
+
+    return kml.bounds
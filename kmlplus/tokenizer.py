@@ -0,0 +1,173 @@
+import re
+from typing import Iterable, Union
+
+# Token kinds. A point token is (POINT, latitude, longitude, z) with z None when the string has no elevation. An arc
+# token is (ARC, clockwise, sample, start, end, centre), where start, end and centre are point tokens and centre is
+# None when the string has no centre.
+POINT = 0
+ARC = 1
+
+# A whole coordinate string: decimal degrees or DMS latitude and longitude, then an optional elevation
+_POINT = re.compile(
+    r'\s*(?:([+-]?\d{1,3}(?:\.\d+)?)\s+([+-]?\d{1,3}(?:\.\d+)?)'
+    r'|(\d\d)(\d\d)(\d\d(?:\.\d+)?)([NS])\s+(\d{3})(\d\d)(\d\d(?:\.\d+)?)([EW]))'
+    r'(?:\s+([+-]?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?))?\s*'
+)
+# One key=value pair of a curved segment string, up to the next comma
+_PAIR = re.compile(r'\s*([A-Za-z_]+)\s*=\s*([^,=]*?)\s*(?:,|$)')
+
+# Single fields, used to locate the error in a coordinate string which does not match _POINT
+_FIELD = re.compile(r'\S+')
+_DD = re.compile(r'[+-]?\d{1,3}(?:\.\d+)?')
+_DMS_LATITUDE = re.compile(r'\d{6}(?:\.\d+)?[NS]')
+_DMS_LONGITUDE = re.compile(r'\d{7}(?:\.\d+)?[EW]')
+_ELEVATION = re.compile(r'[+-]?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?')
+
+_ARC_POINTS = ('start', 'end', 'centre')
+_DIRECTIONS = {'clockwise': True, 'anticlockwise': False}
+
+
+class CoordinateSyntaxError(ValueError):
+    """
+    Raised when a coordinate or curved segment string does not follow the coordinate grammar.
+
+    Attributes:
+        message (str): What was expected
+        text (str): The string containing the error
+        column (int): Position of the error in the string, counting from 1
+        item (int | None): Position of the string in its coordinate list, if known
+    """
+
+    def __init__(self, message: str, text: str, column: int, item: Union[int, None] = None):
+        super().__init__(message)
+        self.message = message
+        self.text = text
+        self.column = column
+        self.item = item
+
+    def __str__(self) -> str:
+        location = f'column {self.column}' if self.item is None else f'item {self.item}, column {self.column}'
+        return f'{self.message} at {location} of {self.text!r}'
+
+
+def tokenize(coordinate_list: Iterable[str]) -> list[tuple]:
+    """
+    Tokenizes a list of coordinate and curved segment strings in a single pass over each string.
+
+    Args:
+        coordinate_list (Iterable[str]): Strings in the formats accepted by PointFactory
+
+    Returns:
+        tokens (list[tuple]): A point or arc token for each string, see POINT and ARC.
+
+    Raises:
+        CoordinateSyntaxError: If a string is invalid, giving its position in the list and the column of the error.
+    """
+    tokens = []
+    for index, text in enumerate(coordinate_list):
+        try:
+            tokens.append(parse_arc(text) if '=' in text else parse_point(text))
+        except CoordinateSyntaxError as e:
+            e.item = index
+            raise
+    return tokens
+
+
+def parse_point(text: str, start: int = 0, end: Union[int, None] = None) -> tuple:
+    """
+    Parses a coordinate string, or the part of a longer string between start and end, into a point token.
+
+    Returns:
+        token (tuple): (POINT, latitude, longitude, z)
+    """
+    end = len(text) if end is None else end
+    match = _POINT.fullmatch(text, start, end)
+    if match is None:
+        raise point_error(text, start, end)
+
+    lat, lon, lat_d, lat_m, lat_s, lat_h, lon_d, lon_m, lon_s, lon_h, z = match.groups()
+    if lat is not None:
+        y, x = float(lat), float(lon)
+    else:
+        # Summed in the same order as kmlplus.util.dms_to_decimal so both give identical values
+        y = int(lat_d) + (int(lat_m) / 60 + float(lat_s) / 3600)
+        x = int(lon_d) + (int(lon_m) / 60 + float(lon_s) / 3600)
+        if lat_h == 'S':
+            y = -y
+        if lon_h == 'W':
+            x = -x
+
+    return POINT, y, x, None if z is None else float(z)
+
+
+def parse_arc(text: str) -> tuple:
+    """
+    Parses a curved segment string of comma separated key=value pairs into an arc token. start and end are required.
+    centre (or center), direction and sample are optional, defaulting to the midpoint of start and end, clockwise and
+    100. Other keys are ignored.
+
+    Returns:
+        token (tuple): (ARC, clockwise, sample, start, end, centre)
+    """
+    points = {}
+    clockwise, sample = True, 100
+    seen = set()
+    position = 0
+    while position < len(text):
+        match = _PAIR.match(text, position)
+        if match is None or match.end() == position:
+            raise CoordinateSyntaxError('Expected key=value', text, position + 1)
+
+        key = match.group(1).lower()
+        key = 'centre' if key == 'center' else key
+        if key in seen:
+            raise CoordinateSyntaxError(f'Duplicate {key}', text, match.start(1) + 1)
+        seen.add(key)
+
+        value_start, value_end = match.span(2)
+        value = match.group(2)
+        if key in _ARC_POINTS:
+            points[key] = parse_point(text, value_start, value_end)
+        elif key == 'direction':
+            if value.lower() not in _DIRECTIONS:
+                raise CoordinateSyntaxError('Direction must be clockwise or anticlockwise', text, value_start + 1)
+            clockwise = _DIRECTIONS[value.lower()]
+        elif key == 'sample':
+            if not value.isdigit() or int(value) < 1:
+                raise CoordinateSyntaxError('Sample must be a whole number above 0', text, value_start + 1)
+            sample = int(value)
+        position = match.end()
+
+    for key in ('start', 'end'):
+        if key not in points:
+            raise CoordinateSyntaxError(f'Curved segment is missing {key}', text, len(text) + 1)
+
+    return ARC, clockwise, sample, points['start'], points['end'], points.get('centre')
+
+
+def point_error(text: str, start: int, end: int) -> CoordinateSyntaxError:
+    """
+    Finds the first invalid field of a coordinate string which does not match the grammar. Only called once parsing
+    has failed, so the fast path is not slowed by error reporting.
+    """
+    fields = list(_FIELD.finditer(text, start, end))
+    if len(fields) < 2:
+        column = fields[0].end() + 1 if fields else start + 1
+        return CoordinateSyntaxError('Expected a latitude and longitude', text, column)
+
+    latitude, longitude = fields[0], fields[1]
+    dms = _DMS_LATITUDE.fullmatch(latitude.group()) is not None
+    if not dms and _DD.fullmatch(latitude.group()) is None:
+        return CoordinateSyntaxError('Expected a latitude in decimal degrees (DD.dd) or DMS (DDMMSS.ssN)', text,
+                                     latitude.start() + 1)
+
+    expected = _DMS_LONGITUDE if dms else _DD
+    if expected.fullmatch(longitude.group()) is None:
+        form = 'DMS (DDDMMSS.ssW)' if dms else 'decimal degrees (DDD.dd)'
+        return CoordinateSyntaxError(f'Expected a longitude in {form} to match the latitude', text,
+                                     longitude.start() + 1)
+
+    if len(fields) > 2 and _ELEVATION.fullmatch(fields[2].group()) is None:
+        return CoordinateSyntaxError('Expected an elevation', text, fields[2].start() + 1)
+    extra = fields[3] if len(fields) > 3 else fields[2]
+    return CoordinateSyntaxError('Unexpected text after the coordinate', text, extra.start() + 1)
@@ -0,0 +1,212 @@
+import math
+import os
+import shutil
+import tempfile
+from datetime import datetime, timezone
+from typing import Iterable, Iterator, Union
+from xml.sax.saxutils import escape
+
+from kmlplus.geodesic import ECCENTRICITY_SQUARED, SEMI_MAJOR_AXIS, wrap_azimuth, wrap_longitude
+from kmlplus.kml import kml_altitude_mode
+from kmlplus.placemarks import TrackPlacemark, kml_time
+from kmlplus.util import convert_to_metres
+
+
+def fix_tuple(fix: tuple, uom: str = 'M') -> tuple:
+    """
+    Converts a track fix to a kml formatted tuple with its time.
+
+    Args:
+        fix (tuple): Latitude, longitude, altitude and an optional time. Times may be seconds since the Unix epoch, a
+            datetime or an ISO 8601 string. Datetimes without a time zone are taken to be UTC.
+        uom (str): Unit of measure of the altitude
+
+    Returns:
+        fix (tuple): Longitude, latitude, altitude in metres and seconds since the Unix epoch, or None if the fix has
+            no time.
+    """
+    time = fix[3] if len(fix) > 3 else None
+    if isinstance(time, str):
+        # fromisoformat only accepts a Z suffix from Python 3.11
+        time = datetime.fromisoformat(time[:-1] + '+00:00' if time.endswith('Z') else time)
+    if isinstance(time, datetime):
+        time = (time if time.tzinfo else time.replace(tzinfo=timezone.utc)).timestamp()
+    return float(fix[1]), float(fix[0]), convert_to_metres(float(fix[2]), uom), None if time is None else float(time)
+
+
+def local_offset(a: tuple, b: tuple) -> tuple[float, float]:
+    """
+    East and north offsets in metres from one kml tuple to another, on a plane fitted to the ellipsoid's radii of
+    curvature at their mean latitude. Accurate to well under a metre between fixes a few kilometres apart, which is
+    plenty for choosing which fixes to keep, and far cheaper than solving the geodesic for every fix.
+    """
+    lat = math.radians((a[1] + b[1]) / 2)
+    w = 1 - ECCENTRICITY_SQUARED * math.sin(lat) ** 2
+    prime_vertical = SEMI_MAJOR_AXIS / math.sqrt(w)
+    meridional = prime_vertical * (1 - ECCENTRICITY_SQUARED) / w
+    return (math.radians(wrap_longitude(b[0] - a[0])) * prime_vertical * math.cos(lat),
+            math.radians(b[1] - a[1]) * meridional)
+
+
+def decimate(fixes: Iterable[tuple], **kwargs: Union[float, str]) -> Iterator[tuple]:
+    """
+    Thins a stream of track fixes as it is read, holding only the last fix kept and the last fix read. The first and
+    last fixes are always kept. Any other fix is kept if it passes one of the thresholds given: it is at least
+    min_distance from the last fix kept, at least min_interval seconds after it, or the course has turned by at least
+    min_angle since it. Without thresholds every fix is kept.
+
+    Args:
+        fixes (Iterable[tuple]): Latitude, longitude, altitude and optional time of each fix, in order. See fix_tuple.
+
+    Keyword Args:
+        uom (str): Unit of measure of the altitudes. Default is metres (M).
+        min_distance (float): Distance from the last fix kept at which a fix is kept
+        distance_uom (str): Unit of measure of min_distance. Default is metres (M).
+        min_angle (float): Change of course in degrees since the last fix kept at which a fix is kept
+        min_interval (float): Seconds since the last fix kept at which a fix is kept. Every fix must have a time.
+
+    Yields:
+        fix (tuple): Longitude, latitude, altitude in metres and time of each fix kept. See fix_tuple.
+
+    Raises:
+        ValueError: If min_interval is given and a fix has no time.
+    """
+    uom = kwargs.get('uom', 'M')
+    min_distance = convert_to_metres(kwargs.get('min_distance', 0), kwargs.get('distance_uom', 'M'))
+    min_angle = kwargs.get('min_angle', 0)
+    min_interval = kwargs.get('min_interval', 0)
+    thresholds = min_distance > 0 or min_angle > 0 or min_interval > 0
+
+    kept = previous = None
+    kept_course = course = None
+    for fix in fixes:
+        fix = fix_tuple(fix, uom)
+        if previous is None:
+            yield fix
+            kept = previous = fix
+            continue
+
+        if min_angle > 0:
+            east, north = local_offset(previous, fix)
+            if east or north:
+                course = math.degrees(math.atan2(east, north))
+                if kept_course is None:
+                    kept_course = course
+
+        keep = not thresholds
+        if not keep and min_distance > 0:
+            keep = math.hypot(*local_offset(kept, fix)) >= min_distance
+        if not keep and min_interval > 0:
+            if fix[3] is None or kept[3] is None:
+                raise ValueError('Decimating by min_interval requires a time for every fix')
+            keep = fix[3] - kept[3] >= min_interval
+        if not keep and min_angle > 0 and course is not None:
+            keep = abs(wrap_azimuth(course - kept_course)) >= min_angle
+
+        if keep:
+            yield fix
+            kept, kept_course = fix, course
+        previous = fix
+
+    if previous is not kept:
+        yield previous
+
+
+class TrackWriter:
+    """
+    Streams tracks to a KML document, each as a LineString or gx:Track Placemark. Fixes are decimated and written as
+    they are read, so memory use does not grow with the length of a track or the number of tracks. The gx:coord
+    elements of a gx:Track, which follow all of its when elements, are spooled to a temporary file beside the output
+    until the track ends.
+
+    Args:
+        path (str): Location of the .kml file
+
+    Keyword Args:
+        name (str): Name of the document. Defaults to the file name.
+
+    Usage:
+        with TrackWriter('tracks.kml') as writer:
+            writer.write(fixes, name='BAW123', kind='track', uom='FT', min_distance=0.5, distance_uom='NM')
+    """
+    __slots__ = ('path', '_file', 'count')
+
+    def __init__(self, path: str, **kwargs: str):
+        self.path = path
+        self._file = open(path, 'w', encoding='utf-8')
+        self._file.write('<?xml version="1.0" encoding="UTF-8"?>\n<kml xmlns="http://www.opengis.net/kml/2.2" '
+                         'xmlns:gx="http://www.google.com/kml/ext/2.2"><Document><name>'
+                         f'{escape(kwargs.get("name", os.path.splitext(os.path.basename(path))[0]))}</name>')
+        self.count = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def write(self, fixes: Iterable[tuple], **kwargs: Union[float, str, int]) -> int:
+        """
+        Decimates a track and appends it to the document.
+
+        Args:
+            fixes (Iterable[tuple]): Latitude, longitude, altitude and optional time of each fix, in order
+
+        Keyword Args:
+            name (str): The name of the Placemark
+            kind (str): 'linestring' or 'track'. A gx:Track requires a time for every fix. Defaults to 'linestring'.
+            colour_hex (str): String representing a colour hex
+            width (int): Line width
+            extrude (int): 1 or 0, Whether to extrude a LineString
+            altitude_mode (str): Accepts simplekml Altitude mode options
+            Decimation keyword arguments as for decimate.
+
+        Returns:
+            count (int): Number of fixes written.
+
+        Raises:
+            ValueError: If a gx:Track fix has no time. Nothing of the track is written.
+        """
+        style = f'<Style><LineStyle><color>{kwargs.get("colour_hex", "7Fc0c0c0")}</color>' \
+                f'<width>{kwargs.get("width", 1)}</width></LineStyle></Style>'
+        placemark = TrackPlacemark(kwargs.get('name', 'KmlPlus Track'), style, None,
+                                   kind=kwargs.get('kind', 'linestring'), extrude=kwargs.get('extrude', 0),
+                                   altitude_mode=kml_altitude_mode(kwargs))
+
+        start = self._file.tell()
+        self._file.write(placemark.start())
+        count = 0
+        try:
+            if placemark.kind == 'track':
+                with tempfile.TemporaryFile('w+', encoding='utf-8',
+                                            dir=os.path.dirname(os.path.abspath(self.path))) as spool:
+                    for x, y, z, time in decimate(fixes, **kwargs):
+                        if time is None:
+                            raise ValueError('Every fix of a gx:Track requires a time')
+                        self._file.write(f'<when>{kml_time(time)}</when>')
+                        spool.write(placemark.vertex(x, y, z))
+                        count += 1
+                    spool.seek(0)
+                    shutil.copyfileobj(spool, self._file)
+            else:
+                for x, y, z, _ in decimate(fixes, **kwargs):
+                    self._file.write(placemark.vertex(x, y, z))
+                    count += 1
+        except BaseException:
+            # Remove the unfinished Placemark so the document stays well formed
+            self._file.seek(start)
+            self._file.truncate()
+            raise
+        self._file.write(placemark.end())
+
+        self.count += 1
+        return count
+
+    def close(self) -> None:
+        """
+        Ends the document and closes the file.
+        """
+        if self._file.closed:
+            return
+        self._file.write('</Document></kml>\n')
+        self._file.close()
@@ -1,4 +1,5 @@
 import re
+from functools import lru_cache
 
 
 def dms_to_decimal(latitude_or_longitude):
@@ -49,6 +50,18 @@ def calculate_dms_to_decimal(dms_sliced_dict):
 
 
 def convert_to_metres(a_value, a_uom):
+    return round((a_value * uom_modifier(a_uom)), 3)
+
+
+@lru_cache(maxsize=None)
+def uom_modifier(a_uom: str) -> float:
+    """
+    Finds the number of metres in a unit of measure. Units are matched case insensitively by prefix, so 'F' is feet.
+    Cached, as every Point converts its elevation.
+
+    Raises:
+        TypeError: If the unit is not accepted.
+    """
     conversion_dict = {
         'KM': 1000,
         'MI': 1609.344,
@@ -67,7 +80,7 @@ def convert_to_metres(a_value, a_uom):
         raise TypeError(f'{a_uom} is not an accepted unit of measure. Accepted units of measure are M, MI, KM, FT'
                         f' and NM')
     else:
-        return round((a_value * modifier), 3)
+        return modifier
 
 
 def get_earth_radius(**kwargs) -> float:
@@ -0,0 +1,124 @@
+import os
+import tempfile
+import threading
+from unittest import TestCase
+
+from kmlplus.cache import GeometryCache, canonical_key, get_geometry_cache, set_geometry_cache, using_geometry_cache
+from kmlplus.geo import ClockwiseCurvedSegment, Point
+from kmlplus.kml import KmlPlus
+from kmlplus.shapes import Circle
+
+
+class TestGeometryCache(TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = GeometryCache(os.path.join(self.tmp.name, 'cache', 'geometry.sqlite'), evict_interval=1)
+
+    def tearDown(self):
+        set_geometry_cache(None)
+        self.cache.close()
+        self.tmp.cleanup()
+
+    def test_canonical_key(self):
+        self.assertEqual(canonical_key('ring', 55.1111, 10, 100), canonical_key('ring', 55.1111, 10.0, 100.0))
+        self.assertNotEqual(canonical_key('ring', 55.1111, 10, 100), canonical_key('arc', 55.1111, 10, 100))
+
+    def test_get_and_put(self):
+        self.assertIsNone(self.cache.get('a'))
+        self.cache.put('a', [(1.5, 2.5), (3.5, 4.5)])
+        self.assertEqual([(1.5, 2.5), (3.5, 4.5)], self.cache.get('a'))
+        self.assertEqual(1, len(self.cache))
+
+        # A second connection, as used by another process, sees the same entries
+        other = GeometryCache(self.cache.path)
+        self.assertEqual([(1.5, 2.5), (3.5, 4.5)], other.get('a'))
+        other.close()
+
+    def test_lru_eviction(self):
+        self.cache.max_entries = 2
+        self.cache.put('a', [(1.0, 1.0)])
+        self.cache.put('b', [(2.0, 2.0)])
+        self.cache.get('a')
+        self.cache.put('c', [(3.0, 3.0)])
+
+        self.assertEqual(2, len(self.cache))
+        self.assertIsNone(self.cache.get('b'))
+        self.assertIsNotNone(self.cache.get('a'))
+        self.assertIsNotNone(self.cache.get('c'))
+
+    def test_size_eviction(self):
+        # Each pair of doubles is 16 bytes
+        self.cache.max_bytes = 40
+        self.cache.put('a', [(1.0, 1.0)])
+        self.cache.put('b', [(2.0, 2.0)])
+        self.cache.put('c', [(3.0, 3.0)])
+
+        self.assertEqual(2, len(self.cache))
+        self.assertIsNone(self.cache.get('a'))
+
+    def test_shapes_use_cache(self):
+        uncached = Circle(['55.1111 -3.2311'], 10, sample=20)
+        set_geometry_cache(self.cache)
+        self.assertIs(self.cache, get_geometry_cache())
+
+        cold = Circle(['55.1111 -3.2311'], 10, sample=20)
+        self.assertEqual(1, len(self.cache))
+        warm = Circle(['55.1111 -3.2311'], 10, sample=20)
+        self.assertEqual(1, len(self.cache))
+
+        for a, b, c in zip(uncached, cold, warm):
+            self.assertEqual((a.x, a.y), (b.x, b.y))
+            self.assertEqual((a.x, a.y), (c.x, c.y))
+
+        segment = ClockwiseCurvedSegment(Point.from_dms('551206.00N', '0045206.234W'),
+                                         Point.from_dms('501206.00N', '0045206.234W'), sample=10)
+        first = [(p.x, p.y) for p in segment.get_points()]
+        self.assertEqual(2, len(self.cache))
+        segment.z = None
+        self.assertEqual(first, [(p.x, p.y) for p in segment.get_points()])
+
+    def test_keyed_by_solver(self):
+        from kmlplus.geodesic import get_geodesic_backend, set_geodesic_backend, set_tangent_plane_tolerance
+
+        backend = get_geodesic_backend()
+        uncached = [(p.x, p.y) for p in Circle(['55.1111 -3.2311'], 50000, sample=20)]
+        set_geometry_cache(self.cache)
+        try:
+            set_geodesic_backend('spherical')
+            spherical = [(p.x, p.y) for p in Circle(['55.1111 -3.2311'], 50000, sample=20)]
+            set_geodesic_backend(backend)
+            self.assertEqual(uncached, [(p.x, p.y) for p in Circle(['55.1111 -3.2311'], 50000, sample=20)])
+            self.assertNotEqual(uncached, spherical)
+
+            set_tangent_plane_tolerance(1000)
+            self.assertNotEqual(uncached, [(p.x, p.y) for p in Circle(['55.1111 -3.2311'], 50000, sample=20)])
+            self.assertEqual(3, len(self.cache))
+        finally:
+            set_geodesic_backend(backend)
+            set_tangent_plane_tolerance(0.01)
+
+    def test_using_cache(self):
+        with using_geometry_cache(self.cache):
+            self.assertIs(self.cache, get_geometry_cache())
+            seen = []
+            thread = threading.Thread(target=lambda: seen.append(get_geometry_cache()))
+            thread.start()
+            thread.join()
+            # Other threads keep the process wide cache
+            self.assertEqual([None], seen)
+        self.assertIsNone(get_geometry_cache())
+
+    def test_kmlplus_cache_dir(self):
+        kml = KmlPlus(file_name=os.path.join(self.tmp.name, 'cached.kml'), autosave=False,
+                      cache_dir=os.path.join(self.tmp.name, 'kml'))
+        kml.circle(['55.1111 -3.2311'], 500, sample=20)
+        kml.linestring(['start=55.0 -4.0, end=55.1 -4.0, centre=55.05 -4.0, direction=anticlockwise, sample=16'])
+        self.assertEqual(2, len(kml.cache))
+        self.assertIsNone(get_geometry_cache())
+
+        # Documents and shapes made without cache_dir keep the process wide cache
+        set_geometry_cache(self.cache)
+        KmlPlus(file_name=os.path.join(self.tmp.name, 'other.kml'), autosave=False).circle(['55.2 -3.2'], 500)
+        Circle(['55.3 -3.2'], 500)
+        self.assertEqual(2, len(self.cache))
+        self.assertEqual(2, len(kml.cache))
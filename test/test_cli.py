@@ -0,0 +1,123 @@
+import io
+import json
+import os
+import tempfile
+import zipfile
+from contextlib import redirect_stderr
+from unittest import TestCase
+
+from kmlplus.cache import set_geometry_cache
+from kmlplus.cli import load_spec, main, shape_call
+from kmlplus.kml import KmlPlus
+from kmlplus.reader import iter_placemarks
+
+SHAPES = [
+    {'type': 'cylinder', 'coordinates': ['55.1111 -3.2311'], 'radius': 2, 'radius_uom': 'NM', 'lower_layer': 0,
+     'upper_layer': 1000, 'sample': 20, 'fol': 'Zone'},
+    {'type': 'circle', 'coordinates': '55.5 -3.5', 'radius': 500},
+    {'type': 'polyhedron', 'coordinates': ['55.0 -4.0', '55.0 -3.0', '56.0 -3.0'], 'lower_layer': 10,
+     'upper_layer': 100},
+    {'type': 'point', 'coordinates': ['55.0 -4.0'], 'point_name': 'Marker'},
+]
+
+
+class TestCli(TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.spec = os.path.join(self.tmp.name, 'shapes.json')
+        with open(self.spec, 'w') as f:
+            json.dump(SHAPES, f)
+
+    def tearDown(self):
+        set_geometry_cache(None)
+        self.tmp.cleanup()
+
+    def coordinates(self, path):
+        return [(p.name, [c.tolist() for c in p.coordinates()]) for p in iter_placemarks(path)]
+
+    def test_load_csv(self):
+        path = os.path.join(self.tmp.name, 'shapes.csv')
+        with open(path, 'w') as f:
+            f.write('type,coordinates,radius,lower_layer,upper_layer,colour_hex\n')
+            f.write('cylinder,55.1 -3.2,2.5,0,1000,12345678\n')
+            f.write('polyhedron,"start=55.0 -4.0, end=55.1 -4.0, centre=55.05 -4.0; 55.2 -3.9",,,,\n')
+
+        records = load_spec(path)
+        self.assertEqual({'type': 'cylinder', 'coordinates': ['55.1 -3.2'], 'radius': 2.5, 'lower_layer': 0,
+                          'upper_layer': 1000, 'colour_hex': '12345678'}, records[0])
+        self.assertEqual(['start=55.0 -4.0, end=55.1 -4.0, centre=55.05 -4.0', '55.2 -3.9'], records[1]['coordinates'])
+
+    def test_load_yaml(self):
+        path = os.path.join(self.tmp.name, 'shapes.yaml')
+        with open(path, 'w') as f:
+            f.write('- type: circle\n  coordinates: [55.5 -3.5]\n  radius: 500\n')
+        self.assertEqual([{'type': 'circle', 'coordinates': ['55.5 -3.5'], 'radius': 500}], load_spec(path))
+
+    def test_shape_call(self):
+        self.assertEqual(('circle', (['55.5 -3.5'], 500), {}), shape_call(SHAPES[1]))
+        method, args, kwargs = shape_call(SHAPES[2])
+        self.assertEqual(args[0], args[1])
+        self.assertEqual({'lower_layer': 10, 'upper_layer': 100}, kwargs)
+
+        with self.assertRaises(ValueError):
+            shape_call({'type': 'cone', 'coordinates': ['55.0 -4.0']})
+        with self.assertRaises(ValueError):
+            shape_call({'type': 'circle', 'coordinates': ['55.0 -4.0']})
+
+    def test_main(self):
+        serial = os.path.join(self.tmp.name, 'serial.kml')
+        parallel = os.path.join(self.tmp.name, 'parallel.kml')
+        self.assertEqual(0, main([self.spec, '-o', serial]))
+        self.assertEqual(0, main([self.spec, '-o', parallel, '--jobs', '2']))
+        self.assertEqual(self.coordinates(serial), self.coordinates(parallel))
+        self.assertEqual(0, main([self.spec, '-o', parallel, '--jobs', '2', '--threads']))
+        self.assertEqual(self.coordinates(serial), self.coordinates(parallel))
+
+        stderr = io.StringIO()
+        with redirect_stderr(stderr):
+            main([self.spec, '-o', parallel, '--jobs', '2', '--profile'])
+        self.assertEqual(['load', 'build', 'parse', 'geometry', 'write', 'save', 'total'],
+                         [line.split()[0] for line in stderr.getvalue().splitlines()])
+        self.assertEqual('Marker', self.coordinates(serial)[-1][0])
+
+    def test_options(self):
+        stderr = io.StringIO()
+        with redirect_stderr(stderr):
+            self.assertEqual(0, main([self.spec, '--kmz', '--precision', '3', '--profile',
+                                      '--cache-dir', os.path.join(self.tmp.name, 'cache')]))
+        self.assertEqual(['load', 'build', 'save', 'total'], [line.split()[0] for line in
+                                                              stderr.getvalue().splitlines()])
+
+        path = os.path.join(self.tmp.name, 'shapes.kmz')
+        self.assertTrue(zipfile.is_zipfile(path))
+        self.assertTrue(os.path.exists(os.path.join(self.tmp.name, 'cache', 'geometry.sqlite')))
+        for _, rings in self.coordinates(path):
+            for ring in rings:
+                for coordinate in ring:
+                    self.assertEqual([round(c, 3) for c in coordinate], coordinate)
+
+    def test_progress(self):
+        with redirect_stderr(io.StringIO()) as stderr:
+            self.assertEqual(0, main([self.spec, '--progress']))
+        lines = stderr.getvalue().splitlines()
+        self.assertTrue(lines[-1].startswith('kmlplus: 4/4 shapes'))
+        self.assertIn('eta 0s', lines[-1])
+
+    def test_error(self):
+        with open(self.spec, 'w') as f:
+            json.dump([{'type': 'cone'}], f)
+        with redirect_stderr(io.StringIO()) as stderr:
+            self.assertEqual(1, main([self.spec]))
+        self.assertIn('unknown type', stderr.getvalue())
+
+
+class TestPrecompute(TestCase):
+    def test_precompute(self):
+        calls = [('cylinder', (['55.1111 -3.2311'], 2), {'radius_uom': 'NM', 'sample': 20}),
+                 ('point', (['55.0 -4.0'],), {})]
+        kml = KmlPlus(autosave=False)
+        kml.precompute(calls, jobs=2)
+        self.assertEqual(1, len(kml.precomputed))
+
+        kml.cylinder(['55.1111 -3.2311'], 2, radius_uom='NM', sample=20)
+        self.assertEqual(0, len(kml.precomputed))
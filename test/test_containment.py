@@ -0,0 +1,44 @@
+from unittest import TestCase
+
+import numpy as np
+
+from kmlplus.containment import Footprint, contains, locate, winding_number
+from kmlplus.shapes import Cylinder, Polygon, Polyhedron
+
+
+class TestContainment(TestCase):
+    def setUp(self):
+        self.cylinder = Cylinder(['55.0 -4.0', 5], ['55.0 -4.0', 5], radius_uom='NM', lower_layer=0,
+                                 upper_layer=1000, lower_layer_uom='M', upper_layer_uom='M')
+        self.polyhedron = Polyhedron(['55.0 -3.0', '55.0 -2.0', '56.0 -2.0', '56.0 -3.0'],
+                                     ['55.0 -3.0', '55.0 -2.0', '56.0 -2.0', '56.0 -3.0'],
+                                     lower_layer=500, upper_layer=2000)
+
+    def test_winding_number(self):
+        xs, ys = np.array([0.0, 1.0, 1.0, 0.0]), np.array([0.0, 0.0, 1.0, 1.0])
+        result = winding_number(xs, ys, np.array([0.5, 1.5, 0.5]), np.array([0.5, 0.5, -0.5]))
+        self.assertEqual([1, 0, 0], list(np.abs(result)))
+
+    def test_contains(self):
+        lats = [55.0, 55.0, 55.0, 55.0, 55.2]
+        lons = [-4.0, -4.0, -4.0, -4.1, -4.0]
+        alts = [500, 1500, -1, 500, 500]
+        self.assertEqual([True, False, False, True, False], list(contains(self.cylinder, lats, lons, alts)))
+        self.assertEqual([True, True, True, True, False], list(contains(self.cylinder, lats, lons)))
+
+        mask = contains(self.polyhedron, [55.5, 55.5, 55.5], [-2.5, -2.5, -1.5], [1000, 100, 1000])
+        self.assertEqual([True, False, False], list(mask))
+
+    def test_antimeridian(self):
+        polygon = Polygon(['10.0 179.5', '10.0 -179.5', '11.0 -179.5', '11.0 179.5'])
+        mask = contains(polygon, [10.5, 10.5, 10.5], [179.9, -179.9, 170.0])
+        self.assertEqual([True, True, False], list(mask))
+
+    def test_locate(self):
+        lats = np.array([55.0, 55.5, 40.0])
+        lons = np.array([-4.0, -2.5, 0.0])
+        alts = np.array([100.0, 1000.0, 100.0])
+
+        self.assertEqual([0, 1, -1], list(locate([self.cylinder, self.polyhedron], lats, lons, alts)))
+        named = locate([Footprint(self.cylinder), self.polyhedron], lats, lons, alts, ids=['EGPK', 'EGPF'])
+        self.assertEqual(['EGPK', 'EGPF', None], list(named))
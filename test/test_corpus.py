@@ -0,0 +1,106 @@
+import io
+import os
+import tempfile
+from contextlib import redirect_stdout
+from unittest import TestCase
+
+from kmlplus.cli import load_spec
+from kmlplus.corpus import SyntheticCorpus, format_arc, format_dd, format_dms, main
+from kmlplus.geo import PointFactory
+from kmlplus.kml import KmlPlus
+from kmlplus.shapes import Polygon
+from kmlplus.util import detect_coordinate_type, split_segment_string
+
+
+class TestFormats(TestCase):
+    def test_format_dd(self):
+        self.assertEqual('55.123456 -3.500000', format_dd(55.1234561, -3.5))
+        self.assertEqual('dd', detect_coordinate_type(format_dd(55.1, -3.5)))
+
+    def test_format_dms(self):
+        self.assertEqual('553124.00N 0045830.00W', format_dms(55.52333333, -4.975))
+        self.assertEqual('010000.00S 0010000.00E', format_dms(-0.99999999, 0.99999999))
+        point = PointFactory([format_dms(55.52333333, -4.975)]).process_coordinates()[0]
+        self.assertAlmostEqual(55.52333333, point.y, places=5)
+        self.assertAlmostEqual(-4.975, point.x, places=5)
+
+    def test_format_arc(self):
+        arc = format_arc('55.0 -4.0', '55.1 -4.0', '55.05 -4.0', 'anticlockwise', 16)
+        self.assertEqual({'start': '55.0 -4.0', 'end': '55.1 -4.0', 'centre': '55.05 -4.0',
+                          'direction': 'anticlockwise', 'sample': '16'}, split_segment_string(arc))
+
+
+class TestSyntheticCorpus(TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_seeded(self):
+        self.assertEqual(list(SyntheticCorpus(1).records(2000)), list(SyntheticCorpus(1).records(2000)))
+        self.assertNotEqual(list(SyntheticCorpus(1).records(2000)), list(SyntheticCorpus(2).records(2000)))
+
+    def test_mixture(self):
+        records = list(SyntheticCorpus(0, arcs=0.5).records(40000))
+        self.assertEqual({'polyhedron', 'cylinder', 'circle', 'linestring', 'point'}, {r['type'] for r in records})
+        self.assertGreater(len({r['sample'] for r in records if r['type'] == 'cylinder'}), 1)
+
+        coordinates = [c for r in records for c in r['coordinates']]
+        arcs = [split_segment_string(c) for c in coordinates if c.startswith('start=')]
+        self.assertEqual({'clockwise', 'anticlockwise'}, {arc['direction'] for arc in arcs})
+        points = [c for c in coordinates if not c.startswith('start=')]
+        self.assertEqual({'dd', 'dms'}, {detect_coordinate_type(c) for c in points})
+
+    def test_shared_boundaries(self):
+        strips = [r['coordinates'] for r in SyntheticCorpus(0, arcs=0).records(5000) if r['type'] == 'polyhedron']
+        shared = sum(len(set(a) & set(b)) for a, b in zip(strips, strips[1:]))
+        self.assertGreater(shared, 0)
+
+        # Neighbouring cells write each vertex they share as the same string
+        for seed in range(20):
+            strips = [r['coordinates'] for r in SyntheticCorpus(seed, arcs=0).records(2000)
+                      if r['type'] == 'polyhedron']
+            for a, b in zip(strips, strips[1:]):
+                strings = {}
+                for point, text in zip(PointFactory(a + b).process_coordinates(), a + b):
+                    strings.setdefault((round(point.y, 5), round(point.x, 5)), set()).add(text)
+                self.assertEqual([], [texts for texts in strings.values() if len(texts) > 1])
+
+    def test_vertices(self):
+        corpus = SyntheticCorpus(0, weights={'polyhedron': 1})
+        records = list(corpus.records(10))
+        self.assertEqual(1, len(records))
+
+        total = 0
+        for ring in corpus.rings(5000):
+            # Rings are closed when parsed, adding a vertex unless an arc already ends at the start
+            total += len(Polygon(ring)) - 1
+        self.assertGreaterEqual(total, 5000)
+        self.assertLess(total, 6000)
+
+    def test_build(self):
+        kml = KmlPlus(file_name=os.path.join(self.tmp.name, 'corpus.kml'), autosave=False)
+        for method, args, kwargs in SyntheticCorpus(0, weights={'polyhedron': 4, 'linestring': 1,
+                                                                'point': 1}).calls(2000):
+            getattr(kml, method)(*args, **kwargs)
+        self.assertIsNotNone(kml.bounds)
+
+    def test_write(self):
+        corpus = SyntheticCorpus(0)
+        expected = list(corpus.records(3000))
+        for extension in ('.json', '.csv', '.yaml'):
+            path = os.path.join(self.tmp.name, 'corpus' + extension)
+            self.assertEqual(len(expected), corpus.write(path, 3000))
+            records = load_spec(path)
+            self.assertEqual([r['coordinates'] for r in expected], [r['coordinates'] for r in records])
+            self.assertEqual([r['type'] for r in expected], [r['type'] for r in records])
+
+        with self.assertRaises(ValueError):
+            corpus.write(os.path.join(self.tmp.name, 'corpus.txt'), 10)
+
+    def test_main(self):
+        path = os.path.join(self.tmp.name, 'corpus.json')
+        with redirect_stdout(io.StringIO()):
+            self.assertEqual(0, main([path, '--vertices', '500', '--seed', '3']))
+        self.assertEqual(list(SyntheticCorpus(3).records(500)), load_spec(path))
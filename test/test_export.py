@@ -0,0 +1,175 @@
+import json
+import os
+import struct
+import tempfile
+from unittest import TestCase
+
+import numpy as np
+
+from kmlplus.export import FlatGeobufWriter, GeoJsonWriter, hilbert_order, hilbert_values, packed_rtree, \
+    shape_geometry
+from kmlplus.geo import Point
+from kmlplus.shapes import Circle, Cylinder, LineString, Polygon, Polyhedron
+
+
+def read_table(buffer: bytes, table: int) -> dict:
+    """Returns the position of each field present in a FlatBuffer table."""
+    vtable = table - struct.unpack_from('<i', buffer, table)[0]
+    vtable_size = struct.unpack_from('<H', buffer, vtable)[0]
+    offsets = struct.unpack_from(f'<{(vtable_size - 4) // 2}H', buffer, vtable + 4)
+    return {i: table + offset for i, offset in enumerate(offsets) if offset}
+
+
+def follow(buffer: bytes, position: int) -> int:
+    return position + struct.unpack_from('<I', buffer, position)[0]
+
+
+def read_vector(buffer: bytes, position: int, fmt: str) -> tuple:
+    start = follow(buffer, position)
+    length = struct.unpack_from('<I', buffer, start)[0]
+    return struct.unpack_from(f'<{length}{fmt}', buffer, start + 4)
+
+
+def read_string(buffer: bytes, position: int) -> str:
+    return bytes(read_vector(buffer, position, 'B')).decode('utf-8')
+
+
+class TestExport(TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cylinder = Cylinder(['55.0 -4.0', 1000], ['55.0 -4.0', 1000], lower_layer=0, upper_layer=100,
+                                 lower_layer_uom='M', upper_layer_uom='M')
+        self.polyhedron = Polyhedron(['55.0 -3.0', '55.0 -2.0', '56.0 -2.0'], ['55.0 -3.0', '55.0 -2.0', '56.0 -2.0'],
+                                     lower_layer=500, upper_layer=2000)
+        self.polygon = Polygon(['55.0 -3.0', '56.0 -3.0', '56.0 -2.0'])
+        self.linestring = LineString(['55.0 -3.0 10', '56.0 -3.0 20'])
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_shape_geometry(self):
+        geometry_type, parts = shape_geometry(self.polygon)
+        self.assertEqual(3, geometry_type)
+        xs, ys, _ = parts[0]
+        self.assertEqual((xs[0], ys[0]), (xs[-1], ys[-1]))
+        # Given clockwise, written anticlockwise
+        self.assertTrue(np.dot(xs[:-1], ys[1:]) - np.dot(xs[1:], ys[:-1]) > 0)
+
+        self.assertEqual(2, shape_geometry(self.linestring)[0])
+        self.assertEqual(3, shape_geometry(Circle(['55.0 -4.0'], 100, sample=10))[0])
+        self.assertEqual(1, shape_geometry(Point(55.0, -4.0))[0])
+
+        geometry_type, parts = shape_geometry(self.cylinder)
+        self.assertEqual(6, geometry_type)
+        self.assertEqual([0.0, 100.0], [part[2][0] for part in parts])
+
+    def test_geojson(self):
+        path = os.path.join(self.tmp.name, 'shapes.ndjson')
+        with GeoJsonWriter(path, precision=6) as writer:
+            writer.write(self.cylinder, name='Zone')
+            writer.write(self.linestring, name='Route')
+            writer.write(Point(55.0, -4.0, z=10))
+
+        with open(path) as f:
+            features = [json.loads(line) for line in f]
+
+        self.assertEqual(['MultiPolygon', 'LineString', 'Point'], [f['geometry']['type'] for f in features])
+        self.assertEqual({'name': 'Zone', 'floor': 0.0, 'ceiling': 100.0}, features[0]['properties'])
+        self.assertEqual(2, len(features[0]['geometry']['coordinates']))
+        self.assertEqual([[-3.0, 55.0, 10.0], [-3.0, 56.0, 20.0]], features[1]['geometry']['coordinates'])
+        self.assertEqual([-4.0, 55.0, 10.0], features[2]['geometry']['coordinates'])
+
+    def test_flatgeobuf(self):
+        path = os.path.join(self.tmp.name, 'shapes.fgb')
+        shapes = [Cylinder([f'{50 + i * 0.1} -4.0', 500], [f'{50 + i * 0.1} -4.0', 500], sample=10)
+                  for i in range(40)]
+        with FlatGeobufWriter(path, index_node_size=4) as writer:
+            for i, shape in enumerate(shapes):
+                writer.write(shape, name=f'Zone {i}', number=i)
+
+        with open(path, 'rb') as f:
+            data = f.read()
+        self.assertEqual(b'fgb\x03fgb\x00', data[:8])
+
+        header_size = struct.unpack_from('<I', data, 8)[0]
+        header = data[8:12 + header_size]
+        fields = read_table(header, follow(header, 4))
+        self.assertEqual('shapes', read_string(header, fields[0]))
+        self.assertEqual(6, header[fields[2]])
+        self.assertEqual(40, struct.unpack_from('<Q', header, fields[8])[0])
+        self.assertEqual(4, struct.unpack_from('<H', header, fields[9])[0])
+        envelope = read_vector(header, fields[1], 'd')
+
+        columns = [read_table(header, follow(header, follow(header, fields[7]) + 4 + 4 * i)) for i in range(4)]
+        self.assertEqual(['floor', 'ceiling', 'name', 'number'], [read_string(header, c[0]) for c in columns])
+
+        # 40 leaves, 10, 3 and 1 parent nodes
+        index_start = 12 + header_size
+        nodes = np.frombuffer(data, dtype=[('min_x', '<f8'), ('min_y', '<f8'), ('max_x', '<f8'), ('max_y', '<f8'),
+                                           ('offset', '<u8')], count=54, offset=index_start)
+        self.assertEqual(envelope, (nodes[0]['min_x'], nodes[0]['min_y'], nodes[0]['max_x'], nodes[0]['max_y']))
+
+        features_start = index_start + 54 * 40
+        numbers = []
+        for leaf in nodes[14:]:
+            position = features_start + int(leaf['offset'])
+            size = struct.unpack_from('<I', data, position)[0]
+            feature = data[position:position + 4 + size]
+            properties = bytes(read_vector(feature, read_table(feature, follow(feature, 4))[1], 'B'))
+            numbers.append(struct.unpack_from('<q', properties, len(properties) - 8)[0])
+
+            geometry = read_table(feature, follow(feature, read_table(feature, follow(feature, 4))[0]))
+            self.assertEqual(6, feature[geometry[6]])
+        self.assertEqual(list(range(40)), sorted(numbers))
+
+        # Features are stored in descending Hilbert order of their centres
+        bounds = np.array([[n['min_x'], n['min_y'], n['max_x'], n['max_y']] for n in nodes[14:]])
+        self.assertTrue(np.all(np.diff(hilbert_values(bounds).astype(np.int64)) <= 0))
+
+    def test_flatgeobuf_without_index(self):
+        path = os.path.join(self.tmp.name, 'shapes.fgb')
+        with FlatGeobufWriter(path, index_node_size=0) as writer:
+            writer.write(self.polygon, name='First')
+            writer.write(self.linestring, name='Second')
+
+        with open(path, 'rb') as f:
+            data = f.read()
+        header_size = struct.unpack_from('<I', data, 8)[0]
+        header = data[8:12 + header_size]
+        fields = read_table(header, follow(header, 4))
+        self.assertEqual(0, header[fields[2]])
+
+        position = 12 + header_size
+        size = struct.unpack_from('<I', data, position)[0]
+        feature = data[position:position + 4 + size]
+        properties = bytes(read_vector(feature, read_table(feature, follow(feature, 4))[1], 'B'))
+        self.assertEqual(b'First', properties[6:])
+
+    def test_property_types(self):
+        path = os.path.join(self.tmp.name, 'shapes.fgb')
+        with self.assertRaises(TypeError):
+            with FlatGeobufWriter(path) as writer:
+                writer.write(self.polygon, name='First')
+                writer.write(self.polygon, name=2)
+        self.assertFalse(os.path.exists(path))
+
+        with self.assertRaises(ValueError):
+            FlatGeobufWriter(path, index_node_size=1)
+
+    def test_hilbert_order(self):
+        # The box at the minimum corner has a Hilbert value of 0 and sorts last
+        bounds = np.array([[0.0, 0.0, 0.0, 0.0], [1.0, 1.0, 1.0, 1.0], [0.5, 0.0, 0.5, 0.0], [1.0, 1.0, 1.0, 1.0]])
+        values = hilbert_values(bounds)
+        self.assertEqual(0, values[0])
+        order = hilbert_order(bounds)
+        self.assertEqual(0, order[-1])
+        self.assertTrue(np.all(np.diff(values[order].astype(np.int64)) <= 0))
+        self.assertLess(list(order).index(1), list(order).index(3))
+
+    def test_packed_rtree(self):
+        bounds = np.array([[i, i, i + 0.5, i + 0.5] for i in range(5)], dtype=float)
+        nodes = np.frombuffer(packed_rtree(bounds, np.arange(5) * 100, 2), dtype='<f8,<f8,<f8,<f8,<u8')
+        self.assertEqual(11, len(nodes))
+        self.assertEqual([1, 3, 5, 6, 8, 10], [int(n[4]) for n in nodes[:6]])
+        self.assertEqual((0.0, 0.0, 4.5, 4.5), tuple(nodes[0])[:4])
+        self.assertEqual([0, 100, 200, 300, 400], [int(n[4]) for n in nodes[6:]])
@@ -1,7 +1,9 @@
+import math
 from unittest import TestCase
 
 from kmlplus import util
-from kmlplus.geo import Point, PointFactory, ClockwiseCurvedSegment, AnticlockwiseCurvedSegment, CurvedSegmentFactory
+from kmlplus.geo import Point, PointFactory, ClockwiseCurvedSegment, AnticlockwiseCurvedSegment, CurvedSegmentFactory, \
+    densify_points
 
 
 class TestPoint(TestCase):
@@ -161,6 +163,15 @@ class TestPointFactory(TestCase):
         self.assertTrue(isinstance(test_point_list, list))
         self.assertEqual(3, len(test_point_list))
 
+    def test_pass_through(self):
+        parsed = Point(22.323232, -4.287282, z=50)
+        points = PointFactory([parsed, '23.323232 -5.328723']).process_coordinates()
+        self.assertIs(parsed, points[0])
+
+        points = PointFactory([parsed], z=100, uom='FT').process_coordinates()
+        self.assertEqual((-4.287282, 22.323232, 30.48), points[0].kml_friendly())
+        self.assertEqual(50, parsed.z)
+
     def test_create_curved_segment(self):
         test_segment = self.pf_m.create_curved_segment('start=553322N 0043322W, centre=502211N 0043222W, end=510000N '
                                                        '0040010W, direction=clockwise')
@@ -294,3 +305,65 @@ class TestAnticlockwiseCurvedSegment(TestCase):
 
         result = self.inverse_test_obj.get_bearing_increment()
         self.assertEqual(1.7821782178217822, result)
+
+
+class TestPointEquality(TestCase):
+    def test_eq_and_hash(self):
+        a = Point(55.20166666666667, -4.868398333333333, z=10)
+        b = Point(55.20166666666667 + 1e-13, -4.868398333333333, z=10)
+        c = Point(55.2017, -4.868398333333333, z=10)
+
+        self.assertEqual(a, b)
+        self.assertEqual(hash(a), hash(b))
+        self.assertNotEqual(a, c)
+        self.assertNotEqual(a, Point(55.20166666666667, -4.868398333333333, z=11))
+        self.assertNotEqual(a, '55.20166666666667 -4.868398333333333 10.0')
+        self.assertEqual(2, len({a, b, c}))
+
+    def test_interning(self):
+        dms = PointFactory(['551206.00N 0045206.234W', '551206.00N 0045206.234W']).process_coordinates()
+        self.assertIs(dms[0], dms[1])
+
+        dd = PointFactory(['55.20166666666667 -4.868398333333333']).process_coordinates()
+        self.assertIs(dms[0], dd[0])
+
+        other_uom = PointFactory(['551206.00N 0045206.234W'], uom='FT').process_coordinates()
+        self.assertIsNot(dms[0], other_uom[0])
+
+    def test_shared_points_immutable(self):
+        shared = PointFactory(['55.0 -4.0 10']).process_coordinates()[0]
+        for name in ('y', 'x', 'z', 'uom'):
+            with self.assertRaises(AttributeError):
+                setattr(shared, name, 1)
+        self.assertEqual((-4.0, 55.0, 10.0), shared.kml_friendly())
+
+        own = Point(55.0, -4.0, z=10)
+        own.z = 20
+        self.assertEqual(20.0, own.z)
+
+
+class TestDensifyPoints(TestCase):
+    def test_densify_points(self):
+        points = PointFactory(['55.0 -4.0 0', '55.0 -2.0 100', '55.001 -2.0 100']).process_coordinates()
+        spacing = 10000
+        result = densify_points(points, spacing)
+
+        self.assertIs(points[0], result[0])
+        self.assertIs(points[1], result[math.ceil(points[0].get_distance(points[1]) / spacing)])
+        self.assertIs(points[-1], result[-1])
+        for a, b in zip(result, result[1:]):
+            self.assertTrue(a.get_distance(b) <= spacing)
+
+        # Inserted points follow the geodesic, which bows towards the pole, and interpolate elevation
+        self.assertTrue(result[6].y > 55.0)
+        self.assertAlmostEqual(result[6].get_bearing(result[7]), result[5].get_bearing(result[6]), delta=0.5)
+        self.assertTrue(0 < result[6].z < 100)
+
+    def test_process_coordinates(self):
+        plain = PointFactory(['55.0 -4.0', '55.0 -2.0']).process_coordinates()
+        dense = PointFactory(['55.0 -4.0', '55.0 -2.0'], densify=5000).process_coordinates()
+        self.assertEqual(2, len(plain))
+        self.assertEqual(math.ceil(plain[0].get_distance(plain[1]) / 5000) + 1, len(dense))
+
+        with self.assertRaises(ValueError):
+            densify_points(plain, 0)
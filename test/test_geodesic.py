@@ -0,0 +1,115 @@
+from unittest import TestCase
+
+import numpy as np
+
+from kmlplus.geo import Point, arc_coordinates, concentric_arc_coordinates
+from kmlplus.geodesic import PyprojBackend, SphericalBackend, available_backends, benchmark_backends, \
+    get_geodesic_backend, select_backend, set_geodesic_backend, set_tangent_plane_tolerance, tangent_plane_fwd, \
+    tangent_plane_limit
+
+
+class TestBackends(TestCase):
+    def setUp(self):
+        self.reference = PyprojBackend()
+
+    def tearDown(self):
+        set_geodesic_backend('pyproj')
+
+    def test_fwd(self):
+        expected = self.reference.fwd(-4.868398, 55.201667, 45.0, 5000.0)
+        for backend in available_backends():
+            result = backend.fwd(-4.868398, 55.201667, 45.0, 5000.0)
+            self.assertTrue(isinstance(result[0], float))
+            self.assertAlmostEqual(expected[0], result[0], delta=0.000001)
+            self.assertAlmostEqual(expected[1], result[1], delta=0.000001)
+            self.assertAlmostEqual(expected[2], result[2], delta=0.001)
+
+    def test_inv(self):
+        expected = self.reference.inv(-4.868398, 55.201667, -4.8, 55.25)
+        for backend in available_backends():
+            result = backend.inv(-4.868398, 55.201667, -4.8, 55.25)
+            self.assertAlmostEqual(expected[0], result[0], delta=0.001)
+            self.assertAlmostEqual(expected[1], result[1], delta=0.001)
+            self.assertAlmostEqual(expected[2], result[2], delta=0.05)
+
+    def test_array_input(self):
+        lons, lats = np.full(10, -4.868398), np.full(10, 55.201667)
+        azimuths, distances = np.linspace(0, 360, 10), np.full(10, 1000.0)
+        for backend in available_backends():
+            result = backend.fwd(lons, lats, azimuths, distances)
+            self.assertEqual(10, len(result[0]))
+
+            result = backend.fwd(list(lons), list(lats), list(azimuths), list(distances))
+            self.assertTrue(isinstance(result[0], list))
+
+    def test_set_geodesic_backend(self):
+        set_geodesic_backend('spherical')
+        self.assertTrue(isinstance(get_geodesic_backend(), SphericalBackend))
+
+        result = Point.from_point_bearing_and_distance(Point(55.0, -4.0), 90, 1852)
+        self.assertAlmostEqual(55.0, result.y, delta=0.001)
+
+        with self.assertRaises(ValueError):
+            set_geodesic_backend('flat')
+        with self.assertRaises(TypeError):
+            set_geodesic_backend(object())
+
+    def test_benchmark_backends(self):
+        results = benchmark_backends(sample=500, repeat=1, max_distance=1852)
+        self.assertEqual(len(available_backends()), len(results))
+        for result in results:
+            self.assertTrue(result['seconds'] > 0)
+            if result['name'] == 'spherical':
+                self.assertTrue(result['max_error'] < 0.5)
+            else:
+                self.assertTrue(result['max_error'] < 0.001)
+
+    def test_select_backend(self):
+        backend = select_backend(0.0001, sample=500, repeat=1, max_distance=100 * 1852)
+        self.assertFalse(isinstance(backend, SphericalBackend))
+        self.assertIs(backend, get_geodesic_backend())
+
+
+class TestTangentPlane(TestCase):
+    def setUp(self):
+        self.reference = PyprojBackend()
+        self.azimuths = np.linspace(0, -360, 101)
+
+    def tearDown(self):
+        set_tangent_plane_tolerance(0.01)
+
+    def test_tangent_plane_fwd(self):
+        for lon, lat in ((-4.868398, 55.201667), (179.9, -33.5), (10.0, 79.0)):
+            for distance in (100, 1852, 3000):
+                xs, ys = tangent_plane_fwd(lon, lat, self.azimuths, distance)
+                expected_x, expected_y, _ = self.reference.fwd(np.full(101, lon), np.full(101, lat), self.azimuths,
+                                                               np.full(101, float(distance)))
+                errors = self.reference.inv(expected_x, expected_y, xs, ys)[2]
+                self.assertTrue(errors.max() < 0.01)
+
+    def test_tangent_plane_limit(self):
+        self.assertAlmostEqual(3162.28, tangent_plane_limit(), delta=0.01)
+        set_tangent_plane_tolerance(0)
+        self.assertEqual(0, tangent_plane_limit())
+
+    def test_arc_coordinates(self):
+        centre = Point(55.201667, -4.868398)
+        fast = arc_coordinates(centre, 0, -3.6, 1852, 100)
+        set_tangent_plane_tolerance(0)
+        exact = arc_coordinates(centre, 0, -3.6, 1852, 100)
+
+        self.assertEqual(101, len(fast))
+        for (fast_x, fast_y), (x, y) in zip(fast, exact):
+            self.assertTrue(isinstance(fast_x, float))
+            self.assertAlmostEqual(x, fast_x, delta=0.0000001)
+            self.assertAlmostEqual(y, fast_y, delta=0.0000001)
+
+    def test_concentric_arc_coordinates(self):
+        centre = Point(55.201667, -4.868398)
+        for tolerance in (0.01, 0):
+            set_tangent_plane_tolerance(tolerance)
+            arcs = concentric_arc_coordinates(centre, 0, -3.6, [1852, 926, 1852], 100)
+            self.assertEqual(3, len(arcs))
+            self.assertIs(arcs[0], arcs[2])
+            self.assertEqual(arc_coordinates(centre, 0, -3.6, 1852, 100), arcs[0])
+            self.assertEqual(arc_coordinates(centre, 0, -3.6, 926, 100), arcs[1])
@@ -0,0 +1,59 @@
+import os
+import subprocess
+import sys
+from unittest import TestCase
+
+import kmlplus
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ('numpy', 'pyproj', 'simplekml', 'multiprocessing')
+
+
+def import_profile(statement: str) -> tuple[dict, set]:
+    """
+    Runs a statement in a fresh interpreter with -X importtime.
+
+    Returns:
+        times, modules (tuple[dict, set]): The cumulative import time in microseconds of each module imported, and
+            the top level packages loaded once the statement has run.
+    """
+    script = f'{statement}\nimport sys\nprint(" ".join(sorted({{m.split(".")[0] for m in sys.modules}})))'
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', script], cwd=ROOT, capture_output=True,
+                            text=True, check=True)
+
+    times = {}
+    for line in result.stderr.splitlines():
+        if line.startswith('import time:') and '|' in line:
+            _, cumulative, name = line.split('|')
+            if cumulative.strip().isdigit():
+                times[name.strip()] = int(cumulative)
+    return times, set(result.stdout.split())
+
+
+class TestImports(TestCase):
+    def test_lazy_dependencies(self):
+        times, modules = import_profile('import kmlplus, kmlplus.util, kmlplus.kml, kmlplus.tiles\n'
+                                        'from kmlplus.geo import PointFactory\n'
+                                        'PointFactory(["55.0 -4.0", "553000N 0043000W"]).process_coordinates()')
+        self.assertEqual(set(), modules.intersection(HEAVY_MODULES))
+        self.assertIn('kmlplus.kml', times)
+
+    def test_dependencies_loaded_on_use(self):
+        _, modules = import_profile('from kmlplus import KmlPlus\nKmlPlus(autosave=False)')
+        self.assertIn('simplekml', modules)
+
+        _, modules = import_profile('from kmlplus.geo import Point\nPoint(55.0, -4.0).get_distance(Point(55.1, -4.0))')
+        self.assertIn('numpy', modules)
+
+    def test_package_exports(self):
+        from kmlplus.kml import KmlPlus
+        from kmlplus.shapes import Cylinder
+
+        self.assertIs(KmlPlus, kmlplus.KmlPlus)
+        self.assertIs(Cylinder, kmlplus.Cylinder)
+        self.assertIn('iter_placemarks', dir(kmlplus))
+        for name in kmlplus.__all__:
+            self.assertIsNotNone(getattr(kmlplus, name))
+
+        with self.assertRaises(AttributeError):
+            kmlplus.NotAShape
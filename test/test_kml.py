@@ -0,0 +1,238 @@
+import os
+import random
+import sys
+import tempfile
+import threading
+from unittest import TestCase
+
+from kmlplus.kml import KmlPlus, compute_geometry
+from kmlplus.reader import iter_placemarks
+from kmlplus.shapes import Circle
+from kmlplus.tokenizer import CoordinateSyntaxError
+
+
+def shape_call(i: int) -> tuple:
+    y = 55 + i * 0.001
+    method = ('cylinder', 'circle', 'point', 'linestring')[i % 4]
+    if method == 'cylinder':
+        return method, ([f'{y} -4.0'], 1), {'radius_uom': 'NM', 'upper_layer': 1000, 'sample': 8, 'fol': f'Shape {i}'}
+    elif method == 'circle':
+        return method, ([f'{y} -4.0 100'], 500), {'sample': 8, 'fol': f'Shape {i}'}
+    elif method == 'point':
+        return method, ([f'{y} -4.0'],), {'fol': f'Shape {i}'}
+    return method, ([f'{y} -4.0 10', f'{y} -3.0 20'],), {'name': f'Shape {i}'}
+
+
+class TestConcurrentKmlPlus(TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def build(self, name: str, calls: list, threads: int, **kwargs) -> KmlPlus:
+        """
+        Adds the calls from several threads at once, each taking every nth call and saving at random, while another
+        thread is appending.
+        """
+        kml = KmlPlus(file_name=os.path.join(self.tmp.name, name), autosave=False, **kwargs)
+        start = threading.Barrier(threads)
+        errors = []
+
+        def produce(offset: int):
+            rng = random.Random(offset)
+            start.wait()
+            try:
+                for index in range(offset, len(calls), threads):
+                    method, args, shape_kwargs = calls[index]
+                    if kml.ordered:
+                        shape_kwargs = dict(shape_kwargs, order=index)
+                    getattr(kml, method)(*args, **shape_kwargs)
+                    if rng.random() < 0.1:
+                        kml.save()
+            except Exception as e:
+                errors.append(e)
+
+        workers = [threading.Thread(target=produce, args=(offset,)) for offset in range(threads)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+        self.assertEqual([], errors)
+        kml.save()
+        return kml
+
+    def serial(self, name: str, calls: list) -> KmlPlus:
+        kml = KmlPlus(file_name=os.path.join(self.tmp.name, name), autosave=False)
+        for method, args, kwargs in calls:
+            getattr(kml, method)(*args, **kwargs)
+        kml.save()
+        return kml
+
+    def folders(self, kml: KmlPlus) -> list:
+        return [p.folder for p in iter_placemarks(kml.save_name)]
+
+    def test_stress(self):
+        calls = [shape_call(i) for i in range(400)]
+        # Switch threads as often as possible to make races more likely
+        interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        try:
+            kml = self.build('stress.kml', calls, 16, progress=lambda report: None)
+        finally:
+            sys.setswitchinterval(interval)
+
+        self.assertEqual(400, kml.progress.shapes)
+        folders = self.folders(kml)
+        # Each cylinder is 2 layers and 8 walls, every other shape a single placemark
+        self.assertEqual(100 * 10 + 300, len(folders))
+        self.assertEqual({f'Shape {i}' for i in range(400)}, set(folders))
+        self.assertEqual(self.serial('serial.kml', calls).bounds, kml.bounds)
+
+    def test_ordered(self):
+        calls = [shape_call(i) for i in range(200)]
+        ordered = self.build('ordered.kml', calls, 8, ordered=True)
+        self.assertEqual(self.folders(self.serial('serial.kml', calls)), self.folders(ordered))
+
+    def test_ordered_pending(self):
+        kml = KmlPlus(file_name=os.path.join(self.tmp.name, 'pending.kml'), autosave=False, ordered=True)
+        kml.point(['55.0 -4.0'], fol='Second', order=1)
+        kml.point(['55.0 -4.0'], fol='Fourth', order=3)
+        kml.save()
+        self.assertEqual([], self.folders(kml))
+
+        kml.point(['55.0 -4.0'], fol='First', order=0)
+        kml.save()
+        self.assertEqual(['First', 'Second'], self.folders(kml))
+
+        self.assertEqual(1, kml.flush())
+        kml.point(['55.0 -4.0'], fol='Fifth', order=4)
+        kml.save()
+        self.assertEqual(['First', 'Second', 'Fourth', 'Fifth'], self.folders(kml))
+
+        with self.assertRaises(ValueError):
+            kml.point(['55.0 -4.0'], order=1)
+        with self.assertRaises(ValueError):
+            kml.point(['55.0 -4.0'])
+
+    def test_independent_iterators(self):
+        circle = Circle(['55.0 -4.0'], 500, sample=4)
+        outer = iter(circle)
+        first = next(outer)
+        self.assertEqual(list(circle.point_list), list(circle))
+        self.assertEqual(circle.point_list[1], next(outer))
+        self.assertEqual(circle.point_list[0], first)
+
+    def test_precompute_threads(self):
+        calls = [shape_call(i) for i in range(40)]
+        serial = self.serial('serial.kml', calls)
+
+        kml = KmlPlus(file_name=os.path.join(self.tmp.name, 'threads.kml'), autosave=False)
+        kml.precompute(calls, jobs=4, threads=True)
+        self.assertEqual(20, len(kml.precomputed))
+        for method, args, kwargs in calls:
+            getattr(kml, method)(*args, **kwargs)
+        kml.save()
+        self.assertEqual({}, kml.precomputed)
+        self.assertEqual([p.coordinates()[0].tolist() for p in iter_placemarks(serial.save_name)],
+                         [p.coordinates()[0].tolist() for p in iter_placemarks(kml.save_name)])
+
+    def test_spawned_workers(self):
+        # A spawned worker imports kmlplus afresh, so it only uses the parent's settings if initialised with them
+        from concurrent.futures import ProcessPoolExecutor
+        from multiprocessing import get_context
+
+        from kmlplus.geodesic import get_geodesic_backend, set_geodesic_backend, set_tangent_plane_tolerance
+        from kmlplus.kml import init_worker, worker_settings
+
+        previous = get_geodesic_backend()
+        set_geodesic_backend('spherical')
+        set_tangent_plane_tolerance(0)
+        try:
+            request = ('circle', (['55.0 -4.0 100'], 500000), {'sample': 8})
+            with ProcessPoolExecutor(max_workers=1, mp_context=get_context('spawn'), initializer=init_worker,
+                                     initargs=worker_settings()) as executor:
+                self.assertEqual(compute_geometry(request), executor.submit(compute_geometry, request).result())
+                self.assertEqual(worker_settings()[1:], executor.submit(worker_settings).result()[1:])
+        finally:
+            set_geodesic_backend(previous)
+            set_tangent_plane_tolerance(0.01)
+
+
+class TestBulkPoints(TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def document(self, name: str, **kwargs) -> KmlPlus:
+        return KmlPlus(file_name=os.path.join(self.tmp.name, name), autosave=False, **kwargs)
+
+    def test_points(self):
+        kml = self.document('points.kml', pretty=False, progress=lambda report: None)
+        count = kml.points(['55.0 -4.0 10', "551000N 0040000W", (-3.0, 56.0)], names=['A', 'B & C', 'D'],
+                           fol='Navaids', z=100, uom='FT')
+        kml.save()
+
+        self.assertEqual(3, count)
+        self.assertEqual(3, kml.progress.shapes)
+        self.assertEqual((56.0, 55.0, -3.0, -4.0), kml.bounds)
+        placemarks = list(iter_placemarks(kml.save_name))
+        self.assertEqual(['A', 'B & C', 'D'], [p.name for p in placemarks])
+        self.assertEqual({'Navaids'}, {p.folder for p in placemarks})
+        self.assertEqual([[-4.0, 55.0, 30.48], [-4.0, 55.166667, 30.48], [-3.0, 56.0, 30.48]],
+                         [p.coordinates()[0].round(6).tolist()[0] for p in placemarks])
+
+    def test_matches_point(self):
+        single = self.document('single.kml')
+        single.point(['551234.5N 0043015.25W'], z=120, uom='FT', fol='Points', point_name='Mast')
+        bulk = self.document('bulk.kml')
+        bulk.points(['551234.5N 0043015.25W'], z=120, uom='FT', fol='Points', point_name='Mast')
+        single.save()
+        bulk.save()
+        self.assertEqual(single.bounds, bulk.bounds)
+        self.assertEqual([(p.name, p.folder, p.coordinates()[0].tolist()) for p in iter_placemarks(single.save_name)],
+                         [(p.name, p.folder, p.coordinates()[0].tolist()) for p in iter_placemarks(bulk.save_name)])
+
+    def test_shared_styles(self):
+        import numpy as np
+
+        kml = self.document('styles.kml')
+        rows = np.array([[-4.0 + i * 0.01, 55.0, 0.0] for i in range(100)])
+        kml.points(rows, colours=['ff0000ff' if i % 2 else 'ff00ff00' for i in range(100)])
+        kml.save()
+
+        with open(kml.save_name) as f:
+            text = f.read()
+        self.assertEqual(2, text.count('<Style '))
+        self.assertEqual(100, len(list(iter_placemarks(kml.save_name))))
+
+    def test_simplekml_features(self):
+        import simplekml
+
+        for name in ('features.kml', 'features.kmz'):
+            kml = self.document(name)
+            kml.points(['55.0 -4.0', '56.0 -4.0'], names=['A', 'B'], fol='Points')
+            kml.point(['55.0 -3.0'], fol='Point', point_name='C')
+            kml.track([(55.0, -4.0, 0), (55.1, -4.0, 0)], fol='Track', track_name='D')
+            kml.save()
+
+            # Only simplekml objects are held in the simplekml document, whose own walks of it still work
+            self.assertTrue(all(isinstance(f, (simplekml.featgeom.Feature, simplekml.featgeom.Geometry))
+                                for f in kml.kml.allfeatures))
+            self.assertEqual(3, len(kml.kml.allcontainers))
+            self.assertEqual([('A', 'Points'), ('B', 'Points'), ('C', 'Point'), ('D', 'Track')],
+                             [(p.name, p.folder) for p in iter_placemarks(kml.save_name)])
+
+    def test_invalid(self):
+        kml = self.document('invalid.kml')
+        with self.assertRaises(CoordinateSyntaxError) as raised:
+            kml.points(['55.0 -4.0', '55.0 -4.0', 'not a coordinate'])
+        self.assertEqual(2, raised.exception.item)
+
+        with self.assertRaises(ValueError):
+            kml.points(['55.0 -4.0', '55.0 -4.0'], names=['Only one'])
+        self.assertEqual(0, kml.points([]))
+        self.assertIsNone(kml.bounds)
@@ -0,0 +1,90 @@
+import os
+import re
+import tempfile
+from unittest import TestCase
+
+from kmlplus.kml import KmlPlus
+from kmlplus.manifest import BuildManifest
+
+
+class TestBuildManifest(TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.manifest_path = os.path.join(self.tmp.name, 'manifest.json')
+        self.kml_path = os.path.join(self.tmp.name, 'test.kml')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_shape_key(self):
+        key = BuildManifest.shape_key('cylinder', ['55.1111 -3.2311'], 10, radius_uom='NM')
+        self.assertEqual(key, BuildManifest.shape_key('cylinder', ['55.1111  -3.2311'], 10.0, radius_uom='nm'))
+        self.assertNotEqual(key, BuildManifest.shape_key('cylinder', ['55.1111 -3.2311'], 11, radius_uom='NM'))
+        self.assertNotEqual(key, BuildManifest.shape_key('circle', ['55.1111 -3.2311'], 10, radius_uom='NM'))
+
+    def test_shape_key_versioned(self):
+        from kmlplus import cache
+        from kmlplus.geodesic import get_geodesic_backend, set_geodesic_backend
+
+        key = BuildManifest.shape_key('cylinder', ['55.1111 -3.2311'], 10, sample=20)
+        ring_key = cache.canonical_key('ring', 55.1111, 10)
+        version, backend = cache.GEOMETRY_VERSION, get_geodesic_backend()
+        try:
+            cache.GEOMETRY_VERSION = version + 1
+            self.assertNotEqual(key, BuildManifest.shape_key('cylinder', ['55.1111 -3.2311'], 10, sample=20))
+            self.assertNotEqual(ring_key, cache.canonical_key('ring', 55.1111, 10))
+            cache.GEOMETRY_VERSION = version
+            set_geodesic_backend('spherical')
+            self.assertNotEqual(key, BuildManifest.shape_key('cylinder', ['55.1111 -3.2311'], 10, sample=20))
+        finally:
+            cache.GEOMETRY_VERSION = version
+            set_geodesic_backend(backend)
+
+    def test_save_and_load(self):
+        manifest = BuildManifest(self.manifest_path)
+        self.assertEqual(0, len(manifest))
+        manifest.put('a', [[(1.0, 2.0, 3.0)], [(4.0, 5.0, 6.0)], []])
+        manifest.save()
+
+        reloaded = BuildManifest(self.manifest_path)
+        self.assertTrue('a' in reloaded)
+        lower, upper, sides = reloaded.get('a')
+        self.assertEqual(lower, [(1.0, 2.0, 3.0)])
+        self.assertEqual(upper, [(4.0, 5.0, 6.0)])
+        self.assertEqual(sides, [])
+
+    def test_unused_entries_pruned(self):
+        manifest = BuildManifest(self.manifest_path)
+        manifest.put('a', [(1.0, 2.0, 3.0)])
+        manifest.put('b', [(1.0, 2.0, 3.0)])
+        manifest.save()
+
+        manifest = BuildManifest(self.manifest_path)
+        manifest.get('a')
+        manifest.save()
+
+        manifest = BuildManifest(self.manifest_path)
+        self.assertTrue('a' in manifest)
+        self.assertFalse('b' in manifest)
+
+    def test_incremental_rebuild(self):
+        def build():
+            kml = KmlPlus(file_name=self.kml_path, manifest=self.manifest_path, autosave=False)
+            kml.cylinder(['55.1111 -3.2311'], 5, radius_uom='NM', lower_layer=0, upper_layer=1000, sample=20)
+            kml.polyhedron(['22.323232 -4.287282', '23.323232 -5.328723', '22.112333 -6.23789238923'],
+                           ['22.323232 -4.287282', '23.323232 -5.328723', '22.112333 -6.23789238923'],
+                           lower_layer=10, upper_layer=100)
+            kml.save()
+            return kml
+
+        first = build()
+        self.assertEqual(0, first.manifest.hits)
+        self.assertEqual(2, first.manifest.misses)
+        with open(self.kml_path) as f:
+            first_output = re.findall('<coordinates>(.*?)</coordinates>', f.read())
+
+        second = build()
+        self.assertEqual(2, second.manifest.hits)
+        self.assertEqual(0, second.manifest.misses)
+        with open(self.kml_path) as f:
+            self.assertEqual(first_output, re.findall('<coordinates>(.*?)</coordinates>', f.read()))
@@ -0,0 +1,59 @@
+import io
+import json
+import os
+import tempfile
+from contextlib import redirect_stderr, redirect_stdout
+from unittest import TestCase
+
+from kmlplus.memory import check_regression, main, measure_build, memory_benchmark, synthetic_cylinders
+
+
+class TestMemory(TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_synthetic_cylinders(self):
+        self.assertEqual(synthetic_cylinders(3, seed=1), synthetic_cylinders(3, seed=1))
+        self.assertNotEqual(synthetic_cylinders(3, seed=1), synthetic_cylinders(3, seed=2))
+        method, args, kwargs = synthetic_cylinders(1)[0]
+        self.assertEqual('cylinder', method)
+        self.assertLess(kwargs['lower_layer'], kwargs['upper_layer'])
+
+    def test_measure_build(self):
+        result = measure_build(synthetic_cylinders(2))
+        self.assertEqual(2, result['shapes'])
+        self.assertGreater(result['vertices'], 0)
+        self.assertGreater(result['save_peak'], 0)
+        self.assertEqual(max(result['build_peak'], result['save_peak']) / result['vertices'],
+                         result['bytes_per_vertex'])
+        self.assertIn('kmlplus.shapes', result['modules'])
+        self.assertTrue(any(name.startswith('simplekml') for name in result['modules']))
+
+    def test_check_regression(self):
+        results = [{'size': 10, 'bytes_per_vertex': 1000.0}, {'size': 100, 'bytes_per_vertex': 900.0}]
+        self.assertEqual([], check_regression(results))
+        self.assertEqual(1, len(check_regression(results, max_bytes_per_vertex=950)))
+        self.assertEqual([], check_regression(results, baseline={'10': 950.0, '100': 900.0}))
+        failures = check_regression(results, baseline={'10': 950.0, '100': 900.0}, tolerance=0.01)
+        self.assertEqual(1, len(failures))
+        self.assertTrue(failures[0].startswith('10 cylinders'))
+
+    def test_main(self):
+        baseline = os.path.join(self.tmp.name, 'baseline.json')
+        with redirect_stdout(io.StringIO()) as stdout:
+            self.assertEqual(0, main(['--sizes', '1', '--save-baseline', baseline]))
+        self.assertIn('memory held after adding shapes', stdout.getvalue())
+        with open(baseline) as f:
+            self.assertEqual(['1'], list(json.load(f)))
+
+        with redirect_stdout(io.StringIO()), redirect_stderr(io.StringIO()) as stderr:
+            self.assertEqual(1, main(['--sizes', '1', '--max-bytes-per-vertex', '1']))
+        self.assertIn('regression', stderr.getvalue())
+
+    def test_isolate(self):
+        results = memory_benchmark([1], isolate=True)
+        self.assertEqual(1, results[0]['size'])
+        self.assertIsNotNone(results[0]['peak_rss'])
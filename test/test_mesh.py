@@ -0,0 +1,129 @@
+import json
+import math
+import os
+import struct
+import tempfile
+import zipfile
+from collections import Counter
+from unittest import TestCase
+from xml.etree import ElementTree
+
+import numpy as np
+
+from kmlplus.kml import KmlPlus
+from kmlplus.mesh import Mesh, to_local, triangulate, volume_mesh, write_dae, write_glb
+from kmlplus.shapes import Cylinder, Polyhedron
+
+
+class TestMesh(TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cylinder = Cylinder(['55.0 -4.0', 1000], ['55.0 -4.0', 1000], lower_layer=0, upper_layer=100,
+                                 lower_layer_uom='M', upper_layer_uom='M')
+        # An L shaped outline with a concave corner, given clockwise
+        outline = ['55.0 -3.0', '55.02 -3.0', '55.02 -2.98', '55.01 -2.98', '55.01 -2.96', '55.0 -2.96']
+        self.polyhedron = Polyhedron(outline, outline, lower_layer=500, upper_layer=2000)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def assertClosed(self, mesh: Mesh):
+        # Every edge of a closed, consistently wound mesh is used once in each direction
+        edges = Counter()
+        for a, b, c in mesh.indices.tolist():
+            edges.update([(a, b), (b, c), (c, a)])
+        for (a, b), count in edges.items():
+            self.assertEqual(1, count)
+            self.assertEqual(1, edges[(b, a)])
+
+    def test_volume_mesh(self):
+        mesh = volume_mesh(self.cylinder)
+        self.assertEqual(200, len(mesh.vertices))
+        self.assertEqual(396, len(mesh))
+        self.assertClosed(mesh)
+        self.assertEqual((-4.0, 55.0, 0.0), tuple(round(i, 6) for i in mesh.origin))
+
+        polygon_area = 50 * 1000 ** 2 * math.sin(2 * math.pi / 100)
+        self.assertAlmostEqual(polygon_area * 100, mesh.volume(), delta=polygon_area * 100 * 1e-3)
+
+    def test_concave_polyhedron(self):
+        mesh = volume_mesh(self.polyhedron)
+        self.assertEqual(12, len(mesh.vertices))
+        self.assertEqual(20, len(mesh))
+        self.assertClosed(mesh)
+        self.assertTrue(mesh.volume() > 0)
+
+        area = mesh.volume() / 1500
+        expected = to_local([-3.0, -2.96], [55.0, 55.02], [500, 500], mesh.origin)
+        width, height = expected[1, 0] - expected[0, 0], expected[1, 1] - expected[0, 1]
+        self.assertAlmostEqual(width * height * 0.75, area, delta=area * 1e-3)
+
+    def test_triangulate(self):
+        square = np.array([[0, 0], [1, 0], [1, 1], [0, 1]], dtype=float)
+        self.assertEqual(2, len(triangulate(square)))
+
+        notch = np.array([[0, 0], [2, 0], [2, 2], [1, 1], [0, 2]], dtype=float)
+        triangles = triangulate(notch)
+        self.assertEqual(3, len(triangles))
+        for a, b, c in notch[triangles]:
+            self.assertTrue((b[0] - a[0]) * (c[1] - a[1]) - (b[1] - a[1]) * (c[0] - a[0]) > 0)
+
+    def test_mismatched_layers(self):
+        poly = Polyhedron(['55.0 -3.0', '55.1 -3.0', '55.1 -2.9'], ['55.0 -3.0', '55.1 -3.0', '55.1 -2.9'])
+        poly.upper_layer.point_list = poly.upper_layer.point_list[:-1] + poly.upper_layer.point_list[1:2] + \
+            poly.upper_layer.point_list[-1:]
+        with self.assertRaises(IndexError):
+            volume_mesh(poly)
+
+    def test_write_glb(self):
+        path = os.path.join(self.tmp.name, 'scene.glb')
+        meshes = [volume_mesh(self.cylinder), volume_mesh(self.polyhedron, colour_hex='ff0000ff')]
+        write_glb(meshes, path)
+
+        with open(path, 'rb') as f:
+            data = f.read()
+        _, version, length = struct.unpack('<III', data[:12])
+        self.assertEqual((b'glTF', 2, len(data)), (data[:4], version, length))
+        self.assertEqual(0, length % 4)
+
+        json_length, = struct.unpack('<I', data[12:16])
+        gltf = json.loads(data[20:20 + json_length])
+        self.assertEqual(2, len(gltf['meshes']))
+        self.assertEqual([-4.0, 55.0, 0.0], [round(i, 6) for i in gltf['scenes'][0]['extras']['origin']])
+        self.assertEqual([1.0, 0.0, 0.0, 1.0], gltf['materials'][1]['pbrMetallicRoughness']['baseColorFactor'])
+
+        bin_length, = struct.unpack('<I', data[20 + json_length:24 + json_length])
+        self.assertEqual(gltf['buffers'][0]['byteLength'] + (-gltf['buffers'][0]['byteLength'] % 4), bin_length)
+        for accessor in gltf['accessors']:
+            view = gltf['bufferViews'][accessor['bufferView']]
+            self.assertEqual(0, view['byteOffset'] % 4)
+            self.assertEqual(accessor['count'] * (12 if accessor['type'] == 'VEC3' else 4), view['byteLength'])
+
+        # The polyhedron is roughly 64 km east of the cylinder, so lies along +x in the shared frame
+        positions = gltf['accessors'][gltf['meshes'][1]['primitives'][0]['attributes']['POSITION']]
+        self.assertTrue(60000 < positions['min'][0] < 70000)
+
+    def test_write_dae(self):
+        path = os.path.join(self.tmp.name, 'model.dae')
+        mesh = volume_mesh(self.polyhedron)
+        write_dae(mesh, path)
+
+        ns = {'c': 'http://www.collada.org/2005/11/COLLADASchema'}
+        root = ElementTree.parse(path).getroot()
+        self.assertEqual('Z_UP', root.find('c:asset/c:up_axis', ns).text)
+        self.assertEqual(str(len(mesh)), root.find('.//c:triangles', ns).get('count'))
+        floats = root.find('.//c:float_array', ns).text.split()
+        self.assertEqual(mesh.vertices.size, len(floats))
+
+    def test_kml_model(self):
+        path = os.path.join(self.tmp.name, 'models.kmz')
+        kml = KmlPlus(file_name=path, autosave=False)
+        kml.model(self.cylinder, name='Zone')
+        kml.save()
+
+        with zipfile.ZipFile(path) as archive:
+            self.assertEqual(['doc.kml', 'files/kmlplus_model_1.dae'], archive.namelist())
+            doc = archive.read('doc.kml').decode('utf-8')
+        self.assertIn('<href>files/kmlplus_model_1.dae</href>', doc)
+        self.assertIn('<altitudeMode>absolute</altitudeMode>', doc)
+        self.assertIsNotNone(kml.bounds)
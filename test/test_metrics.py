@@ -0,0 +1,58 @@
+from unittest import TestCase
+
+from pyproj import Geod
+
+from kmlplus.metrics import batch_polygon_metrics, polygon_metrics
+from kmlplus.shapes import Polygon
+
+
+class TestPolygonMetrics(TestCase):
+    def setUp(self):
+        self.geod = Geod(ellps='WGS84')
+
+    def test_polygon_metrics(self):
+        xs, ys = [-4.0, -3.0, -3.0, -4.0], [55.0, 55.0, 56.0, 56.0]
+        metrics = polygon_metrics((xs, ys))
+        area, perimeter = self.geod.polygon_area_perimeter(xs, ys)
+
+        self.assertAlmostEqual(abs(area), metrics.area, delta=abs(area) * 1e-6)
+        self.assertAlmostEqual(perimeter, metrics.perimeter, delta=0.001)
+        self.assertEqual((56.0, 55.0, -3.0, -4.0), (metrics.north, metrics.south, metrics.east, metrics.west))
+        self.assertAlmostEqual(-3.5, metrics.centroid_x, delta=1e-9)
+        # The area weighted centroid sits south of the mean latitude, where the polygon is wider
+        self.assertTrue(55.45 < metrics.centroid_y < 55.5)
+
+    def test_antimeridian(self):
+        xs, ys = [179.5, -179.5, -179.5, 179.5], [10.0, 10.0, 11.0, 11.0]
+        metrics = polygon_metrics((xs, ys))
+        area, perimeter = self.geod.polygon_area_perimeter(xs, ys)
+
+        self.assertAlmostEqual(abs(area), metrics.area, delta=abs(area) * 1e-6)
+        self.assertEqual(-179.5, metrics.east)
+        self.assertEqual(179.5, metrics.west)
+        self.assertAlmostEqual(180, abs(metrics.centroid_x), delta=1e-9)
+        self.assertAlmostEqual(10.5, metrics.centroid_y, delta=0.01)
+
+    def test_batch_polygon_metrics(self):
+        shapes = [([-4.0, -3.0, -3.0, -4.0], [55.0, 55.0, 56.0, 56.0]),
+                  Polygon(['22.323232 -4.287282', '23.323232 -5.328723', '22.112333 -6.23789238923'])]
+        batch = batch_polygon_metrics(shapes)
+        self.assertEqual(2, len(batch))
+        for shape, metrics in zip(shapes, batch):
+            single = polygon_metrics(shape)
+            self.assertAlmostEqual(single.area, metrics.area, delta=0.001)
+            self.assertAlmostEqual(single.centroid_y, metrics.centroid_y, delta=1e-9)
+
+        self.assertEqual([], batch_polygon_metrics([]))
+
+    def test_polygon_lazy_metrics(self):
+        polygon = Polygon(['22.323232 -4.287282', '23.323232 -5.328723', '22.112333 -6.23789238923'], z=10)
+        self.assertIsNone(polygon._metrics)
+        self.assertTrue(polygon.metrics.area > 0)
+        self.assertEqual(10, polygon.centroid.z)
+        self.assertAlmostEqual(22.59, polygon.centroid.y, delta=0.01)
+
+        # Vertical walls have no area and fall back to the mean of their vertices
+        wall = Polygon(['22.0 -4.0 0', '22.0 -4.1 0', '22.0 -4.1 100', '22.0 -4.0 100'])
+        self.assertAlmostEqual(0, wall.metrics.area, delta=0.001)
+        self.assertAlmostEqual(-4.04, wall.centroid.x, delta=0.01)
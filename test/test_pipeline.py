@@ -0,0 +1,110 @@
+import os
+import tempfile
+from unittest import TestCase
+
+from kmlplus.kml import KmlPlus
+from kmlplus.pipeline import Pipeline, parse_arguments
+from kmlplus.reader import iter_placemarks
+
+ARC = 'start=55.0 -3.0, end=55.1 -3.0, centre=55.05 -3.0, direction=clockwise'
+
+
+def shape_calls(count: int):
+    for i in range(count):
+        y = 55 + i * 0.01
+        yield 'cylinder', ([f'{y} -4.0'], 2), {'radius_uom': 'NM', 'lower_layer': 0, 'upper_layer': 1000, 'sample': 20}
+        yield 'polyhedron', ([f'{y} -4.0', ARC, f'{y + 0.3} -3.5'],) * 2, {'lower_layer': 10, 'upper_layer': 100}
+        yield 'circle', ([f'{y} -4.0 100'], 500), {'uom': 'FT'}
+        yield 'point', ([f'{y} -4.0'],), {'z': 100, 'uom': 'FT', 'point_name': f'Point {i}'}
+        yield 'linestring', ([f'{y} -4.0 10', f'{y} -3.0 20'],), {}
+
+
+class TestPipeline(TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def build(self, name: str, **kwargs) -> list:
+        path = os.path.join(self.tmp.name, name)
+        kml = KmlPlus(file_name=path, autosave=False)
+        if kwargs:
+            self.assertEqual(15, Pipeline(kml, **kwargs).run(shape_calls(3)))
+        else:
+            for method, args, shape_kwargs in shape_calls(3):
+                getattr(kml, method)(*args, **shape_kwargs)
+        kml.save()
+        return [(p.folder, p.name, [c.tolist() for c in p.coordinates()]) for p in iter_placemarks(path)]
+
+    def test_matches_serial_build(self):
+        serial = self.build('serial.kml')
+        self.assertEqual(serial, self.build('thread.kml', jobs=1))
+        self.assertEqual(serial, self.build('processes.kml', jobs=2, queue_size=2))
+        self.assertEqual(serial, self.build('threads.kml', jobs=2, threads=True))
+
+    def test_manifest_shared_with_serial_build(self):
+        from unittest import mock
+
+        manifest = os.path.join(self.tmp.name, 'manifest.json')
+        for jobs in (2, 1):
+            kml = KmlPlus(file_name=os.path.join(self.tmp.name, f'pipeline_{jobs}.kml'), autosave=False,
+                          manifest=manifest)
+            Pipeline(kml, jobs=jobs).run(shape_calls(3))
+            kml.save()
+            self.assertEqual(9, len(kml.manifest))
+
+        # Every shape the pipeline stored is found by a serial build, which computes no geometry
+        kml = KmlPlus(file_name=os.path.join(self.tmp.name, 'serial.kml'), autosave=False, manifest=manifest)
+        with mock.patch('kmlplus.kml.polyhedron_geometry', side_effect=AssertionError), \
+                mock.patch('kmlplus.kml.circle_geometry', side_effect=AssertionError), \
+                mock.patch('kmlplus.kml.cylinder_geometry', side_effect=AssertionError):
+            for method, args, kwargs in shape_calls(3):
+                getattr(kml, method)(*args, **kwargs)
+        kml.save()
+        self.assertEqual(9, len(kml.manifest))
+
+    def test_parse_arguments(self):
+        lower, upper = parse_arguments('polyhedron', (['55.0 -4.0', ARC], ['55.0 -4.0', ARC]), {})
+        self.assertIs(lower, upper)
+        self.assertTrue(len(lower) > 2)
+
+        points, = parse_arguments('point', (['55.0 -4.0 100'],), {'uom': 'FT'})
+        self.assertEqual(30.48, points[0].z)
+
+        args = (['55.0 -4.0'], 2)
+        self.assertIs(args, parse_arguments('cylinder', args, {}))
+
+    def test_backpressure(self):
+        consumed = []
+
+        def calls():
+            for i in range(50):
+                consumed.append(i)
+                yield 'point', ([f'55.0 -4.0'],), {}
+
+        written = []
+
+        class CountingKmlPlus(KmlPlus):
+            def point(self, coordinate_list, **kwargs):
+                written.append(len(consumed))
+                super().point(coordinate_list, **kwargs)
+
+        kml = CountingKmlPlus(autosave=False)
+        self.assertEqual(50, Pipeline(kml, jobs=1, queue_size=2).run(calls()))
+        # Two queues of two plus the shape held by each of the three stages
+        for count, consumed_before in enumerate(written):
+            self.assertTrue(consumed_before - count <= 7)
+
+    def test_errors(self):
+        kml = KmlPlus(autosave=False)
+        calls = [('point', (['55.0 -4.0'],), {}), ('point', (['not a coordinate'],), {})]
+        with self.assertRaises(ValueError):
+            Pipeline(kml, jobs=1).run(calls)
+        self.assertEqual(1, len(kml.kml.features))
+
+        with self.assertRaises(ValueError):
+            Pipeline(kml, jobs=2).run([('circle', (['55.0 -4.0'], -1), {})])
+
+        with self.assertRaises(ValueError):
+            Pipeline(kml, queue_size=0)
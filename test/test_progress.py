@@ -0,0 +1,83 @@
+import os
+import tempfile
+from unittest import TestCase
+
+from kmlplus.kml import KmlPlus
+from kmlplus.pipeline import Pipeline
+from kmlplus.progress import Progress
+
+
+class TestProgress(TestCase):
+    def setUp(self):
+        self.reports = []
+
+    def test_interval(self):
+        progress = Progress(self.reports.append, interval=60)
+        for _ in range(5):
+            progress.update(1, 10)
+        self.assertEqual([], self.reports)
+
+        progress.update(bytes_written=100, force=True)
+        report = self.reports[-1]
+        self.assertEqual((5, 50, 100), (report.shapes, report.vertices, report.bytes_written))
+        self.assertIsNone(report.eta)
+
+        progress = Progress(self.reports.append, interval=0)
+        progress.update(1, 10)
+        self.assertEqual(2, len(self.reports))
+        self.assertEqual(1, self.reports[-1].shapes)
+
+    def test_rates(self):
+        progress = Progress(self.reports.append, interval=0, total=4)
+        progress.update(1, 10)
+        progress.update(1, 10)
+        report = self.reports[-1]
+        self.assertGreater(report.shapes_per_second, 0)
+        self.assertAlmostEqual(report.vertices_per_second, report.shapes_per_second * 10, delta=1e-6)
+        self.assertAlmostEqual(report.elapsed, report.eta, delta=1e-6)
+
+        progress.update(2, 20)
+        self.assertEqual(0.0, self.reports[-1].eta)
+
+
+class TestKmlPlusProgress(TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'progress.kml')
+        self.reports = []
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_shapes(self):
+        kml = KmlPlus(file_name=self.path, autosave=False, progress=self.reports.append, progress_interval=0,
+                      expected_shapes=3)
+        kml.point(['55.0 -4.0'])
+        kml.linestring(['55.0 -4.0', '55.1 -4.0', '55.2 -4.1'])
+        kml.polyhedron(['55.0 -4.0', '55.0 -3.0', '56.0 -3.0'], ['55.0 -4.0', '55.0 -3.0', '56.0 -3.0'],
+                       lower_layer=10, upper_layer=100)
+        self.assertEqual([1, 2, 3], [r.shapes for r in self.reports])
+        # The polyhedron's layers are closed rings of 4 and its 3 walls have 5 vertices each
+        self.assertEqual([1, 4, 27], [r.vertices for r in self.reports])
+        self.assertEqual(0.0, self.reports[-1].eta)
+
+        kml.save()
+        self.assertEqual(os.path.getsize(self.path), self.reports[-1].bytes_written)
+
+    def test_autosave(self):
+        kml = KmlPlus(file_name=self.path, progress=self.reports.append, progress_interval=60)
+        kml.point(['55.0 -4.0'])
+        kml.point(['55.1 -4.0'])
+        self.assertEqual(2, len(self.reports))
+        self.assertGreater(self.reports[1].bytes_written, 2 * self.reports[0].bytes_written - 1)
+
+    def test_pipeline(self):
+        kml = KmlPlus(file_name=self.path, autosave=False, progress=self.reports.append, progress_interval=0)
+        calls = [('circle', (['55.5 -3.5'], 500), {}), ('point', (['55.0 -4.0'],), {})]
+        Pipeline(kml, jobs=1).run(calls)
+        self.assertEqual([1, 2], [r.shapes for r in self.reports])
+
+    def test_no_progress(self):
+        kml = KmlPlus(file_name=self.path, autosave=False)
+        self.assertIsNone(kml.progress)
+        kml.point(['55.0 -4.0'])
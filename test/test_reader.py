@@ -0,0 +1,138 @@
+import os
+import tempfile
+import zipfile
+from unittest import TestCase
+
+from kmlplus.geo import Point
+from kmlplus.kml import KmlPlus
+from kmlplus.reader import iter_placemarks, iter_shapes, open_kml, parse_coordinates, patch_kml
+from kmlplus.shapes import Cylinder, LineString, Polygon
+
+
+class TestReader(TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'shapes.kml')
+
+        kml = KmlPlus(file_name=self.path, autosave=False)
+        kml.polyhedron(['55.0 -4.0', '55.0 -3.0', '56.0 -3.0'], ['55.0 -4.0', '55.0 -3.0', '56.0 -3.0'],
+                       lower_layer=0, upper_layer=100, fol='Zone A')
+        kml.linestring(['55.0 -4.0 10', '55.0 -3.0 20'], name='Route')
+        kml.point(['55.0 -4.0'], point_name='Marker')
+        kml.save()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_parse_coordinates(self):
+        self.assertEqual([[1.0, 2.0, 3.0], [4.0, 5.0, 6.0]], parse_coordinates(' 1,2,3\n 4,5,6 ').tolist())
+        self.assertEqual([[1.0, 2.0, 0.0], [4.0, 5.0, 0.0]], parse_coordinates('1,2 4,5').tolist())
+        self.assertEqual([[1.0, 2.0, 0.0], [4.0, 5.0, 6.0]], parse_coordinates('1,2 4,5,6').tolist())
+        self.assertEqual((0, 3), parse_coordinates('').shape)
+
+    def test_iter_placemarks(self):
+        placemarks = list(iter_placemarks(self.path))
+        self.assertEqual(['Lower Polygon', 'Upper Polygon', 'KmlPlus Polygon', 'KmlPlus Polygon', 'KmlPlus Polygon',
+                          'KmlPlus Linestring', 'Marker'], [p.name for p in placemarks])
+        self.assertEqual('Zone A', placemarks[0].folder)
+        self.assertEqual(('Route',), placemarks[5].folders)
+
+        geometry, rings = placemarks[1].geometries[0]
+        self.assertEqual('Polygon', geometry)
+        self.assertEqual([[-4.0, 55.0, 100.0], [-3.0, 55.0, 100.0], [-3.0, 56.0, 100.0], [-4.0, 55.0, 100.0]],
+                         rings[0].tolist())
+        self.assertEqual([[-4.0, 55.0, 0.0]], placemarks[6].coordinates()[0].tolist())
+
+    def test_iter_shapes(self):
+        shapes = list(iter_shapes(self.path))
+        self.assertEqual([Polygon] * 5 + [LineString, Point], [type(s) for s in shapes])
+        self.assertEqual(4, len(shapes[0]))
+        self.assertEqual(100, shapes[1][0].z)
+        self.assertEqual(20, shapes[5][1].z)
+
+    def test_shapes_near_greenwich(self):
+        # repr writes coordinates below 1e-4 in scientific notation, which coordinate strings do not accept
+        path = os.path.join(self.tmp.name, 'greenwich.kml')
+        with open(path, 'w') as f:
+            f.write('<kml xmlns="http://www.opengis.net/kml/2.2"><Document>'
+                    '<Placemark><LineString><coordinates>-0.1,51.5,0 0.00001,51.5,10 0.1,51.5,0</coordinates>'
+                    '</LineString></Placemark><Placemark><Polygon><outerBoundaryIs><LinearRing><coordinates>'
+                    '-0.00005,51.4,0 0.1,51.4,0 0.1,51.3,0 -0.00005,51.4,0</coordinates></LinearRing>'
+                    '</outerBoundaryIs></Polygon></Placemark></Document></kml>')
+
+        line, polygon = iter_shapes(path)
+        self.assertEqual([(-0.1, 51.5, 0.0), (0.00001, 51.5, 10.0), (0.1, 51.5, 0.0)],
+                         [(p.x, p.y, p.z) for p in line])
+        self.assertEqual(-0.00005, polygon[0].x)
+
+    def test_patch_kml(self):
+        def transform(placemark):
+            if placemark.name == 'KmlPlus Polygon':
+                return None
+            if placemark.name == 'KmlPlus Linestring':
+                placemark.set_coordinates([[(-4.0, 55.0, 50.0), (-2.0, 55.0, 50.0)]])
+            return placemark
+
+        self.assertEqual(4, patch_kml(self.path, transform))
+
+        placemarks = list(iter_placemarks(self.path))
+        self.assertEqual(['Lower Polygon', 'Upper Polygon', 'KmlPlus Linestring', 'Marker'],
+                         [p.name for p in placemarks])
+        self.assertEqual([[-4.0, 55.0, 50.0], [-2.0, 55.0, 50.0]], placemarks[2].coordinates()[0].tolist())
+        self.assertEqual(('Zone A',), placemarks[0].folders)
+
+        with open(self.path) as f:
+            document = f.read()
+        self.assertEqual(1, document.count('xmlns="http://www.opengis.net/kml/2.2"'))
+        self.assertNotIn(os.path.basename(self.path) + '.tmp', os.listdir(self.tmp.name))
+
+        with self.assertRaises(IndexError):
+            patch_kml(self.path, lambda p: p.set_coordinates([]))
+
+    def test_patch_namespaces(self):
+        from xml.etree import ElementTree
+
+        xsi, atom = 'http://www.w3.org/2001/XMLSchema-instance', 'http://www.w3.org/2005/Atom'
+        path = os.path.join(self.tmp.name, 'namespaces.kml')
+        with open(path, 'w') as f:
+            f.write(f'<kml xmlns="http://www.opengis.net/kml/2.2" xmlns:xsi="{xsi}" '
+                    f'xsi:schemaLocation="http://www.opengis.net/kml/2.2 ogckml22.xsd"><Document xmlns:atom="{atom}">'
+                    '<Folder xmlns:ext="urn:ext" ext:id="a" xml:lang="en"><name>Zone</name><Placemark>'
+                    '<name>Mast</name><atom:author><atom:name>Ops</atom:name></atom:author><ext:note>x</ext:note>'
+                    '<Point><coordinates>-4,55,0</coordinates></Point></Placemark></Folder></Document></kml>')
+
+        self.assertEqual(1, patch_kml(path, lambda p: p))
+        # The patched document is well formed and keeps every namespaced name
+        root = ElementTree.parse(path).getroot()
+        self.assertEqual('http://www.opengis.net/kml/2.2 ogckml22.xsd', root.get(f'{{{xsi}}}schemaLocation'))
+        folder = root.find('.//{http://www.opengis.net/kml/2.2}Folder')
+        self.assertEqual('a', folder.get('{urn:ext}id'))
+        self.assertEqual('en', folder.get('{http://www.w3.org/XML/1998/namespace}lang'))
+        self.assertEqual('Ops', root.find(f'.//{{{atom}}}author/{{{atom}}}name').text)
+        self.assertEqual('x', root.find('.//{urn:ext}note').text)
+        self.assertEqual(['Mast'], [p.name for p in iter_placemarks(path)])
+
+    def test_patch_kmz(self):
+        path = os.path.join(self.tmp.name, 'models.kmz')
+        kml = KmlPlus(file_name=path, autosave=False)
+        kml.model(Cylinder(['55.0 -4.0', 1000], ['55.0 -4.0', 1000], lower_layer=0, upper_layer=100))
+        kml.circle(['55.0 -4.0'], 1000, name='Ring')
+        kml.save()
+
+        destination = os.path.join(self.tmp.name, 'patched.kmz')
+        self.assertEqual(3, patch_kml(path, lambda p: [p, p] if p.name == 'Ring' else p, destination))
+
+        with zipfile.ZipFile(destination) as archive:
+            self.assertEqual(['doc.kml', 'files/kmlplus_model_1.dae'], sorted(archive.namelist()))
+        self.assertFalse(os.path.exists(os.path.join(self.tmp.name, 'kmlplus_model_1.dae')))
+        self.assertEqual(['KmlPlus Model', 'Ring', 'Ring'], [p.name for p in iter_placemarks(destination)])
+
+    def test_open_kmz_closes_archive(self):
+        path = os.path.join(self.tmp.name, 'shapes.kmz')
+        with zipfile.ZipFile(path, 'w') as archive:
+            archive.write(self.path, 'doc.kml')
+
+        with open_kml(path) as source:
+            self.assertTrue(source.read(5).startswith(b'<'))
+        self.assertIsNone(source.archive.fp)
+        self.assertEqual([p.name for p in iter_placemarks(self.path)], [p.name for p in iter_placemarks(path)])
@@ -0,0 +1,27 @@
+import io
+from contextlib import redirect_stdout
+from unittest import TestCase
+
+from kmlplus.cache import get_geometry_cache
+from kmlplus.scaling import build_scaling, geodesic_scaling, main
+
+
+class TestScaling(TestCase):
+    def test_geodesic_scaling(self):
+        results = geodesic_scaling([1, 2], points=1000, repeat=1)
+        self.assertEqual([1, 2], [r['workers'] for r in results])
+        self.assertEqual(1.0, results[0]['speedup'])
+        self.assertTrue(all(r['seconds'] > 0 for r in results))
+
+    def test_build_scaling(self):
+        results = build_scaling([1, 2], vertices=2000, modes=('thread',))
+        self.assertEqual([('thread', 1), ('thread', 2)], [(r['mode'], r['workers']) for r in results])
+        self.assertGreater(results[0]['shapes'], 0)
+        self.assertTrue(all(r['speedup'] > 0 for r in results))
+        self.assertIsNone(get_geometry_cache())
+
+    def test_main(self):
+        with redirect_stdout(io.StringIO()) as stdout:
+            self.assertEqual(0, main(['--workers', '1', '--points', '100', '--vertices', '500', '--modes', 'thread']))
+        self.assertIn('precompute', stdout.getvalue())
+        self.assertIn('thread', stdout.getvalue())
@@ -78,6 +78,47 @@ class TestCylinder(TestCase):
         self.assertEqual(len(self.test_cylinder.sides), 100)
         self.assertTrue(isinstance(self.test_cylinder.sides[0], Polygon))
 
+    def test_shared_ring(self):
+        cylinder = Cylinder(['55.1111 -3.2311', 10], ['55.1111 -3.2311', 10], sample=20, radius_uom='NM',
+                            lower_layer=50, upper_layer=100)
+        lower, upper = cylinder.lower_layer, cylinder.upper_layer
+        self.assertIs(lower.ring_coordinates(), upper.ring_coordinates())
+        self.assertEqual(21, len(lower))
+        self.assertEqual(20, len(cylinder.sides))
+        self.assertEqual([(p.x, p.y) for p in lower], [(p.x, p.y) for p in upper])
+        self.assertEqual((50.0, 100.0), (lower[0].z, upper[0].z))
+
+        wall = cylinder.sides[3].point_list
+        self.assertIs(lower[3], wall[0])
+        self.assertIs(upper[4], wall[2])
+
+        self.assertIsNot(self.test_cylinder.lower_layer.ring_coordinates(),
+                         self.test_cylinder.upper_layer.ring_coordinates())
+
+    def test_frustum(self):
+        from kmlplus.geodesic import get_geodesic_backend
+
+        funnel = Cylinder(['55.1111 -3.2311', 10], ['55.1111 -3.2311', 10], upper_radius=5, sample=20,
+                          radius_uom='NM', lower_layer=0, upper_layer=3500, lower_layer_uom='FT')
+        self.assertEqual((10, 5), (funnel.lower_radius, funnel.upper_radius))
+        self.assertEqual(21, len(funnel.upper_layer))
+        self.assertEqual(20, len(funnel.sides))
+
+        # Both rings match circles solved on their own
+        for layer, radius in ((funnel.lower_layer, 10), (funnel.upper_layer, 5)):
+            expected = Circle(['55.1111 -3.2311'], radius, sample=20, radius_uom='NM').ring_coordinates()
+            self.assertEqual(expected, layer.ring_coordinates())
+            backend = get_geodesic_backend()
+            _, _, distances = backend.inv([-3.2311] * 21, [55.1111] * 21, [p.x for p in layer], [p.y for p in layer])
+            for distance in distances:
+                self.assertAlmostEqual(radius * 1852, distance, delta=1)
+
+        wall = funnel.sides[7].point_list
+        self.assertEqual([funnel.lower_layer[7], funnel.lower_layer[8], funnel.upper_layer[8], funnel.upper_layer[7]],
+                         wall[:4])
+        lower, upper, sides = funnel.to_kml()
+        self.assertEqual([lower[7], lower[8], upper[8], upper[7], lower[7]], sides[7])
+
     def test_to_kml(self):
         self.assertTrue(isinstance(self.test_cylinder.to_kml(), tuple))
         self.assertEqual(len(self.test_cylinder.to_kml()), 3)
@@ -94,7 +135,7 @@ class TestCylinder(TestCase):
         self.assertEqual(len(self.test_cylinder.generate_sides()), 100)
         for i in self.test_cylinder.generate_sides():
             self.assertTrue(isinstance(i, Polygon))
-            self.assertEqual(len(i), 6)
+            self.assertEqual(len(i), 5)
 
 
 class TestPolygon(TestCase):
@@ -192,13 +233,22 @@ class TestPolyhedron(TestCase):
         self.assertEqual(len(self.poly.generate_sides()), 3)
         for i in self.poly.generate_sides():
             self.assertTrue(isinstance(i, Polygon))
-            self.assertEqual(len(i), 6)
+            self.assertEqual(len(i), 5)
 
     def test_to_kml(self):
         self.assertTrue(isinstance(self.poly.to_kml(), tuple))
         for i in self.poly.to_kml():
             self.assertTrue(isinstance(i, list))
 
+    def test_densify(self):
+        coordinates = ['22.323232 -4.287282', '23.323232 -5.328723', '22.112333 -6.23789238923']
+        dense = Polyhedron(coordinates, coordinates, upper_layer=100, densify=20000)
+        self.assertEqual(len(dense.lower_layer), len(dense.upper_layer))
+        self.assertTrue(len(dense.lower_layer) > len(self.poly.lower_layer))
+        self.assertEqual(len(dense.sides), len(dense.lower_layer) - 1)
+        for a, b in zip(dense.lower_layer, dense.lower_layer.point_list[1:]):
+            self.assertTrue(a.get_distance(b) <= 20000)
+
 
 class TestLineString(TestCase):
     def setUp(self):
@@ -249,6 +299,14 @@ class TestLineString(TestCase):
             self.assertTrue(isinstance(i, Point))
             self.assertEqual(i.z, 20)
 
+    def test_densify(self):
+        dense = LineString(['22.323232 -4.287282 20', '23.323232 -5.328723 20'], densify=10000)
+        self.assertEqual(17, len(dense))
+        self.assertEqual(self.LineString_m[0], dense[0])
+        self.assertEqual(self.LineString_m[-1], dense[-1])
+        for i in dense:
+            self.assertEqual(i.z, 20)
+
 
 class TestThreeDimensionShape(TestCase):
 
@@ -258,7 +316,7 @@ class TestThreeDimensionShape(TestCase):
         poly = Polyhedron(test_list, test_list, upper_layer=100)
         self.assertTrue(isinstance(poly, Polyhedron))
         self.assertTrue(isinstance(poly.sides, list))
-        self.assertEqual(4, len(poly.sides))
+        self.assertEqual(3, len(poly.sides))
 
     def test_to_kml(self):
         test_list = ['22.323232 -4.287282 20', '23.323232 -5.328723', '22.112333 -6.23789238923']
@@ -0,0 +1,54 @@
+import os
+import tempfile
+import zipfile
+from unittest import TestCase
+
+from kmlplus.tiles import TiledKmlPlus
+
+
+class TestTiledKmlPlus(TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def build(self, **kwargs):
+        tiled = TiledKmlPlus(output=self.tmp.name, file_name='root.kml', **kwargs)
+        tiled.cylinder(['55.1111 -3.2311'], 2, radius_uom='NM', lower_layer=0, upper_layer=1000, sample=20)
+        tiled.circle(['55.5 -3.5'], 500)
+        tiled.point(['22.323232 -4.287282'])
+        tiled.polyhedron(['start=22.323232 -4.287282, end=22.112333 -4.23789238923, direction=clockwise',
+                          '23.323232 -5.328723'],
+                         ['start=22.323232 -4.287282, end=22.112333 -4.23789238923, direction=clockwise',
+                          '23.323232 -5.328723'],
+                         lower_layer=10, upper_layer=100)
+        return tiled, tiled.save()
+
+    def test_tile_key(self):
+        tiled = TiledKmlPlus(tile_size=0.5)
+        self.assertEqual((110, -7), tiled.tile_key(['55.1111 -3.2311']))
+        self.assertEqual((110, -7), tiled.tile_key(['551111N 0031111W']))
+        self.assertEqual((44, -9), tiled.tile_key(['start=22.323232 -4.287282, end=22.112333 -4.23789238923']))
+
+    def test_save(self):
+        tiled, paths = self.build(jobs=2)
+        self.assertEqual(2, len(tiled.tiles))
+        self.assertEqual(2, len(paths))
+        self.assertEqual(2, len(tiled.tiles[(55, -4)]))
+
+        for path in paths:
+            self.assertTrue(os.path.exists(path))
+
+        with open(os.path.join(self.tmp.name, 'root.kml')) as f:
+            root = f.read()
+        self.assertEqual(2, root.count('<NetworkLink'))
+        self.assertEqual(2, root.count('<Region'))
+        self.assertIn('<href>tile_55_-4.kml</href>', root)
+        self.assertIn('<viewRefreshMode>onRegion</viewRefreshMode>', root)
+
+    def test_save_kmz(self):
+        tiled, paths = self.build(jobs=1, kmz=True)
+        for path in paths:
+            self.assertTrue(path.endswith('.kmz'))
+            self.assertTrue(zipfile.is_zipfile(path))
@@ -0,0 +1,59 @@
+from unittest import TestCase
+
+from kmlplus.geo import PointFactory
+from kmlplus.tokenizer import ARC, POINT, CoordinateSyntaxError, parse_arc, parse_point, tokenize
+from kmlplus.util import dms_to_decimal
+
+
+class TestTokenizer(TestCase):
+    def test_parse_point(self):
+        self.assertEqual((POINT, 55.5, -4.25, None), parse_point('55.5 -4.25'))
+        self.assertEqual((POINT, 2.0, 32.112332, 100.0), parse_point(' 2 +32.112332  100 '))
+        self.assertEqual((POINT, dms_to_decimal('553124.5N'), dms_to_decimal('0045830W'), 1.5e3),
+                         parse_point('553124.5N 0045830W 1.5e3'))
+        self.assertEqual((POINT, dms_to_decimal('553124S'), dms_to_decimal('0045830E'), None),
+                         parse_point('553124S 0045830E'))
+
+    def test_parse_arc(self):
+        token = parse_arc('start=55.0 -4.0, end=55.1 -4.0, centre=553124N 0045830W, direction=anticlockwise, sample=16')
+        self.assertEqual((ARC, False, 16, (POINT, 55.0, -4.0, None), (POINT, 55.1, -4.0, None)), token[:5])
+        self.assertEqual(POINT, token[5][0])
+
+        self.assertEqual((ARC, True, 100, (POINT, 55.0, -4.0, None), (POINT, 55.1, -4.0, None), None),
+                         parse_arc('start=55.0 -4.0,end=55.1 -4.0, note=ignored'))
+        self.assertEqual((POINT, 55.05, -4.0, None), parse_arc('start=55.0 -4.0, end=55.1 -4.0, '
+                                                               'center=55.05 -4.0')[5])
+
+    def test_tokenize(self):
+        tokens = tokenize(['55.0 -4.0', 'start=55.0 -4.0, end=55.1 -4.0', '551000N 0040000W 10'])
+        self.assertEqual([POINT, ARC, POINT], [t[0] for t in tokens])
+        self.assertEqual(10.0, tokens[2][3])
+
+    def test_errors(self):
+        cases = [
+            ('55.0', 5, 'latitude and longitude'),
+            ('5a.0 -4.0', 1, 'latitude'),
+            ('55.0 0045830W', 6, 'longitude'),
+            ('553124N -4.0', 9, 'longitude'),
+            ('55.0 -4.0 high', 11, 'elevation'),
+            ('55.0 -4.0 10 20', 14, 'Unexpected'),
+            ('start=55.0 -4.0, end=55.1 x4.0', 27, 'longitude'),
+            ('start=55.0 -4.0, direction=left', 28, 'Direction'),
+            ('start=55.0 -4.0, end=55.1 -4.0, sample=-1', 40, 'Sample'),
+            ('start=55.0 -4.0, start=55.1 -4.0', 18, 'Duplicate'),
+            ('start=55.0 -4.0', 16, 'missing end'),
+            ('start=55.0 -4.0, 55.1 -4.0', 17, 'key=value'),
+        ]
+        for text, column, message in cases:
+            with self.subTest(text=text):
+                with self.assertRaises(CoordinateSyntaxError) as e:
+                    tokenize(['55.0 -4.0', text])
+                self.assertEqual((1, column), (e.exception.item, e.exception.column))
+                self.assertIn(message, str(e.exception))
+                self.assertIn('item 1, column', str(e.exception))
+
+    def test_point_factory_errors(self):
+        with self.assertRaises(ValueError) as e:
+            PointFactory(['55.0 -4.0', '55.1 -4.0', '55.2 4.0W']).process_coordinates()
+        self.assertEqual(2, e.exception.item)
+        self.assertEqual(6, e.exception.column)
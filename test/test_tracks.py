@@ -0,0 +1,145 @@
+import os
+import tempfile
+from datetime import datetime, timezone
+from unittest import TestCase
+from xml.etree import ElementTree
+
+from kmlplus.kml import KmlPlus
+from kmlplus.reader import GX_NAMESPACE, KML_NAMESPACE, iter_placemarks
+from kmlplus.tracks import TrackWriter, decimate, fix_tuple
+
+
+def straight(count: int, times: bool = True) -> list[tuple]:
+    # Due north, about 111m and 10 seconds apart
+    return [(55 + i * 0.001, -4.0, 1000, 1.7e9 + i * 10) if times else (55 + i * 0.001, -4.0, 1000)
+            for i in range(count)]
+
+
+def corner() -> list[tuple]:
+    # North for ten fixes then east for ten
+    return [(55 + i * 0.001, -4.0, 0) for i in range(10)] + [(55.009, -4.0 + i * 0.001, 0) for i in range(1, 11)]
+
+
+class TestDecimate(TestCase):
+    def test_fix_tuple(self):
+        self.assertEqual((-4.0, 55.0, 304.8, None), fix_tuple((55, -4, 1000), 'FT'))
+        expected = datetime(2024, 1, 1, tzinfo=timezone.utc).timestamp()
+        self.assertEqual(expected, fix_tuple((55, -4, 0, datetime(2024, 1, 1)))[3])
+        self.assertEqual(expected, fix_tuple((55, -4, 0, '2024-01-01T00:00:00Z'))[3])
+        self.assertEqual(expected, fix_tuple((55, -4, 0, expected))[3])
+
+    def test_no_thresholds(self):
+        self.assertEqual([fix_tuple(f) for f in straight(5)], list(decimate(straight(5))))
+
+    def test_distance(self):
+        kept = list(decimate(straight(11), min_distance=300))
+        self.assertEqual([55.0, 55.003, 55.006, 55.009, 55.01], [round(f[1], 6) for f in kept])
+
+        in_nm = list(decimate(straight(11), min_distance=300 / 1852, distance_uom='NM'))
+        self.assertEqual(len(kept), len(in_nm))
+
+    def test_interval(self):
+        kept = list(decimate(straight(11), min_interval=45))
+        self.assertEqual([0, 50, 100], [f[3] - 1.7e9 for f in kept])
+        with self.assertRaises(ValueError):
+            list(decimate(straight(11, times=False), min_interval=45))
+
+    def test_angle(self):
+        kept = list(decimate(corner(), min_angle=45))
+        self.assertEqual([(-4.0, 55.0), (-3.999, 55.009), (-3.99, 55.009)], [(f[0], round(f[1], 6)) for f in kept])
+
+    def test_streamed(self):
+        # Fixes are read one at a time as they are yielded
+        read = []
+
+        def source():
+            for fix in straight(11):
+                read.append(fix)
+                yield fix
+
+        stream = decimate(source(), min_distance=300)
+        next(stream)
+        self.assertEqual(1, len(read))
+        next(stream)
+        self.assertEqual(4, len(read))
+
+
+class TestTracks(TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_writer(self):
+        path = os.path.join(self.tmp.name, 'tracks.kml')
+        with TrackWriter(path) as writer:
+            self.assertEqual(5, writer.write(straight(11), name='Line', min_distance=300, uom='FT'))
+            self.assertEqual(11, writer.write(straight(11), name='Track', kind='track'))
+            with self.assertRaises(ValueError):
+                writer.write(straight(2, times=False), kind='bad')
+        self.assertEqual(2, writer.count)
+
+        placemarks = list(iter_placemarks(path))
+        self.assertEqual(['Line', 'Track'], [p.name for p in placemarks])
+        line = placemarks[0].coordinates()[0]
+        self.assertEqual([304.8] * 5, line[:, 2].tolist())
+        self.assertEqual([55.0, 55.003, 55.006, 55.009, 55.01], line[:, 1].round(6).tolist())
+
+        track = ElementTree.parse(path).getroot().find(f'.//{{{GX_NAMESPACE}}}Track')
+        whens = track.findall(f'{{{KML_NAMESPACE}}}when')
+        coords = track.findall(f'{{{GX_NAMESPACE}}}coord')
+        self.assertEqual(11, len(whens))
+        self.assertEqual(11, len(coords))
+        # Every when precedes the first coord
+        self.assertEqual(list(track).index(coords[0]), list(track).index(whens[-1]) + 1)
+        self.assertEqual(kml_time_text(1.7e9), whens[0].text)
+        self.assertEqual('-4.0 55.0 1000.0', coords[0].text)
+
+    def test_writer_track_requires_times(self):
+        path = os.path.join(self.tmp.name, 'untimed.kml')
+        with TrackWriter(path) as writer:
+            writer.write(straight(3), name='Before')
+            with self.assertRaises(ValueError):
+                writer.write(straight(3, times=False), kind='track')
+            with self.assertRaises(ValueError):
+                writer.write(straight(3, times=False), min_interval=5)
+            writer.write(straight(3), name='After')
+        # The failed tracks are removed, leaving a well formed document
+        self.assertEqual(['Before', 'After'], [p.name for p in iter_placemarks(path)])
+
+    def test_kmlplus_track(self):
+        kml = KmlPlus(file_name=os.path.join(self.tmp.name, 'track.kml'), autosave=False,
+                      progress=lambda report: None)
+        self.assertEqual(3, kml.track(corner(), fol='Tracks', track_name='Turn', min_angle=45, colour_hex='ff0000ff',
+                                      width=3))
+        self.assertEqual(11, kml.track(straight(11), track_name='Timed', kind='track'))
+        kml.save()
+
+        self.assertEqual(2, kml.progress.shapes)
+        self.assertEqual((55.01, 55.0, -3.99, -4.0), tuple(round(b, 6) for b in kml.bounds))
+        placemarks = list(iter_placemarks(kml.save_name))
+        self.assertEqual([('Turn', 'Tracks'), ('Timed', 'KmlPlus Track')], [(p.name, p.folder) for p in placemarks])
+        self.assertEqual([[-4.0, 55.0, 0.0], [-3.999, 55.009, 0.0], [-3.99, 55.009, 0.0]],
+                         placemarks[0].coordinates()[0].round(6).tolist())
+
+        root = ElementTree.parse(kml.save_name).getroot()
+        self.assertEqual(11, len(root.findall(f'.//{{{GX_NAMESPACE}}}coord')))
+        with self.assertRaises(ValueError):
+            kml.track(straight(3, times=False), kind='track')
+
+    def test_ordered_invalid_kind(self):
+        kml = KmlPlus(file_name=os.path.join(self.tmp.name, 'ordered.kml'), autosave=False, ordered=True)
+        read = []
+        with self.assertRaises(ValueError):
+            kml.track((read.append(fix) or fix for fix in straight(3)), kind='bad', order=0)
+        self.assertEqual([], read)
+
+        kml.track(straight(3), track_name='First', order=0)
+        kml.track(straight(3), track_name='Second', order=1)
+        kml.save()
+        self.assertEqual(['First', 'Second'], [p.name for p in iter_placemarks(kml.save_name)])
+
+
+def kml_time_text(seconds: float) -> str:
+    return datetime.fromtimestamp(seconds, timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')